@@ -4,33 +4,83 @@ Flask + SocketIO + Bleak + SQLite for ESP32 BLE communication
 Features: Employee Management, Device Monitoring, Event Logging, Authentication
 """
 import asyncio
-import concurrent.futures
-import io
+import atexit
 import logging
 import hashlib
 import os
-from flask import Flask, jsonify, request, render_template, session, redirect, url_for, send_file
+from flask import Flask, Response, jsonify, request, render_template, session, redirect, url_for
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
-from bleak import BleakScanner, BleakClient
-import re
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from datetime import datetime, timedelta
-from threading import Thread, Lock
+from threading import Thread, Lock, active_count
 import time
 import sqlite3
 import json
 from functools import wraps
-from openpyxl import Workbook
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
+import db
+import fanout
+from ble_scanner import ScanService
+from connection_supervisor import Backoff, ConnectGate
+from rate_controller import RateController
+from command_pipeline import RESPONSE_PREFIX, CommandPipeline, response_key
+from command_jobs import CommandJobStore
+import log_config
+import log_export
+import metrics
+import migrations
+import pagination
+import transport
+from ble_hub import BleHub
+from broadcaster import ROOM_ALL, DeviceDataAggregator, department_room, device_room
+from db_writer import DbWriter
+from device_registry import DeviceRecord, DeviceRegistry
+from employee_index import EmployeeIndex
+from frames import FORMAT_BINARY_ACK, FORMAT_BINARY_COMMAND, parse_frame
+from link_quality import LinkQualityTracker
+from state_sync import STATE_ROOM, StateSync
+from stats_engine import StatsEngine
+from timeseries import TIERS, TimeSeriesStore
+from wear_aggregates import DailyWearAggregator
+
+# 로깅 설정 (카테고리별 레벨 + 비차단 큐 핸들러, /api/admin/logging 으로 런타임 조정)
+log_config.setup_logging()
 logger = logging.getLogger(__name__)
+rx_log = log_config.get_category('ble.rx')
+tx_log = log_config.get_category('ble.tx')
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=8)
 CORS(app, resources={r"/*": {"origins": "*"}})
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# Prometheus 지표 (기록은 스레드별 샤드에 잠금 없이, /metrics 수집 시 합산)
+SOCKETIO_EMITS = metrics.REGISTRY.counter(
+    'strap_socketio_emits_total', 'Socket.IO events emitted by the server', ('event',))
+NOTIFICATIONS = metrics.REGISTRY.counter(
+    'strap_notifications_total', 'BLE notifications received', ('device_id',))
+PARSE_FAILURES = metrics.REGISTRY.counter(
+    'strap_frame_parse_failures_total', 'Notifications that were neither a sensor frame nor a RESP: reply',
+    ('device_id',))
+NOTIFICATION_SECONDS = metrics.REGISTRY.histogram(
+    'strap_notification_handler_seconds', 'notification_handler processing time')
+COMMAND_RTT_SECONDS = metrics.REGISTRY.histogram(
+    'strap_command_rtt_seconds', 'Device command round-trip time until the RESP: reply',
+    ('command', 'outcome'))
+CONNECT_ATTEMPTS = metrics.REGISTRY.counter(
+    'strap_connect_attempts_total', 'BLE connection attempts', ('result',))
+LINKS_LOST = metrics.REGISTRY.counter(
+    'strap_links_lost_total', 'Established BLE links that dropped and were retried')
+
+
+class CountingSocketIO(SocketIO):
+    """emit 호출 수를 이벤트별로 집계하는 SocketIO"""
+
+    def emit(self, event, *args, **kwargs):
+        SOCKETIO_EMITS.inc(event)
+        return super().emit(event, *args, **kwargs)
+
+
+socketio = CountingSocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # 한국 시간대 (UTC+9)
 KST_OFFSET = timedelta(hours=9)
@@ -58,16 +108,11 @@ STRAP_SERVICE_UUID = "7b4fb520-5f6e-4b65-9c31-9100d7c0d001"
 STRAP_NOTIFY_UUID = "7b4fb520-5f6e-4b65-9c31-9100d7c0d002"
 STRAP_WRITE_UUID = "7b4fb520-5f6e-4b65-9c31-9100d7c0d003"
 
-# 데이터 파싱 정규식
-EXT_PAYLOAD_RE = re.compile(
-    r"^DIST:(?P<dist>ERR|\d+);RAW:(?P<raw>\d+);AVG:(?P<avg>\d+);"
-    r"DIFF:(?P<diff>\d+);STATE:(?P<state>OPEN|CLOSED)$"
-)
+# 알림 프레임 포맷 협상 ('binary' 이면 연결 시 FMT:BIN 요청, 미지원 펌웨어는 텍스트 유지)
+BLE_FRAME_FORMAT = os.environ.get('BLE_FRAME_FORMAT', 'binary').strip().lower()
 
-# 글로벌 상태
-devices_lock = Lock()
-registered_devices = {}  # {device_id: {address, name, client, connected, last_data}}
-scanning = False
+# 글로벌 상태 - 등록된 디바이스 (조회는 잠금 없는 스냅샷, 등록/해제만 교체)
+device_registry = DeviceRegistry()
 
 # 착용 판정 정책 기본값 및 캐시
 DEFAULT_WEAR_POLICY = {
@@ -79,20 +124,154 @@ DEFAULT_WEAR_POLICY = {
 policy_lock = Lock()
 policy_cache = None
 
+# 정책 전파 동시 실행 수 / 전체 마감 시간(초)
+POLICY_PUSH_CONCURRENCY = int(os.environ.get('POLICY_PUSH_CONCURRENCY', '16'))
+POLICY_PUSH_DEADLINE_SECONDS = float(os.environ.get('POLICY_PUSH_DEADLINE_SECONDS', '30'))
+
+# 일괄 명령 동시 전송 수 / 작업 전체 마감 시간(초)
+BULK_COMMAND_CONCURRENCY = int(os.environ.get('BULK_COMMAND_CONCURRENCY', '16'))
+BULK_COMMAND_DEADLINE_SECONDS = float(os.environ.get('BULK_COMMAND_DEADLINE_SECONDS', '60'))
+
+# 명령 응답(RESP:) 대기 시간(초) / 디바이스별 응답 대기 중 동시 명령 수
+COMMAND_RESPONSE_TIMEOUT_SECONDS = float(os.environ.get('COMMAND_RESPONSE_TIMEOUT_SECONDS', '5'))
+COMMAND_PIPELINE_DEPTH = int(os.environ.get('COMMAND_PIPELINE_DEPTH', '4'))
+
+# 적응형 측정 주기 (안정 상태 기기는 RATE 를 늘리고 임계값 근처/상태 변경 시 줄임)
+rate_controller = RateController(
+    fast_ms=int(os.environ.get('RATE_FAST_MS', '120')),
+    slow_ms=int(os.environ.get('RATE_SLOW_MS', '1000')),
+    idle_ms=int(os.environ.get('RATE_IDLE_MS', '2000')),
+    stable_seconds=float(os.environ.get('RATE_STABLE_SECONDS', '30')),
+    idle_seconds=float(os.environ.get('RATE_IDLE_SECONDS', '600')),
+    airtime_budget=float(os.environ.get('RATE_AIRTIME_BUDGET', '300')),
+    enabled=os.environ.get('RATE_CONTROL_ENABLED', '1') != '0'
+)
+
+# 재연결 백오프 시작/최대 지연(초), 연속 실패 N회 후 device_disconnected 알림
+RECONNECT_BASE_SECONDS = float(os.environ.get('RECONNECT_BASE_SECONDS', '2'))
+RECONNECT_MAX_SECONDS = float(os.environ.get('RECONNECT_MAX_SECONDS', '60'))
+RECONNECT_NOTIFY_AFTER = int(os.environ.get('RECONNECT_NOTIFY_AFTER', '3'))
+
+# BLE 어댑터 동시 연결 시도 수 / 연결 시작 간격(ms) - 재시작 시 전체 기기가 한꺼번에 connect() 하지 않도록
+connect_gate = ConnectGate(
+    max_concurrent=int(os.environ.get('BLE_CONNECT_CONCURRENCY', '4')),
+    spacing=int(os.environ.get('BLE_CONNECT_SPACING_MS', '250')) / 1000.0
+)
+
+# BLE 전송 계층 (bleak: 실제 어댑터, sim: 부하 테스트용 가상 스트랩 SIM_DEVICES 대)
+BLE_TRANSPORT = os.environ.get('BLE_TRANSPORT', transport.TRANSPORT_BLEAK)
+SIM_AUTO_REGISTER = os.environ.get('SIM_AUTO_REGISTER', '1') != '0'
+if BLE_TRANSPORT == transport.TRANSPORT_SIMULATED:
+    ble_transport = transport.create_transport(
+        BLE_TRANSPORT,
+        count=int(os.environ.get('SIM_DEVICES', '100')),
+        dwell_seconds=float(os.environ.get('SIM_WEAR_DWELL_SECONDS', '600')),
+        mtbf_seconds=float(os.environ.get('SIM_MTBF_SECONDS', '0')),
+        connect_latency=int(os.environ.get('SIM_CONNECT_LATENCY_MS', '500')) / 1000.0
+    )
+else:
+    ble_transport = transport.create_transport(BLE_TRANSPORT)
+
+# 공유 BLE 이벤트 루프 (모든 DeviceManager 태스크를 소수의 루프에서 실행)
+BLE_HUB_LOOPS = int(os.environ.get('BLE_HUB_LOOPS', '1'))
+ble_hub = BleHub(loop_count=BLE_HUB_LOOPS)
+
+# BLE 스캔 서비스 (광고 캐시 TTL, 이름 필터, 상시 스캔 여부)
+scan_service = ScanService(
+    ble_hub,
+    lambda event, data: _emit_scan_event(event, data),
+    ttl=float(os.environ.get('SCAN_CACHE_TTL_SECONDS', '30')),
+    name_filter=os.environ.get('SCAN_NAME_FILTER', 'ESP32'),
+    background=os.environ.get('SCAN_BACKGROUND', '1') != '0',
+    scanner_factory=ble_transport.scanner
+)
+
+# 링크 품질 추적 (기대 RATE 주기 대비 도착 간격 지터/누락/초당 프레임 수, 저하 판단 기준)
+link_quality = LinkQualityTracker(
+    rate_controller.interval,
+    scan_service.rssi,
+    window=int(os.environ.get('LINK_QUALITY_WINDOW', '64')),
+    degraded_loss_ratio=float(os.environ.get('LINK_DEGRADED_LOSS_RATIO', '0.2')),
+    degraded_jitter_ratio=float(os.environ.get('LINK_DEGRADED_JITTER_RATIO', '0.5')),
+    stale_periods=int(os.environ.get('LINK_STALE_PERIODS', '5'))
+)
+
+# link_quality 브로드캐스트 주기(초, 0 이면 끔)
+LINK_QUALITY_EMIT_SECONDS = float(os.environ.get('LINK_QUALITY_EMIT_SECONDS', '5'))
+
+# 일괄 명령 작업 (진행 결과는 bulk_command_result / bulk_command_job 으로 전송)
+command_jobs = CommandJobStore(
+    ble_hub,
+    lambda event, data: socketio.emit(event, data, namespace='/'),
+    concurrency=BULK_COMMAND_CONCURRENCY,
+    deadline=BULK_COMMAND_DEADLINE_SECONDS
+)
+
+# device_data 병합 전송기 (디바이스별 최신 프레임만 틱마다 device_data_batch 로 전송)
+device_aggregator = DeviceDataAggregator(
+    socketio,
+    interval_ms=int(os.environ.get('SOCKETIO_BATCH_MS', '250'))
+)
+
+# device_id → 직원 정보 메모리 인덱스 (직원 CRUD 시 재적재)
+employee_index = EmployeeIndex()
+
+# 쓰기 지연 DB 작성기 (BLE 콜백의 쓰기를 배치 트랜잭션으로 반영)
+db_writer = DbWriter(
+    db.connect,
+    flush_interval_ms=int(os.environ.get('DB_WRITER_FLUSH_MS', '250')),
+    max_batch_rows=int(os.environ.get('DB_WRITER_BATCH_ROWS', '500')),
+    max_queue=int(os.environ.get('DB_WRITER_QUEUE_SIZE', '10000'))
+)
+# 종료 시 큐에 남은 쓰기(이벤트/세션 포함)를 반영하고 연결을 닫음
+atexit.register(db_writer.flush, timeout=10, close=True)
+
+# 센서 시계열 저장소 (메모리 원시 링버퍼 + 1s/1m/1h 롤업, 티어별 보존 기간)
+timeseries = TimeSeriesStore(
+    db_writer,
+    raw_size=int(os.environ.get('TIMESERIES_RAW_POINTS', '2000')),
+    retention={
+        '1s': int(os.environ.get('TIMESERIES_RETENTION_1S_HOURS', '24')) * 3600,
+        '1m': int(os.environ.get('TIMESERIES_RETENTION_1M_DAYS', '30')) * 86400,
+        '1h': int(os.environ.get('TIMESERIES_RETENTION_1H_DAYS', '730')) * 86400,
+    }
+)
+# 종료 시 진행 중인 1m/1h 버킷을 영속화 (atexit 는 역순 실행이므로 위의 db_writer 종료 flush 보다 먼저 실행됨)
+atexit.register(timeseries.flush_all)
+
+
+# 대시보드 통계 (상태 변경/연결 이벤트로 증분 갱신, 주기적으로 DB 와 대조)
+stats_engine = StatsEngine(
+    db_writer,
+    reconcile_interval=int(os.environ.get('STATS_RECONCILE_SECONDS', '300'))
+)
+
+# 직원/일자별 착용 집계 (종료된 세션을 주기적으로, 세션 종료 시 즉시 daily_wear_stats 에 반영)
+wear_aggregates = DailyWearAggregator(
+    db_writer,
+    interval=int(os.environ.get('WEAR_AGGREGATE_INTERVAL_SECONDS', '60'))
+)
+
+
+def _utc_timestamp():
+    """SQLite CURRENT_TIMESTAMP 과 같은 형식의 UTC 시각 문자열"""
+    return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _day_range(day):
+    """날짜(YYYY-MM-DD 또는 date)의 [시작, 다음날 시작) 타임스탬프 문자열 - 인덱스를 타는 범위 조건용"""
+    if isinstance(day, str):
+        day = datetime.strptime(day, '%Y-%m-%d').date()
+    return day.strftime('%Y-%m-%d 00:00:00'), (day + timedelta(days=1)).strftime('%Y-%m-%d 00:00:00')
+
 # Database 초기화
 def init_db():
     """SQLite 데이터베이스 초기화"""
-    conn = sqlite3.connect('strap_monitor.db')
+    conn = db.get_connection()
     c = conn.cursor()
     
-    # 사용자 테이블 (로그인)
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        role TEXT DEFAULT 'admin',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
+    # 스키마 마이그레이션 (테이블/인덱스)
+    migrations.migrate(conn)
     
     # 기본 관리자 계정 생성 (admin/admin123)
     import hashlib
@@ -100,67 +279,6 @@ def init_db():
     c.execute('''INSERT OR IGNORE INTO users (username, password_hash, role) 
                  VALUES ('admin', ?, 'admin')''', (default_password,))
     
-    # 직원 테이블
-    c.execute('''CREATE TABLE IF NOT EXISTS employees (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        employee_number TEXT UNIQUE NOT NULL,
-        department TEXT,
-        position TEXT,
-        device_id TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    # 기기 테이블
-    c.execute('''CREATE TABLE IF NOT EXISTS devices (
-        id TEXT PRIMARY KEY,
-        address TEXT UNIQUE NOT NULL,
-        name TEXT NOT NULL,
-        registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        last_connected TIMESTAMP
-    )''')
-    
-    # 이벤트 로그 테이블
-    c.execute('''CREATE TABLE IF NOT EXISTS event_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        device_id TEXT NOT NULL,
-        employee_id INTEGER,
-        event_type TEXT NOT NULL,
-        event_data TEXT,
-        severity TEXT DEFAULT 'info'
-    )''')
-    
-    # 착용 세션 테이블 (착용/해제 추적)
-    c.execute('''CREATE TABLE IF NOT EXISTS wear_sessions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        employee_id INTEGER,
-        device_id TEXT NOT NULL,
-        start_time TIMESTAMP NOT NULL,
-        end_time TIMESTAMP,
-        duration_seconds INTEGER,
-        is_active BOOLEAN DEFAULT 1
-    )''')
-    
-    # 센서 데이터 로그 (샘플링)
-    c.execute('''CREATE TABLE IF NOT EXISTS sensor_data (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        device_id TEXT NOT NULL,
-        distance INTEGER,
-        raw_hall INTEGER,
-        avg_hall INTEGER,
-        diff_hall INTEGER,
-        state TEXT
-    )''')
-
-    # 시스템 설정 저장 테이블
-    c.execute('''CREATE TABLE IF NOT EXISTS system_settings (
-        key TEXT PRIMARY KEY,
-        value TEXT
-    )''')
-
     # 착용 정책 기본값 저장
     c.execute('SELECT value FROM system_settings WHERE key = ?', ('wear_policy',))
     row = c.fetchone()
@@ -184,6 +302,76 @@ def init_db():
     logger.info("Database initialized")
 
 init_db()
+employee_index.load()
+stats_engine.reconcile()
+stats_engine.start()
+wear_aggregates.start()
+link_quality.start(lambda event, data: socketio.emit(event, data, namespace='/'), LINK_QUALITY_EMIT_SECONDS)
+
+
+def _device_summary(device_id=None):
+    """디바이스 요약 (device_id 지정 시 해당 디바이스 dict 또는 None, 미지정 시 전체 목록)"""
+    if device_id is not None:
+        record = device_registry.get(device_id)
+        return _describe_device(record) if record else None
+    return [_describe_device(record) for record in device_registry.records()]
+
+
+def _describe_device(record):
+    device_id = record.device_id
+    employee = employee_index.get(device_id)
+    employee_name = employee.name if employee else None
+
+    manager = record.manager
+    last_data = record.last_data
+    if last_data and employee_name and not last_data.get('employee_name'):
+        last_data = dict(last_data)
+        last_data['employee_name'] = employee_name
+
+    return {
+        'id': device_id,
+        'address': record.address,
+        'name': record.name,
+        'connected': record.connected,
+        'employee_name': employee_name,
+        'last_data': last_data,
+        'frame_format': manager.frame_format if manager else None,
+        'frames_lost': manager.frames_lost if manager else 0,
+        'policy_version': manager.policy_version if manager else None,
+        'sample_interval_ms': rate_controller.interval(device_id),
+        'activity': rate_controller.level(device_id),
+        'link_quality': link_quality.snapshot(device_id)
+    }
+
+
+def _stats_payload():
+    summary_etag, summary = stats_engine.summary()
+    unwearing_etag, unwearing = stats_engine.unwearing()
+    return summary_etag, summary, unwearing_etag, unwearing
+
+
+def _recent_events_from_db(limit=50):
+    """상태 동기화 초기값용 최근 이벤트 (최신순)"""
+    conn = db.get_connection()
+    try:
+        rows = conn.execute('''SELECT el.timestamp, el.device_id, el.employee_id, e.name,
+                                      el.event_type, el.severity
+                               FROM event_logs el
+                               LEFT JOIN employees e ON el.employee_id = e.id
+                               ORDER BY el.timestamp DESC, el.id DESC LIMIT ?''', (limit,)).fetchall()
+    finally:
+        conn.close()
+    keys = ('timestamp', 'device_id', 'employee_id', 'employee_name', 'event_type', 'severity')
+    return [dict(zip(keys, row)) for row in rows]
+
+
+# 대시보드 상태 동기화 (스냅샷 + 버전 델타 푸시)
+state_sync = StateSync(
+    socketio, _device_summary, _stats_payload,
+    interval_ms=int(os.environ.get('STATE_SYNC_MS', '200'))
+)
+stats_engine.add_listener(state_sync.stats_changed)
+state_sync.load_recent_events(_recent_events_from_db())
 
 
 def _normalize_wear_policy(policy: dict) -> dict:
@@ -218,7 +406,7 @@ def _normalize_wear_policy(policy: dict) -> dict:
 
 
 def _load_wear_policy_from_db() -> dict:
-    conn = sqlite3.connect('strap_monitor.db')
+    conn = db.get_connection()
     c = conn.cursor()
     c.execute('SELECT value FROM system_settings WHERE key = ?', ('wear_policy',))
     row = c.fetchone()
@@ -249,7 +437,7 @@ def save_wear_policy(policy: dict) -> dict:
     normalized = _normalize_wear_policy(policy)
     value = json.dumps(normalized)
 
-    conn = sqlite3.connect('strap_monitor.db')
+    conn = db.get_connection()
     c = conn.cursor()
     c.execute('INSERT OR REPLACE INTO system_settings (key, value) VALUES (?, ?)', ('wear_policy', value))
     conn.commit()
@@ -258,10 +446,23 @@ def save_wear_policy(policy: dict) -> dict:
     global policy_cache
     with policy_lock:
         policy_cache = normalized.copy()
+    _apply_rate_thresholds(normalized)
 
     return normalized.copy()
 
 
+def _apply_rate_thresholds(policy):
+    """측정 주기 제어기에 착용 정책 거리 임계값 반영"""
+    rate_controller.set_thresholds(
+        policy.get('distance_close'),
+        policy.get('distance_open'),
+        enabled=policy.get('distance_enabled', True)
+    )
+
+
+_apply_rate_thresholds(get_wear_policy())
+
+
 def build_policy_command(policy: dict) -> str:
     """BLE 디바이스로 전송할 POLICY 명령 문자열 생성"""
     normalized = _normalize_wear_policy(policy)
@@ -271,87 +472,131 @@ def build_policy_command(policy: dict) -> str:
     return f"POLICY:DIST_EN={distance_enabled};DIST_CLOSE={dist_close};DIST_OPEN={dist_open}"
 
 
+def policy_version(command):
+    """정책 명령 문자열의 버전 식별자 (같은 정책이면 같은 값)"""
+    return hashlib.sha1(command.encode('utf-8')).hexdigest()[:12]
+
+
+def _policy_push_error_message(error):
+    if error == fanout.ERROR_TIMEOUT:
+        return '명령 전송 시간이 초과되었습니다.'
+    if error == fanout.ERROR_DEADLINE:
+        return '전파 제한 시간 내에 처리하지 못했습니다. 재연결 시 다시 적용됩니다.'
+    if error == fanout.ERROR_LOOP_INACTIVE:
+        return '디바이스 연결 루프가 실행 중이 아닙니다.'
+    return error
+
+
 def broadcast_wear_policy(policy: dict):
-    """연결된 모든 디바이스에 정책을 전파"""
+    """연결된 모든 디바이스에 정책을 동시 전파 (이미 적용된 기기는 건너뛰고, 실패/미연결 기기는 재연결 시 적용)"""
     command = build_policy_command(policy)
+    version = policy_version(command)
 
-    with devices_lock:
-        managers = [device['manager'] for device in registered_devices.values()
-                    if device.get('manager')]
+    managers = list(device_registry.managers().values())
 
     started_at = get_kst_now().isoformat()
 
+    def emit_result(manager, success, error=None, skipped=False, deferred=False, elapsed_ms=None):
+        socketio.emit('policy_push_result', {
+            'device_id': manager.device_id,
+            'success': success,
+            'error': error,
+            'skipped': skipped,
+            'deferred': deferred,
+            'elapsed_ms': elapsed_ms,
+            'policy_version': version,
+            'timestamp': get_kst_now().isoformat(),
+            'command': command,
+            'connected': manager.connected
+        }, namespace='/')
+
     def run_broadcast(targets):
         total = len(targets)
+        started = time.monotonic()
         socketio.emit('policy_push_summary', {
             'status': 'started',
             'timestamp': started_at,
             'total': total,
-            'command': command
+            'command': command,
+            'policy_version': version
         }, namespace='/')
 
-        if total == 0:
-            socketio.emit('policy_push_summary', {
-                'status': 'completed',
-                'timestamp': get_kst_now().isoformat(),
-                'total': 0,
-                'success': 0,
-                'failed': 0,
-                'command': command
-            }, namespace='/')
-            return
-
-        success_count = 0
-        failure_count = 0
-
+        counts = {'success': 0, 'failed': 0, 'skipped': 0, 'deferred': 0}
+        pending = {}
         for manager in targets:
-            success = False
-            error = None
-            loop = getattr(manager, 'loop', None)
-
-            if loop and loop.is_running():
-                future = asyncio.run_coroutine_threadsafe(manager.send_command(command), loop)
-                try:
-                    future.result(timeout=10)
-                    success = True
-                    success_count += 1
-                except concurrent.futures.TimeoutError:
-                    error = '명령 전송 시간이 초과되었습니다.'
-                    failure_count += 1
-                    future.cancel()
-                except Exception as exc:
-                    error = str(exc)
-                    failure_count += 1
-                    logger.error(f"Failed to push policy to {manager.device_id}: {exc}")
+            if manager.policy_version == version:
+                # 이미 같은 정책이 적용된 연결
+                counts['skipped'] += 1
+                counts['success'] += 1
+                emit_result(manager, True, skipped=True)
+            elif not manager.connected:
+                # 미연결 기기는 재연결 시 apply_current_policy 로 적용
+                counts['deferred'] += 1
+                counts['failed'] += 1
+                emit_result(manager, False, error='Device not connected', deferred=True)
             else:
-                error = '디바이스 연결 루프가 실행 중이 아닙니다.'
-                failure_count += 1
-
-            socketio.emit('policy_push_result', {
-                'device_id': manager.device_id,
-                'success': success,
-                'error': error,
-                'timestamp': get_kst_now().isoformat(),
-                'command': command,
-                'connected': manager.connected
-            }, namespace='/')
+                pending[manager.device_id] = manager
+
+        def on_result(result):
+            manager = pending[result['device_id']]
+            if result['success']:
+                manager.policy_version = version
+                counts['success'] += 1
+                emit_result(manager, True, elapsed_ms=result['elapsed_ms'])
+            else:
+                counts['failed'] += 1
+                counts['deferred'] += 1
+                if result['error'] not in (fanout.ERROR_TIMEOUT, fanout.ERROR_DEADLINE, fanout.ERROR_LOOP_INACTIVE):
+                    logger.error(f"Failed to push policy to {manager.device_id}: {result['error']}")
+                emit_result(manager, False, error=_policy_push_error_message(result['error']),
+                            deferred=True, elapsed_ms=result['elapsed_ms'])
+
+        if pending:
+            fanout.fan_out(
+                ble_hub, list(pending),
+                lambda device_id: pending[device_id].send_command(command),
+                on_result=on_result,
+                concurrency=POLICY_PUSH_CONCURRENCY,
+                deadline=POLICY_PUSH_DEADLINE_SECONDS,
+                item_timeout=10
+            )
 
         socketio.emit('policy_push_summary', {
             'status': 'completed',
             'timestamp': get_kst_now().isoformat(),
             'total': total,
-            'success': success_count,
-            'failed': failure_count,
-            'command': command
+            'success': counts['success'],
+            'failed': counts['failed'],
+            'skipped': counts['skipped'],
+            'deferred': counts['deferred'],
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 3),
+            'command': command,
+            'policy_version': version
         }, namespace='/')
 
     Thread(target=run_broadcast, args=(managers,), daemon=True).start()
     return len(managers)
 
 
+def register_simulated_devices():
+    """시뮬레이터 전송 계층일 때 가상 스트랩을 DB에 등록 (이미 등록된 주소는 그대로)"""
+    if not hasattr(ble_transport, 'devices'):
+        return 0
+    now = datetime.now().isoformat()
+    rows = [(address.replace(':', '_'), address, name, now) for address, name in ble_transport.devices()]
+    conn = db.get_connection()
+    c = conn.cursor()
+    c.executemany('''INSERT OR IGNORE INTO devices (id, address, name, registered_at)
+                     VALUES (?, ?, ?, ?)''', rows)
+    conn.commit()
+    conn.close()
+    logger.info(f"Registered {len(rows)} simulated straps")
+    return len(rows)
+
+
 def load_devices_from_db():
     """DB에서 등록된 기기 목록 로드 및 자동 연결 시도"""
-    conn = sqlite3.connect('strap_monitor.db')
+    conn = db.get_connection()
     c = conn.cursor()
     c.execute('SELECT id, address, name FROM devices')
     rows = c.fetchall()
@@ -360,36 +605,11 @@ def load_devices_from_db():
     for device_id, address, name in rows:
         logger.info(f"Loading device from DB: {name} ({address})")
         manager = DeviceManager(device_id, address, name)
-        with devices_lock:
-            registered_devices[device_id] = {
-                'address': address,
-                'name': name,
-                'manager': manager,
-                'connected': False,
-                'last_data': None
-            }
-        
-        # 백그라운드에서 연결 시도
-        def connect_device(mgr):
-            loop = asyncio.new_event_loop()
-            mgr.loop = loop
-            asyncio.set_event_loop(loop)
-            try:
-                loop.create_task(mgr.run_forever())
-                loop.run_forever()
-            except Exception as e:
-                logger.error(f"Failed to auto-connect {mgr.name}: {e}")
-            finally:
-                pending = asyncio.all_tasks(loop=loop)
-                for task in pending:
-                    task.cancel()
-                if pending:
-                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                loop.run_until_complete(loop.shutdown_asyncgens())
-                loop.close()
-                mgr.loop = None
-        
-        Thread(target=connect_device, args=(manager,), daemon=True).start()
+        if not device_registry.add(DeviceRecord(device_id, address, name, manager)):
+            continue
+
+        # 공유 BLE 루프에서 연결 시도
+        manager.start()
     
     logger.info(f"Loaded {len(rows)} devices from database")
 
@@ -402,93 +622,169 @@ class DeviceManager:
         self.address = address
         self.name = name
         self.client = None
-        self.connected = False
+        self._connected = False
         self.last_data = None
         self.reconnect_task = None
-        self.loop = None
         self._stop_requested = False
+        self.frame_format = 'text'  # 현재 수신 중인 알림 포맷 (text | binary)
+        self.last_seq = None
+        self.frames_lost = 0
+        self.policy_version = None  # 현재 연결에서 마지막으로 적용된 정책 버전
+        self._link_lost = None  # 연결 끊김 이벤트 (연결마다 새로 생성)
+        self.last_error = None
+        self.commands = CommandPipeline(
+            self._write_command,
+            timeout=COMMAND_RESPONSE_TIMEOUT_SECONDS,
+            max_in_flight=COMMAND_PIPELINE_DEPTH
+        )
         
+    @property
+    def connected(self):
+        return self._connected
+
+    @connected.setter
+    def connected(self, value):
+        # 연결 상태가 바뀔 때만 통계 엔진(미착용 목록)에 반영
+        if value != self._connected:
+            self._connected = value
+            if value:
+                rate_controller.reset(self.device_id)
+                link_quality.reset(self.device_id, self.address)
+            else:
+                # 재부팅 여부를 알 수 없으므로 재연결 시 정책을 다시 적용
+                self.policy_version = None
+                self.commands.fail_all()
+                rate_controller.forget(self.device_id)
+            stats_engine.set_connected(self.device_id, value)
+            state_sync.device_changed(self.device_id)
+
     async def notification_handler(self, sender, data):
         """BLE 알림 수신 핸들러"""
+        started = time.perf_counter()
+        NOTIFICATIONS.inc(self.device_id)
         try:
-            text = data.decode('utf-8', errors='replace')
-            logger.info(f"[{self.device_id}] Received: {text}")
+            # 데이터 파싱 (바이너리 우선, 실패 시 텍스트)
+            parsed = parse_frame(data)
+            if parsed is None:
+                text = data.decode('utf-8', errors='replace')
+                if rx_log.should_log(logging.INFO):
+                    rx_log.log(logging.INFO, f"[{self.device_id}] Received: {text}", device_id=self.device_id)
+                if text.startswith(RESPONSE_PREFIX):
+                    self.commands.handle_response(text)
+                else:
+                    PARSE_FAILURES.inc(self.device_id)
+                return
+
+            frame_format, fields = parsed
+            if rx_log.should_log(logging.INFO):
+                rx_log.log(logging.INFO, f"[{self.device_id}] Received ({frame_format})",
+                           device_id=self.device_id, **fields)
+            self.frame_format = frame_format
+            if frame_format == 'binary':
+                self._track_sequence(fields['seq'])
+
+            # 직원 정보 조회 (메모리 인덱스)
+            employee = employee_index.get(self.device_id)
+            
+            parsed_data = {
+                'device_id': self.device_id,
+                'employee_name': employee.name if employee else None,
+                'timestamp': datetime.now().isoformat(),
+                'distance': fields['dist'],
+                'raw': fields['raw'],
+                'avg': fields['avg'],
+                'diff': fields['diff'],
+                'state': fields['state'],
+                'seq': fields['seq'],
+            }
+            self.last_data = parsed_data
+            link_quality.record(self.device_id)
+
+            # 이벤트 로그 기록
+            self._log_sensor_data(parsed_data)
+            state_changed = self._check_state_change(parsed_data)
+
+            # 활동량에 맞춰 측정 주기 조정
+            distance = fields['dist']
+            interval = rate_controller.observe(
+                self.device_id, None if distance == 'ERR' else int(distance), fields['state'])
+            if interval is not None:
+                asyncio.get_running_loop().create_task(self._apply_sample_rate(interval))
+            
+            # WebSocket 병합 전송 (상태 변경 시 즉시 전송)
+            device_aggregator.publish(
+                self.device_id, parsed_data,
+                department=employee.department if employee else None,
+                urgent=state_changed
+            )
+            if state_changed:
+                state_sync.device_changed(self.device_id)
             
-            # 데이터 파싱
-            match = EXT_PAYLOAD_RE.match(text)
-            if match:
-                # 직원 정보 조회
-                employee_name = None
-                conn = sqlite3.connect('strap_monitor.db')
-                c = conn.cursor()
-                c.execute('SELECT name FROM employees WHERE device_id = ?', (self.device_id,))
-                row = c.fetchone()
-                if row:
-                    employee_name = row[0]
-                conn.close()
-                
-                parsed_data = {
-                    'device_id': self.device_id,
-                    'employee_name': employee_name,
-                    'timestamp': datetime.now().isoformat(),
-                    'distance': match.group('dist'),
-                    'raw': int(match.group('raw')),
-                    'avg': int(match.group('avg')),
-                    'diff': int(match.group('diff')),
-                    'state': match.group('state'),
-                }
-                self.last_data = parsed_data
-
-                # 글로벌 캐시에 최근 데이터 반영 (프론트엔드 목록 동기화용)
-                with devices_lock:
-                    entry = registered_devices.get(self.device_id)
-                    if isinstance(entry, dict):
-                        entry['last_data'] = parsed_data
-                        entry['connected'] = True
-                
-                # 이벤트 로그 기록
-                self._log_sensor_data(parsed_data)
-                self._check_state_change(parsed_data)
-                
-                # WebSocket으로 프론트엔드에 전송
-                socketio.emit('device_data', parsed_data, namespace='/')
-                
         except Exception as e:
             logger.error(f"[{self.device_id}] Notification error: {e}")
+        finally:
+            NOTIFICATION_SECONDS.observe(time.perf_counter() - started)
     
+    def _track_sequence(self, seq):
+        """바이너리 프레임 순번으로 유실된 알림 수 추정"""
+        if self.last_seq is not None:
+            gap = (seq - self.last_seq - 1) & 0xFFFF
+            if gap < 0x8000:
+                self.frames_lost += gap
+        self.last_seq = seq
+
+    async def negotiate_frame_format(self):
+        """바이너리 알림 프레임 요청 (미지원 펌웨어는 RESP:UNKNOWN 후 텍스트 유지)"""
+        self.frame_format = 'text'
+        self.last_seq = None
+        if BLE_FRAME_FORMAT != 'binary':
+            return
+        try:
+            reply = await self.send_command(FORMAT_BINARY_COMMAND)
+        except Exception as exc:
+            logger.warning(f"[{self.device_id}] Frame format negotiation failed, staying on text: {exc}")
+            return
+        if reply['response'].startswith(FORMAT_BINARY_ACK):
+            self.frame_format = 'binary'
+            logger.info(f"[{self.device_id}] Binary notification frames negotiated "
+                        f"({reply['latency_ms']:.0f} ms)")
+
     async def apply_current_policy(self):
         """현재 설정된 착용 정책을 디바이스에 적용"""
         try:
             command = build_policy_command(get_wear_policy())
-            await self.send_command(command)
-            logger.info(f"[{self.device_id}] Wear policy applied: {command}")
+            reply = await self.send_command(command)
+            self.policy_version = policy_version(command)
+            logger.info(f"[{self.device_id}] Wear policy applied: {command} ({reply['response']})")
         except Exception as exc:
             logger.error(f"[{self.device_id}] Failed to apply wear policy: {exc}")
 
+    async def _apply_sample_rate(self, interval_ms):
+        """RATE 명령 전송 후 RESP:RATE= 로 확인된 실제 주기를 제어기에 반영"""
+        try:
+            reply = await self.send_command(f'RATE:{interval_ms}')
+            applied = int(reply['response'].split('=', 1)[1])
+        except Exception as exc:
+            logger.warning(f"[{self.device_id}] Failed to set sample interval {interval_ms} ms: {exc}")
+            rate_controller.failed(self.device_id)
+            return
+        rate_controller.confirm(self.device_id, applied)
+        state_sync.device_changed(self.device_id)
+        logger.debug(f"[{self.device_id}] Sample interval set to {applied} ms "
+                     f"({rate_controller.level(self.device_id)})")
+
     def _log_sensor_data(self, data):
-        """센서 데이터 로그 저장 (10초마다 샘플링)"""
-        if not hasattr(self, '_last_log_time'):
-            self._last_log_time = 0
-        
-        now = time.time()
-        if now - self._last_log_time >= 10:  # 10초마다 저장
-            self._last_log_time = now
-            try:
-                conn = sqlite3.connect('strap_monitor.db')
-                c = conn.cursor()
-                c.execute('''INSERT INTO sensor_data 
-                    (device_id, distance, raw_hall, avg_hall, diff_hall, state)
-                    VALUES (?, ?, ?, ?, ?, ?)''',
-                    (self.device_id, 
-                     None if data['distance'] == 'ERR' else int(data['distance']),
-                     data['raw'], data['avg'], data['diff'], data['state']))
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                logger.error(f"Failed to log sensor data: {e}")
+        """센서 데이터를 시계열 저장소에 기록 (원시 링버퍼 + 롤업)"""
+        distance = data['distance']
+        timeseries.record(
+            self.device_id,
+            None if distance == 'ERR' else int(distance),
+            data['diff'],
+            data['state']
+        )
     
     def _check_state_change(self, data):
-        """착용 상태 변경 감지 및 로그"""
+        """착용 상태 변경 감지 및 로그 (변경 시 True 반환)"""
         if not hasattr(self, '_last_state'):
             self._last_state = None
         
@@ -498,40 +794,46 @@ class DeviceManager:
             event_type = 'wear_on' if current_state == 'CLOSED' else 'wear_off'
             severity = 'info' if current_state == 'CLOSED' else 'warning'
             
-            # 이벤트 로그 저장
+            # 이벤트 로그 저장 (쓰기 지연 작성기로 전달 후 즉시 반환)
             try:
-                conn = sqlite3.connect('strap_monitor.db')
-                c = conn.cursor()
-                
-                # 직원 ID 조회
-                c.execute('SELECT id FROM employees WHERE device_id = ?', (self.device_id,))
-                row = c.fetchone()
-                employee_id = row[0] if row else None
+                # 직원 ID 조회 (메모리 인덱스)
+                employee = employee_index.get(self.device_id)
+                employee_id = employee.employee_id if employee else None
                 
                 # 이벤트 로그
-                c.execute('''INSERT INTO event_logs 
-                    (device_id, employee_id, event_type, event_data, severity)
-                    VALUES (?, ?, ?, ?, ?)''',
-                    (self.device_id, employee_id, event_type, 
-                     json.dumps(data), severity))
+                logged_at = _utc_timestamp()
+                db_writer.submit('''INSERT INTO event_logs 
+                    (timestamp, device_id, employee_id, event_type, event_data, severity)
+                    VALUES (?, ?, ?, ?, ?, ?)''',
+                    (logged_at, self.device_id, employee_id, event_type,
+                     json.dumps(data), severity), critical=True)
                 
                 # 착용 세션 관리
+                now_local = datetime.now().isoformat(' ')
                 if current_state == 'CLOSED':
                     # 새 세션 시작
-                    c.execute('''INSERT INTO wear_sessions 
+                    db_writer.submit('''INSERT INTO wear_sessions 
                         (device_id, employee_id, start_time)
                         VALUES (?, ?, ?)''',
-                        (self.device_id, employee_id, datetime.now()))
+                        (self.device_id, employee_id, now_local), critical=True)
                 else:
                     # 기존 세션 종료
-                    c.execute('''UPDATE wear_sessions 
+                    db_writer.submit('''UPDATE wear_sessions 
                         SET end_time = ?, is_active = 0,
                             duration_seconds = CAST((julianday(?) - julianday(start_time)) * 86400 AS INTEGER)
                         WHERE device_id = ? AND is_active = 1''',
-                        (datetime.now(), datetime.now(), self.device_id))
+                        (now_local, now_local, self.device_id), critical=True)
+                    wear_aggregates.session_closed()
                 
-                conn.commit()
-                conn.close()
+                stats_engine.record_state_change(self.device_id, employee_id, event_type, logged_at)
+                state_sync.event_logged({
+                    'timestamp': logged_at,
+                    'device_id': self.device_id,
+                    'employee_id': employee_id,
+                    'employee_name': employee.name if employee else None,
+                    'event_type': event_type,
+                    'severity': severity
+                })
                 
                 # WebSocket으로 이벤트 전송
                 socketio.emit('state_change', {
@@ -546,54 +848,81 @@ class DeviceManager:
                 logger.error(f"Failed to log state change: {e}")
             
             self._last_state = current_state
+            return True
+        return False
     
     async def run_forever(self):
-        """지속적으로 연결을 유지하며 필요 시 재시도"""
-        backoff_seconds = 3
+        """지속적으로 연결을 유지하며 끊기면 지터가 있는 지수 백오프로 재시도"""
         self._stop_requested = False
+        backoff = Backoff(RECONNECT_BASE_SECONDS, RECONNECT_MAX_SECONDS)
+        failures = 0
         while not self._stop_requested:
             try:
-                await self.connect()
+                established = await self.connect(failures + 1)
             except Exception as exc:
                 logger.error(f"[{self.device_id}] Run loop error: {exc}")
+                established = False
+            await self.disconnect()
             if self._stop_requested:
                 break
-            # 연결이 종료된 경우 잠시 대기 후 재시도
-            if self._stop_requested:
-                break
-            await asyncio.sleep(backoff_seconds)
+
+            if established:
+                # 정상 연결 후 끊김 - 백오프를 처음부터 다시
+                backoff.reset()
+                failures = 0
+            else:
+                failures += 1
+                if failures == RECONNECT_NOTIFY_AFTER:
+                    socketio.emit('device_disconnected', {
+                        'device_id': self.device_id,
+                        'error': self.last_error
+                    }, namespace='/')
+
+            delay = backoff.next()
+            logger.info(f"[{self.device_id}] Reconnecting in {delay:.1f}s...")
+            socketio.emit('device_status', {
+                'device_id': self.device_id,
+                'status': 'reconnecting',
+                'message': f'{delay:.0f}초 후 자동 재연결...',
+                'timestamp': get_kst_now().isoformat()
+            }, namespace='/')
+            await asyncio.sleep(delay)
+
+    def start(self):
+        """공유 BLE 루프에 연결 유지 태스크 등록"""
+        self._stop_requested = False
+        ble_hub.spawn(self.device_id, self.run_forever)
 
     def request_stop(self):
-        """백그라운드 루프 정지 요청"""
+        """백그라운드 태스크 정지 요청"""
         self._stop_requested = True
         self.connected = False
-        with devices_lock:
-            entry = registered_devices.get(self.device_id)
-            if isinstance(entry, dict):
-                entry['connected'] = False
-        if self.loop and self.loop.is_running():
-            self.loop.call_soon_threadsafe(self.loop.stop)
-
-    async def connect(self):
-        """디바이스 연결 (재연결 로직 포함)"""
-        max_retries = 3
-        retry_delay = 5  # 초
-        
-        for attempt in range(max_retries):
-            if self._stop_requested:
-                break
-            try:
-                # 연결 시도 상태 전송
-                socketio.emit('device_status', {
-                    'device_id': self.device_id,
-                    'status': 'connecting',
-                    'message': f'연결 시도 중... ({attempt + 1}/{max_retries})',
-                    'timestamp': get_kst_now().isoformat()
-                }, namespace='/')
-                
-                logger.info(f"[{self.device_id}] Connecting to {self.address}... (Attempt {attempt + 1}/{max_retries})")
-                self.client = BleakClient(self.address, timeout=15.0)
-                
+        ble_hub.cancel(self.device_id)
+        ble_hub.release(self.device_id)
+
+    def _on_disconnected(self, client):
+        """전송 계층 disconnected_callback - 연결 감시 대기를 즉시 깨움"""
+        if self._link_lost is not None:
+            self._link_lost.set()
+
+    async def connect(self, attempt=1):
+        """1회 연결 후 끊길 때까지 대기 (연결에 성공했으면 True, 실패하면 False)"""
+        try:
+            # 연결 시도 상태 전송
+            socketio.emit('device_status', {
+                'device_id': self.device_id,
+                'status': 'connecting',
+                'message': f'연결 시도 중... ({attempt}회차)',
+                'timestamp': get_kst_now().isoformat()
+            }, namespace='/')
+
+            # 어댑터에 동시 연결 시도가 몰리지 않도록 순서대로 진행
+            async with connect_gate.slot():
+                logger.info(f"[{self.device_id}] Connecting to {self.address}... (Attempt {attempt})")
+                self._link_lost = asyncio.Event()
+                self.client = ble_transport.client(self.address, timeout=15.0,
+                                                   disconnected_callback=self._on_disconnected)
+
                 # BLE 스캔 및 연결
                 socketio.emit('device_status', {
                     'device_id': self.device_id,
@@ -601,169 +930,98 @@ class DeviceManager:
                     'message': 'BLE 디바이스 검색 중...',
                     'timestamp': get_kst_now().isoformat()
                 }, namespace='/')
-                
+
                 await self.client.connect()
-                self.connected = True
+            self.connected = True
+
+            # 연결 성공 상태 전송
+            socketio.emit('device_status', {
+                'device_id': self.device_id,
+                'status': 'connected',
+                'message': '연결 성공! 알림 구독 중...',
+                'timestamp': get_kst_now().isoformat()
+            }, namespace='/')
 
-                with devices_lock:
-                    entry = registered_devices.get(self.device_id)
-                    if isinstance(entry, dict):
-                        entry['connected'] = True
-                
-                # 연결 성공 상태 전송
-                socketio.emit('device_status', {
-                    'device_id': self.device_id,
-                    'status': 'connected',
-                    'message': '연결 성공! 알림 구독 중...',
-                    'timestamp': get_kst_now().isoformat()
-                }, namespace='/')
-                
-                # DB에 마지막 연결 시간 업데이트
-                try:
-                    conn = sqlite3.connect('strap_monitor.db')
-                    c = conn.cursor()
-                    c.execute('UPDATE devices SET last_connected = ? WHERE id = ?',
-                              (get_kst_now().isoformat(), self.device_id))
-                    conn.commit()
-                    conn.close()
-                except Exception as e:
-                    logger.error(f"Failed to update last_connected: {e}")
-                
-                logger.info(f"[{self.device_id}] Connected! Subscribing to notifications...")
-                await self.client.start_notify(STRAP_NOTIFY_UUID, self.notification_handler)
+            # DB에 마지막 연결 시간 업데이트
+            db_writer.submit('UPDATE devices SET last_connected = ? WHERE id = ?',
+                             (get_kst_now().isoformat(), self.device_id))
+
+            logger.info(f"[{self.device_id}] Connected! Subscribing to notifications...")
+            await self.client.start_notify(STRAP_NOTIFY_UUID, self.notification_handler)
+
+            # 알림 포맷 협상 및 최신 착용 정책 적용
+            await self.negotiate_frame_format()
+            await self.apply_current_policy()
+
+            # 연결 완료 상태 알림
+            socketio.emit('device_connected', {
+                'device_id': self.device_id,
+                'address': self.address,
+                'name': self.name
+            }, namespace='/')
+
+            socketio.emit('device_status', {
+                'device_id': self.device_id,
+                'status': 'ready',
+                'message': '정상 작동 중',
+                'timestamp': get_kst_now().isoformat()
+            }, namespace='/')
+            CONNECT_ATTEMPTS.inc('success')
+
+        except asyncio.TimeoutError:
+            self.last_error = "연결 시간 초과 (15초)"
+            logger.error(f"[{self.device_id}] {self.last_error}")
+            self._connect_failed(self.last_error)
+            return False
+
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"[{self.device_id}] Connection error (Attempt {attempt}): {e}")
+
+            # 상세한 에러 메시지
+            if "not found" in error_msg.lower():
+                error_msg = "디바이스를 찾을 수 없습니다. 전원과 거리를 확인하세요."
+            elif "permission" in error_msg.lower():
+                error_msg = "권한 오류. 블루투스 권한을 확인하세요."
+            elif "already connected" in error_msg.lower():
+                error_msg = "이미 다른 곳에 연결되어 있습니다."
+            else:
+                error_msg = f"연결 실패: {error_msg}"
+            self.last_error = error_msg
+            self._connect_failed(error_msg)
+            return False
+
+        # 연결 유지 - 끊김 콜백 또는 disconnect() 가 이벤트를 설정할 때까지 대기
+        await self._link_lost.wait()
+        if self.connected and not self._stop_requested:
+            self.connected = False
+            LINKS_LOST.inc()
+            logger.warning(f"[{self.device_id}] Connection lost, attempting reconnect...")
+            socketio.emit('device_status', {
+                'device_id': self.device_id,
+                'status': 'disconnected',
+                'message': '연결 끊김 - 재연결 시도 중...',
+                'timestamp': get_kst_now().isoformat()
+            }, namespace='/')
+        return True
+
+    def _connect_failed(self, error_msg):
+        self.connected = False
+        CONNECT_ATTEMPTS.inc('failure')
+        if self._stop_requested:
+            return
+        socketio.emit('device_status', {
+            'device_id': self.device_id,
+            'status': 'error',
+            'message': f'❌ {error_msg}',
+            'timestamp': get_kst_now().isoformat()
+        }, namespace='/')
 
-                # 최신 착용 정책 적용
-                await self.apply_current_policy()
-                
-                # 연결 완료 상태 알림
-                socketio.emit('device_connected', {
-                    'device_id': self.device_id,
-                    'address': self.address,
-                    'name': self.name
-                }, namespace='/')
-                
-                socketio.emit('device_status', {
-                    'device_id': self.device_id,
-                    'status': 'ready',
-                    'message': '정상 작동 중',
-                    'timestamp': get_kst_now().isoformat()
-                }, namespace='/')
-                
-                # 연결 유지 및 상태 모니터링
-                reconnect_needed = False
-                while self.connected:
-                    if not self.client.is_connected:
-                        reconnect_needed = True
-                        self.connected = False
-                        with devices_lock:
-                            entry = registered_devices.get(self.device_id)
-                            if isinstance(entry, dict):
-                                entry['connected'] = False
-                        logger.warning(f"[{self.device_id}] Connection lost, attempting reconnect...")
-                        socketio.emit('device_status', {
-                            'device_id': self.device_id,
-                            'status': 'disconnected',
-                            'message': '연결 끊김 - 재연결 시도 중...',
-                            'timestamp': get_kst_now().isoformat()
-                        }, namespace='/')
-                        break
-                    await asyncio.sleep(1)
-                    
-                # 연결이 끊어진 경우 자동 재연결 시도
-                if reconnect_needed:
-                    logger.info(f"[{self.device_id}] Auto-reconnecting in {retry_delay}s...")
-                    socketio.emit('device_status', {
-                        'device_id': self.device_id,
-                        'status': 'reconnecting',
-                        'message': f'{retry_delay}초 후 자동 재연결...',
-                        'timestamp': get_kst_now().isoformat()
-                    }, namespace='/')
-                    if self._stop_requested:
-                        break
-                    await asyncio.sleep(retry_delay)
-                    continue  # 재연결 시도
-                else:
-                    break  # 수동 종료
-                    
-            except asyncio.TimeoutError:
-                if self._stop_requested:
-                    break
-                error_msg = f"연결 시간 초과 (15초)"
-                logger.error(f"[{self.device_id}] {error_msg}")
-                self.connected = False
-                with devices_lock:
-                    entry = registered_devices.get(self.device_id)
-                    if isinstance(entry, dict):
-                        entry['connected'] = False
-                
-                socketio.emit('device_status', {
-                    'device_id': self.device_id,
-                    'status': 'error',
-                    'message': f'❌ {error_msg}',
-                    'timestamp': get_kst_now().isoformat()
-                }, namespace='/')
-                
-                if attempt < max_retries - 1:
-                    logger.info(f"[{self.device_id}] Retrying in {retry_delay}s...")
-                    if self._stop_requested:
-                        break
-                    await asyncio.sleep(retry_delay)
-                else:
-                    socketio.emit('device_disconnected', {
-                        'device_id': self.device_id,
-                        'error': error_msg
-                    }, namespace='/')
-                    break
-                    
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"[{self.device_id}] Connection error (Attempt {attempt + 1}): {e}")
-                self.connected = False
-                with devices_lock:
-                    entry = registered_devices.get(self.device_id)
-                    if isinstance(entry, dict):
-                        entry['connected'] = False
-                if self._stop_requested:
-                    break
-                
-                # 상세한 에러 메시지
-                if "not found" in error_msg.lower():
-                    error_msg = "디바이스를 찾을 수 없습니다. 전원과 거리를 확인하세요."
-                elif "permission" in error_msg.lower():
-                    error_msg = "권한 오류. 블루투스 권한을 확인하세요."
-                elif "already connected" in error_msg.lower():
-                    error_msg = "이미 다른 곳에 연결되어 있습니다."
-                else:
-                    error_msg = f"연결 실패: {error_msg}"
-                
-                socketio.emit('device_status', {
-                    'device_id': self.device_id,
-                    'status': 'error',
-                    'message': f'❌ {error_msg}',
-                    'timestamp': get_kst_now().isoformat()
-                }, namespace='/')
-                
-                if attempt < max_retries - 1:
-                    logger.info(f"[{self.device_id}] Retrying in {retry_delay}s...")
-                    if self._stop_requested:
-                        break
-                    await asyncio.sleep(retry_delay)
-                else:
-                    socketio.emit('device_disconnected', {
-                        'device_id': self.device_id,
-                        'error': error_msg
-                    }, namespace='/')
-                    break
-        
-        await self.disconnect()
-    
     async def disconnect(self):
         """디바이스 연결 해제"""
         self.connected = False
-        with devices_lock:
-            entry = registered_devices.get(self.device_id)
-            if isinstance(entry, dict):
-                entry['connected'] = False
+        if self._link_lost is not None:
+            self._link_lost.set()
         if self.client:
             try:
                 await self.client.stop_notify(STRAP_NOTIFY_UUID)
@@ -773,19 +1031,34 @@ class DeviceManager:
             finally:
                 self.client = None
     
-    async def send_command(self, command):
-        """디바이스에 명령 전송"""
+    async def send_command(self, command, timeout=None):
+        """디바이스에 명령 전송 후 RESP: 응답까지 대기 → {command, response, accepted, latency_ms}"""
         if not self.client or not self.connected:
             raise Exception("Device not connected")
-        
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            reply = await self.commands.request(command, timeout=timeout)
+            outcome = 'accepted' if reply['accepted'] else 'rejected'
+            return reply
+        except TimeoutError:
+            outcome = 'timeout'
+            raise
+        finally:
+            COMMAND_RTT_SECONDS.observe(time.perf_counter() - started, response_key(command), outcome)
+
+    async def _write_command(self, command):
+        if not self.client or not self.connected:
+            raise Exception("Device not connected")
+
         try:
             await self.client.write_gatt_char(
                 STRAP_WRITE_UUID, 
                 command.encode('utf-8'), 
                 response=True
             )
-            logger.info(f"[{self.device_id}] Sent command: {command}")
-            return True
+            if tx_log.should_log(logging.INFO):
+                tx_log.log(logging.INFO, f"[{self.device_id}] Sent command: {command}", device_id=self.device_id)
         except Exception as e:
             logger.error(f"[{self.device_id}] Command error: {e}")
             raise
@@ -794,29 +1067,32 @@ class DeviceManager:
 # ============= 공통 유틸리티 =============
 
 def _resolve_manager(device_id):
-    with devices_lock:
-        device = registered_devices.get(device_id)
-        if not device:
-            return None, None
-        return device, device.get('manager')
+    record = device_registry.get(device_id)
+    if not record:
+        return None, None
+    return record, record.manager
 
 
 def _dispatch_ble_command(manager, command, timeout=10):
-    loop = getattr(manager, 'loop', None)
-    if not loop or not loop.is_running():
-        raise RuntimeError('loop_inactive')
-
-    future = asyncio.run_coroutine_threadsafe(manager.send_command(command), loop)
+    """명령 전송 후 디바이스 응답 dict 반환 (응답 대기 포함)"""
     try:
-        future.result(timeout=timeout)
-        return True
-    except concurrent.futures.TimeoutError as exc:
-        future.cancel()
-        raise TimeoutError('timeout') from exc
+        return ble_hub.run(manager.device_id, manager.send_command(command), timeout=timeout)
+    except TimeoutError:
+        raise
     except Exception as exc:
         raise RuntimeError(str(exc)) from exc
 
 
+def _stop_manager(manager, timeout=10):
+    """공유 BLE 루프에서 연결을 해제하고 연결 유지 태스크 정지"""
+    try:
+        ble_hub.run(manager.device_id, manager.disconnect(), timeout=timeout)
+    except Exception as exc:
+        logger.error(f"Disconnect failed for {manager.device_id}: {exc}")
+    finally:
+        manager.request_stop()
+
+
 def _coerce_int(value, default=None):
     try:
         if value is None:
@@ -826,10 +1102,24 @@ def _coerce_int(value, default=None):
         return default
 
 
-def _send_command_response(manager, command, extra=None):
+def _send_command_response(manager, command, extra=None, wait=True):
+    """명령 전송 응답 (wait=False 면 1대짜리 명령 작업으로 넘기고 202 와 job_id 즉시 반환)"""
+    if not wait:
+        job = command_jobs.submit(command, {manager.device_id: manager})
+        payload = {'success': True, 'command': command, 'job_id': job.id}
+        if isinstance(extra, dict):
+            payload.update(extra)
+        return jsonify(payload), 202
+
     try:
-        _dispatch_ble_command(manager, command)
-        payload = {'success': True, 'command': command}
+        reply = _dispatch_ble_command(manager, command)
+        payload = {
+            'success': True,
+            'command': command,
+            'response': reply['response'],
+            'accepted': reply['accepted'],
+            'latency_ms': reply['latency_ms']
+        }
         if isinstance(extra, dict):
             payload.update(extra)
         return jsonify(payload)
@@ -884,7 +1174,7 @@ def api_login():
     password_hash = hashlib.sha256(password.encode()).hexdigest()
     
     # DB에서 사용자 확인
-    conn = sqlite3.connect('strap_monitor.db')
+    conn = db.get_connection()
     c = conn.cursor()
     c.execute('SELECT id, username, role FROM users WHERE username = ? AND password_hash = ?',
               (username, password_hash))
@@ -936,90 +1226,87 @@ def test_page():
     return render_template('test.html')
 
 
+def _connected_devices():
+    return sum(1 for record in device_registry.records() if record.connected)
+
+
+metrics.REGISTRY.gauge('strap_threads', 'Live Python threads', active_count)
+metrics.REGISTRY.gauge('strap_ble_hub_loops', 'Running BLE hub event loops', lambda: ble_hub.stats()['loops'])
+metrics.REGISTRY.gauge('strap_ble_hub_tasks', 'Device tasks on the BLE hub', lambda: ble_hub.stats()['tasks'])
+metrics.REGISTRY.gauge('strap_devices_registered', 'Registered devices', lambda: len(device_registry))
+metrics.REGISTRY.gauge('strap_devices_connected', 'Connected devices', _connected_devices)
+metrics.REGISTRY.gauge('strap_links_degraded', 'Connected devices whose frames lag the expected RATE cadence',
+                       lambda: len(link_quality.stats()['degraded']))
+metrics.REGISTRY.gauge('strap_db_writer_queue_depth', 'Pending write-behind rows',
+                       lambda: db_writer.stats()['queue_depth'])
+metrics.REGISTRY.gauge('strap_connect_gate_waiting', 'Connection attempts waiting for the connect gate',
+                       lambda: connect_gate.stats()['waiting'])
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus 텍스트 형식 지표"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """서버 상태 확인"""
     return jsonify({'status': 'ok', 'timestamp': datetime.now().isoformat()})
 
 
+def _mark_registered(devices):
+    registered = device_registry.addresses()
+    for device in devices:
+        device['registered'] = device['address'] in registered
+    return devices
+
+
+def _emit_scan_event(event, data):
+    """스캔 서비스 이벤트에 등록 여부를 붙여 전송 (scan_result / scan_complete)"""
+    if 'device' in data:
+        _mark_registered([data['device']])
+    if 'devices' in data:
+        _mark_registered(data['devices'])
+    socketio.emit(event, data, namespace='/')
+
+
+def _scan_payload(window=None):
+    devices = _mark_registered(scan_service.devices())
+    payload = {'devices': devices, 'scanning': scan_service.stats()['scanning']}
+    if window is not None:
+        payload['window_id'] = window.id
+    return payload
+
+
+@app.route('/api/scan', methods=['GET'])
+@login_required
+def get_scan_results():
+    """최근 광고 캐시 조회 (스캔 창을 열지 않음)"""
+    return jsonify(_scan_payload())
+
+
 @app.route('/api/scan', methods=['POST'])
 @login_required
 def scan_devices():
-    """BLE 디바이스 스캔"""
-    global scanning
-    
-    if scanning:
-        return jsonify({'error': 'Scan already in progress'}), 409
-    
-    timeout = request.json.get('timeout', 5.0) if request.json else 5.0
-    
-    async def do_scan():
-        global scanning
-        scanning = True
-        try:
-            logger.info(f"Starting BLE scan (timeout={timeout}s)...")
-            devices = await BleakScanner.discover(timeout=timeout)
-            
-            results = []
-            for device in devices:
-                # ESP32-STRAP 디바이스만 필터링 (옵션)
-                if device.name and 'ESP32' in device.name:
-                    results.append({
-                        'address': device.address,
-                        'name': device.name or 'Unknown',
-                        'rssi': getattr(device, 'rssi', None)
-                    })
-            
-            logger.info(f"Scan complete. Found {len(results)} ESP32 devices")
-            socketio.emit('scan_complete', {'devices': results}, namespace='/')
-            
-            return results
-        finally:
-            scanning = False
-    
-    # 비동기 스캔 실행
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    results = loop.run_until_complete(do_scan())
-    loop.close()
-    
-    return jsonify({'devices': results})
+    """BLE 디바이스 스캔 - 캐시된 결과를 즉시 반환하고 timeout 초 동안 새 기기를 scan_result 로 전송"""
+    payload = request.get_json(silent=True) or {}
+    try:
+        timeout = _clamp(float(payload.get('timeout', 5.0)), 1.0, 60.0)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'timeout 값은 숫자여야 합니다.'}), 400
+
+    window = scan_service.request_window(timeout)
+    response = _scan_payload(window)
+    response['window_seconds'] = timeout
+    return jsonify(response)
 
 
 @app.route('/api/devices', methods=['GET'])
 def get_devices():
     """등록된 디바이스 목록 조회"""
-    conn = sqlite3.connect('strap_monitor.db')
-    c = conn.cursor()
+    device_list = _device_summary()
 
-    with devices_lock:
-        device_list = []
-        for device_id, device in registered_devices.items():
-            employee_name = None
-            try:
-                c.execute('SELECT name FROM employees WHERE device_id = ?', (device_id,))
-                row = c.fetchone()
-                if row:
-                    employee_name = row[0]
-            except Exception as exc:
-                logger.error(f"Failed to fetch employee for {device_id}: {exc}")
-
-            manager = device.get('manager')
-            last_data = device.get('last_data') or (manager.last_data if manager else None)
-            if last_data and employee_name and not last_data.get('employee_name'):
-                last_data = dict(last_data)
-                last_data['employee_name'] = employee_name
-
-            device_list.append({
-                'id': device_id,
-                'address': device['address'],
-                'name': device['name'],
-                'connected': device.get('connected', manager.connected if manager else False),
-                'employee_name': employee_name,
-                'last_data': last_data
-            })
-
-    conn.close()
     return jsonify({'devices': device_list})
 
 
@@ -1035,24 +1322,17 @@ def register_device():
     
     device_id = address.replace(':', '_')
     
-    with devices_lock:
-        if device_id in registered_devices:
-            return jsonify({'error': 'Device already registered'}), 409
-        
-        # DeviceManager 생성
-        manager = DeviceManager(device_id, address, name)
-        
-        registered_devices[device_id] = {
-            'address': address,
-            'name': name,
-            'manager': manager,
-            'connected': False,
-            'last_data': None
-        }
+    if device_id in device_registry:
+        return jsonify({'error': 'Device already registered'}), 409
+
+    # DeviceManager 생성
+    manager = DeviceManager(device_id, address, name)
+    if not device_registry.add(DeviceRecord(device_id, address, name, manager)):
+        return jsonify({'error': 'Device already registered'}), 409
     
     # DB에 저장
     try:
-        conn = sqlite3.connect('strap_monitor.db')
+        conn = db.get_connection()
         c = conn.cursor()
         c.execute('''INSERT OR REPLACE INTO devices (id, address, name, registered_at)
                      VALUES (?, ?, ?, ?)''',
@@ -1062,27 +1342,9 @@ def register_device():
     except Exception as e:
         logger.error(f"Failed to save device to DB: {e}")
     
-    # 백그라운드에서 연결 시작
-    def connect_in_thread():
-        loop = asyncio.new_event_loop()
-        manager.loop = loop
-        asyncio.set_event_loop(loop)
-        try:
-            loop.create_task(manager.run_forever())
-            loop.run_forever()
-        except Exception as exc:
-            logger.error(f"Failed to connect {manager.device_id}: {exc}")
-        finally:
-            pending = asyncio.all_tasks(loop=loop)
-            for task in pending:
-                task.cancel()
-            if pending:
-                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-            loop.run_until_complete(loop.shutdown_asyncgens())
-            loop.close()
-            manager.loop = None
-    
-    Thread(target=connect_in_thread, daemon=True).start()
+    # 공유 BLE 루프에서 연결 시작
+    manager.start()
+    state_sync.device_changed(device_id)
     
     return jsonify({
         'message': 'Device registered and connecting',
@@ -1093,36 +1355,23 @@ def register_device():
 @app.route('/api/devices/<device_id>', methods=['DELETE'])
 def unregister_device(device_id):
     """디바이스 등록 해제"""
-    with devices_lock:
-        if device_id not in registered_devices:
-            return jsonify({'error': 'Device not found'}), 404
-        
-        device = registered_devices[device_id]
-        manager = device.get('manager')
-        
-        if manager:
-            loop = getattr(manager, 'loop', None)
-            if loop and loop.is_running():
-                try:
-                    future = asyncio.run_coroutine_threadsafe(manager.disconnect(), loop)
-                    future.result(timeout=10)
-                except Exception as exc:
-                    logger.error(f"Disconnect failed for {device_id}: {exc}")
-                finally:
-                    manager.request_stop()
-            else:
-                # 루프가 비활성화된 경우 직접 상태 초기화
-                try:
-                    asyncio.run(manager.disconnect())
-                except RuntimeError:
-                    pass
-                manager.connected = False
-        
-        del registered_devices[device_id]
+    record = device_registry.get(device_id)
+    if not record:
+        return jsonify({'error': 'Device not found'}), 404
+
+    # 연결 해제 대기는 이 요청만 기다림 (해제가 끝날 때까지 레코드를 남겨 같은 주소 재등록 방지)
+    if record.manager:
+        _stop_manager(record.manager)
+    if device_registry.remove(device_id, record) is None:
+        return jsonify({'error': 'Device not found'}), 404
+
+    timeseries.forget(device_id)
+    link_quality.forget(device_id)
+    state_sync.device_removed(device_id)
     
     # DB에서 삭제
     try:
-        conn = sqlite3.connect('strap_monitor.db')
+        conn = db.get_connection()
         c = conn.cursor()
         c.execute('DELETE FROM devices WHERE id = ?', (device_id,))
         conn.commit()
@@ -1142,25 +1391,19 @@ def send_device_command(device_id):
     if not manager:
         return jsonify({'error': 'Device manager not initialized'}), 500
 
-    command = request.json.get('command')
+    payload = request.json or {}
+    command = payload.get('command')
     if not command:
         return jsonify({'error': 'Command required'}), 400
-    return _send_command_response(manager, command, {'message': 'Command sent'})
+    return _send_command_response(manager, command, {'message': 'Command sent'},
+                                  wait=payload.get('wait', True) is not False)
 
 
-@app.route('/api/devices/<device_id>/relay', methods=['POST'])
-@login_required
-def api_control_relay(device_id):
-    device, manager = _resolve_manager(device_id)
-    if not device:
-        return jsonify({'error': 'Device not found'}), 404
-    if not manager:
-        return jsonify({'error': 'Device manager not initialized'}), 500
-
-    payload = request.json or {}
+def _relay_command(payload):
+    """릴레이 요청 → (명령, 응답 추가 필드), 잘못된 값은 ValueError"""
     mode = str(payload.get('mode') or payload.get('state') or '').strip().lower()
     if mode not in {'on', 'off', 'pulse'}:
-        return jsonify({'error': 'mode 값은 on, off, pulse 중 하나여야 합니다.'}), 400
+        raise ValueError('mode 값은 on, off, pulse 중 하나여야 합니다.')
 
     if mode == 'on':
         command = 'RELAY:ON'
@@ -1175,26 +1418,18 @@ def api_control_relay(device_id):
         duration = _clamp(duration or 200, 20, 5000)
         command = f'RELAY:PULSE:{duration}'
 
-    return _send_command_response(manager, command, {
+    return command, {
         'message': 'Relay command dispatched',
         'target': 'relay',
         'mode': mode
-    })
-
+    }
 
-@app.route('/api/devices/<device_id>/buzzer', methods=['POST'])
-@login_required
-def api_control_buzzer(device_id):
-    device, manager = _resolve_manager(device_id)
-    if not device:
-        return jsonify({'error': 'Device not found'}), 404
-    if not manager:
-        return jsonify({'error': 'Device manager not initialized'}), 500
 
-    payload = request.json or {}
+def _buzzer_command(payload):
+    """부저 요청 → (명령, 응답 추가 필드), 잘못된 값은 ValueError"""
     mode = str(payload.get('mode') or payload.get('state') or 'beep').strip().lower()
     if mode not in {'on', 'off', 'pulse', 'beep'}:
-        return jsonify({'error': 'mode 값은 on, off, pulse, beep 중 하나여야 합니다.'}), 400
+        raise ValueError('mode 값은 on, off, pulse, beep 중 하나여야 합니다.')
 
     freq = _coerce_int(payload.get('frequency_hz'), None)
     if freq is None:
@@ -1221,31 +1456,23 @@ def api_control_buzzer(device_id):
     extra = {'message': 'Buzzer command dispatched', 'target': 'buzzer', 'mode': mode}
     if freq:
         extra['frequency_hz'] = freq
-    return _send_command_response(manager, command, extra)
-
+    return command, extra
 
-@app.route('/api/devices/<device_id>/aux', methods=['POST'])
-@login_required
-def api_control_aux(device_id):
-    device, manager = _resolve_manager(device_id)
-    if not device:
-        return jsonify({'error': 'Device not found'}), 404
-    if not manager:
-        return jsonify({'error': 'Device manager not initialized'}), 500
 
-    payload = request.json or {}
+def _aux_command(payload):
+    """AUX 출력 요청 → (명령, 응답 추가 필드), 잘못된 값은 ValueError"""
     mode_token = payload.get('mode')
     if mode_token is None:
         mode_token = payload.get('state')
     if mode_token is None:
         mode_token = payload.get('command')
     if mode_token is None:
-        return jsonify({'error': 'mode 값이 필요합니다.'}), 400
+        raise ValueError('mode 값이 필요합니다.')
 
     target_token = payload.get('target', 'aux')
     target = str(target_token).strip().lower()
     if target not in {'aux', 'aux2'}:
-        return jsonify({'error': 'target 값은 aux 또는 aux2 여야 합니다.'}), 400
+        raise ValueError('target 값은 aux 또는 aux2 여야 합니다.')
 
     prefix = 'AUX2' if target == 'aux2' else 'AUX'
 
@@ -1283,28 +1510,22 @@ def api_control_aux(device_id):
             'duty_percent': duty
         }
     else:
-        return jsonify({'error': 'mode 값은 on, off, pulse, pwm 중 하나여야 합니다.'}), 400
+        raise ValueError('mode 값은 on, off, pulse, pwm 중 하나여야 합니다.')
 
-    return _send_command_response(manager, command, extra)
-@app.route('/api/devices/<device_id>/gpio', methods=['POST'])
-@login_required
-def api_control_gpio(device_id):
-    device, manager = _resolve_manager(device_id)
-    if not device:
-        return jsonify({'error': 'Device not found'}), 404
-    if not manager:
-        return jsonify({'error': 'Device manager not initialized'}), 500
+    return command, extra
 
-    payload = request.json or {}
+
+def _gpio_command(payload):
+    """GPIO 요청 → (명령, 응답 추가 필드), 잘못된 값은 ValueError"""
     pin = _coerce_int(payload.get('pin'), None)
     if pin is None:
-        return jsonify({'error': 'pin 값이 필요합니다.'}), 400
+        raise ValueError('pin 값이 필요합니다.')
     if pin < 0 or pin > 39:
-        return jsonify({'error': '허용되지 않는 GPIO 번호입니다.'}), 400
+        raise ValueError('허용되지 않는 GPIO 번호입니다.')
 
     state_token = payload.get('state', payload.get('value'))
     if state_token is None:
-        return jsonify({'error': 'state 값이 필요합니다.'}), 400
+        raise ValueError('state 값이 필요합니다.')
 
     state_norm = str(state_token).strip().lower()
     if state_norm in {'1', 'high', 'on', 'true'}:
@@ -1312,7 +1533,7 @@ def api_control_gpio(device_id):
     elif state_norm in {'0', 'low', 'off', 'false'}:
         state_word = 'LOW'
     else:
-        return jsonify({'error': 'state 값은 on/off 또는 high/low 여야 합니다.'}), 400
+        raise ValueError('state 값은 on/off 또는 high/low 여야 합니다.')
 
     duration = _coerce_int(payload.get('duration_ms'), None)
     if duration is None:
@@ -1332,40 +1553,212 @@ def api_control_gpio(device_id):
     if duration > 0:
         extra['duration_ms'] = duration
 
-    return _send_command_response(manager, command, extra)
+    return command, extra
+
+
+def _raw_command(payload):
+    command = str(payload.get('command') or '').strip()
+    if not command:
+        raise ValueError('Command required')
+    return command, {'message': 'Command sent'}
+
+
+# 단일/일괄 제어 API 공용 명령 빌더
+COMMAND_BUILDERS = {
+    'relay': _relay_command,
+    'buzzer': _buzzer_command,
+    'aux': _aux_command,
+    'gpio': _gpio_command,
+    'command': _raw_command,
+}
+
+
+def _control_response(device_id, action):
+    device, manager = _resolve_manager(device_id)
+    if not device:
+        return jsonify({'error': 'Device not found'}), 404
+    if not manager:
+        return jsonify({'error': 'Device manager not initialized'}), 500
+
+    payload = request.json or {}
+    try:
+        command, extra = COMMAND_BUILDERS[action](payload)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return _send_command_response(manager, command, extra, wait=payload.get('wait', True) is not False)
+
+
+@app.route('/api/devices/<device_id>/relay', methods=['POST'])
+@login_required
+def api_control_relay(device_id):
+    return _control_response(device_id, 'relay')
+
+
+@app.route('/api/devices/<device_id>/buzzer', methods=['POST'])
+@login_required
+def api_control_buzzer(device_id):
+    return _control_response(device_id, 'buzzer')
+
+
+@app.route('/api/devices/<device_id>/aux', methods=['POST'])
+@login_required
+def api_control_aux(device_id):
+    return _control_response(device_id, 'aux')
+
+
+@app.route('/api/devices/<device_id>/gpio', methods=['POST'])
+@login_required
+def api_control_gpio(device_id):
+    return _control_response(device_id, 'gpio')
+
+
+def _select_managers(selector):
+    """선택자(all / department(s) / devices) → ({device_id: manager}, 찾지 못한 device_id 목록)"""
+    if not isinstance(selector, dict):
+        raise ValueError('selector 값이 필요합니다.')
+
+    managers = device_registry.managers()
+
+    if selector.get('all'):
+        return managers, []
+
+    if selector.get('devices') is not None:
+        device_ids = selector['devices']
+        if not isinstance(device_ids, list):
+            raise ValueError('devices 는 디바이스 ID 목록이어야 합니다.')
+        selected, missing = {}, []
+        for device_id in device_ids:
+            device_id = str(device_id)
+            if device_id in managers:
+                selected[device_id] = managers[device_id]
+            elif device_id not in missing:
+                missing.append(device_id)
+        return selected, missing
+
+    departments = selector.get('departments') or []
+    if selector.get('department'):
+        departments = list(departments) + [selector['department']]
+    if departments:
+        wanted = {str(department) for department in departments}
+        assignments = employee_index.snapshot()
+        return {device_id: manager for device_id, manager in managers.items()
+                if assignments.get(device_id) and assignments[device_id].department in wanted}, []
+
+    raise ValueError('selector 는 all, department(s), devices 중 하나를 지정해야 합니다.')
+
+
+@app.route('/api/devices/bulk-command', methods=['POST'])
+@login_required
+def api_bulk_command():
+    """선택한 디바이스 전체에 명령을 동시 전송하는 작업 생성 (결과는 Socket.IO 로 전송)"""
+    payload = request.json or {}
+    action = str(payload.get('action') or 'command').strip().lower()
+    builder = COMMAND_BUILDERS.get(action)
+    if builder is None:
+        return jsonify({'error': f"action 값은 {', '.join(COMMAND_BUILDERS)} 중 하나여야 합니다."}), 400
+
+    try:
+        command, extra = builder(payload)
+        managers, missing = _select_managers(payload.get('selector'))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    if not managers:
+        return jsonify({'error': '선택한 조건에 해당하는 디바이스가 없습니다.', 'missing': missing}), 404
+
+    job = command_jobs.submit(command, managers, action=action, selector=payload.get('selector'))
+    extra.pop('message', None)
+    response = {
+        'job_id': job.id,
+        'status': job.status,
+        'command': command,
+        'total': len(managers),
+        'missing': missing
+    }
+    response.update(extra)
+    return jsonify(response), 202
+
+
+@app.route('/api/devices/bulk-command', methods=['GET'])
+@login_required
+def api_bulk_command_jobs():
+    """최근 일괄 명령 작업 요약"""
+    limit = _coerce_int(request.args.get('limit'), 20)
+    return jsonify({'jobs': command_jobs.recent(_clamp(limit, 1, 100))})
+
+
+@app.route('/api/devices/bulk-command/<job_id>', methods=['GET'])
+@login_required
+def api_bulk_command_job(job_id):
+    """일괄 명령 작업 상태 (완료 후 지연 시간 히스토그램 포함)"""
+    job = command_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
 
 
 @app.route('/api/devices/<device_id>/reconnect', methods=['POST'])
 def reconnect_device(device_id):
     """디바이스 재연결 시도"""
-    with devices_lock:
-        if device_id not in registered_devices:
-            return jsonify({'error': 'Device not found'}), 404
-        
-        device = registered_devices[device_id]
-        manager = device.get('manager')
-        if not manager:
-            return jsonify({'error': 'Device manager not initialized'}), 500
+    record, manager = _resolve_manager(device_id)
+    if not record:
+        return jsonify({'error': 'Device not found'}), 404
+    if not manager:
+        return jsonify({'error': 'Device manager not initialized'}), 500
     
     # 백그라운드에서 재연결 시도
-    loop = getattr(manager, 'loop', None)
-    if not loop or not loop.is_running():
+    async def do_reconnect():
+        try:
+            if manager.connected:
+                await manager.disconnect()
+            # run_forever가 다시 연결을 시도하도록 잠시 대기
+        except Exception as exc:
+            logger.error(f"Reconnection failed for {device_id}: {exc}")
+
+    try:
+        ble_hub.submit(device_id, do_reconnect())
+    except RuntimeError:
         return jsonify({'error': '디바이스 연결 루프가 활성화되지 않았습니다.'}), 503
 
-    def schedule_reconnect():
-        async def do_reconnect():
-            try:
-                if manager.connected:
-                    await manager.disconnect()
-                # run_forever가 다시 연결을 시도하도록 잠시 대기
-            except Exception as exc:
-                logger.error(f"Reconnection failed for {device_id}: {exc}")
+    return jsonify({'message': 'Reconnection request accepted', 'device_id': device_id})
 
-        asyncio.create_task(do_reconnect())
 
-    loop.call_soon_threadsafe(schedule_reconnect)
+def _parse_time_param(value, default):
+    """epoch 초 또는 ISO 8601 시각 문자열을 epoch 초로 변환"""
+    if value in (None, ''):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
 
-    return jsonify({'message': 'Reconnection request accepted', 'device_id': device_id})
+
+@app.route('/api/devices/<device_id>/history', methods=['GET'])
+@login_required
+def device_history(device_id):
+    """센서 이력 조회 (구간 길이에 맞는 티어 자동 선택)"""
+    now = time.time()
+    try:
+        end = _parse_time_param(request.args.get('end'), now)
+        start = _parse_time_param(request.args.get('start'), end - 3600)
+        max_points = max(1, min(int(request.args.get('max_points', 500)), 5000))
+    except ValueError:
+        return jsonify({'error': 'start/end/max_points 형식이 올바르지 않습니다.'}), 400
+    if start > end:
+        return jsonify({'error': 'start 가 end 보다 늦습니다.'}), 400
+
+    tier = request.args.get('tier') or None
+    if tier and tier != 'raw' and tier not in {name for name, _, _ in TIERS}:
+        return jsonify({'error': f'지원하지 않는 tier 입니다: {tier}'}), 400
+
+    result = timeseries.query(device_id, start, end, max_points=max_points, tier=tier)
+    return jsonify({
+        'device_id': device_id,
+        'start': start,
+        'end': end,
+        'tier': result['tier'],
+        'count': len(result['points']),
+        'points': result['points']
+    })
 
 
 @app.route('/api/policy/wear', methods=['GET'])
@@ -1394,7 +1787,7 @@ def api_update_wear_policy():
 @app.route('/api/employees', methods=['GET'])
 def get_employees():
     """직원 목록 조회"""
-    conn = sqlite3.connect('strap_monitor.db')
+    conn = db.get_connection()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     c.execute('SELECT * FROM employees ORDER BY created_at DESC')
@@ -1414,8 +1807,8 @@ def create_employee():
     if not all(k in data for k in required):
         return jsonify({'error': 'Missing required fields'}), 400
     
+    conn = db.get_connection()
     try:
-        conn = sqlite3.connect('strap_monitor.db')
         c = conn.cursor()
         c.execute('''INSERT INTO employees 
             (name, employee_number, department, position, device_id)
@@ -1424,13 +1817,17 @@ def create_employee():
              data.get('department'), data.get('position'), data.get('device_id')))
         conn.commit()
         employee_id = c.lastrowid
-        conn.close()
+        employee_index.invalidate()
+        stats_engine.reload_employees()
+        state_sync.all_devices_changed()
         
         return jsonify({'message': 'Employee created', 'id': employee_id})
     except sqlite3.IntegrityError:
         return jsonify({'error': 'Employee number already exists'}), 409
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
 
 
 @app.route('/api/employees/<int:employee_id>', methods=['PUT'])
@@ -1438,8 +1835,8 @@ def update_employee(employee_id):
     """직원 정보 수정"""
     data = request.json
     
+    conn = db.get_connection()
     try:
-        conn = sqlite3.connect('strap_monitor.db')
         c = conn.cursor()
         
         # 업데이트할 필드만 동적으로 구성
@@ -1461,22 +1858,25 @@ def update_employee(employee_id):
         conn.commit()
         
         if c.rowcount == 0:
-            conn.close()
             return jsonify({'error': 'Employee not found'}), 404
         
-        conn.close()
+        employee_index.invalidate()
+        stats_engine.reload_employees()
+        state_sync.all_devices_changed()
         return jsonify({'message': 'Employee updated'})
     except sqlite3.IntegrityError:
         return jsonify({'error': 'Employee number already exists'}), 409
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
 
 
 @app.route('/api/employees/<int:employee_id>', methods=['DELETE'])
 def delete_employee(employee_id):
     """직원 삭제"""
     try:
-        conn = sqlite3.connect('strap_monitor.db')
+        conn = db.get_connection()
         c = conn.cursor()
         c.execute('DELETE FROM employees WHERE id = ?', (employee_id,))
         conn.commit()
@@ -1486,6 +1886,9 @@ def delete_employee(employee_id):
             return jsonify({'error': 'Employee not found'}), 404
         
         conn.close()
+        employee_index.invalidate()
+        stats_engine.reload_employees()
+        state_sync.all_devices_changed()
         return jsonify({'message': 'Employee deleted'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1493,234 +1896,435 @@ def delete_employee(employee_id):
 
 # ============= 로그 & 통계 API =============
 
-@app.route('/api/logs/events', methods=['GET'])
-def get_event_logs():
-    """이벤트 로그 조회"""
-    limit = request.args.get('limit', 100, type=int)
-    event_type = request.args.get('type')
-    severity = request.args.get('severity')
-    log_date = request.args.get('date')
+def _range_bound(value, is_end=False):
+    """날짜(YYYY-MM-DD) 또는 시각 문자열을 저장 형식(UTC, 'YYYY-MM-DD HH:MM:SS')의 범위 경계로 변환
 
-    if log_date:
+    날짜만 주어진 종료 경계는 그날을 포함하도록 다음날 0시로 바꾼다.
+    """
+    try:
+        if len(value) == 10:
+            start, next_day = _day_range(value)
+            return next_day if is_end else start
+        return datetime.fromisoformat(value.replace('Z', '')).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        raise ValueError('날짜 형식은 YYYY-MM-DD 또는 YYYY-MM-DDTHH:MM:SS 이어야 합니다.')
+
+
+EVENT_LOG_FIELDS = {
+    'id': 'el.id',
+    'timestamp': 'el.timestamp',
+    'device_id': 'el.device_id',
+    'employee_id': 'el.employee_id',
+    'event_type': 'el.event_type',
+    'event_data': 'el.event_data',
+    'severity': 'el.severity',
+    'employee_name': 'e.name',
+}
+
+WEAR_SESSION_FIELDS = {
+    'id': 'ws.id',
+    'employee_id': 'ws.employee_id',
+    'device_id': 'ws.device_id',
+    'start_time': 'ws.start_time',
+    'end_time': 'ws.end_time',
+    'duration_seconds': 'ws.duration_seconds',
+    'is_active': 'ws.is_active',
+    'employee_name': 'e.name',
+    'employee_number': 'e.employee_number',
+}
+
+
+def _page_request(default_limit):
+    """공통 페이지 파라미터 파싱 → (limit, 방향, 커서 (ts, id) 또는 None, before_id)
+
+    cursor: 이전 응답의 next_cursor, before_id: 해당 id 보다 오래된 행부터(최신순),
+    after_ts(+after_id): 해당 시각 이후 행을 오래된 순으로 (증분 갱신용)
+    """
+    limit = request.args.get('limit', default_limit, type=int)
+    token = request.args.get('cursor')
+    if token:
         try:
-            datetime.strptime(log_date, '%Y-%m-%d')
+            direction, ts, row_id = pagination.decode_cursor(token)
         except ValueError:
-            return jsonify({'error': '날짜 형식은 YYYY-MM-DD 이어야 합니다.'}), 400
-    
-    conn = sqlite3.connect('strap_monitor.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
-    query = '''SELECT el.*, e.name as employee_name 
-               FROM event_logs el 
-               LEFT JOIN employees e ON el.employee_id = e.id 
-               WHERE 1=1'''
-    params = []
-    
-    if event_type:
-        query += ' AND el.event_type = ?'
-        params.append(event_type)
-    
-    if severity:
-        query += ' AND el.severity = ?'
-        params.append(severity)
+            raise ValueError('잘못된 cursor 입니다.')
+        return limit, direction, (ts, row_id), None
 
-    if log_date:
-        query += ' AND date(el.timestamp) = ?'
-        params.append(log_date)
-    
-    query += ' ORDER BY el.timestamp DESC LIMIT ?'
-    params.append(limit)
-    
-    c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
-    
-    logs = [dict(row) for row in rows]
-    return jsonify({'logs': logs})
+    before_id = request.args.get('before_id', type=int)
+    after_ts = request.args.get('after_ts')
+    if before_id is not None and after_ts:
+        raise ValueError('before_id 와 after_ts 는 함께 사용할 수 없습니다.')
+    if after_ts:
+        after_id = request.args.get('after_id', 2 ** 63 - 1, type=int)
+        return limit, 'asc', (_range_bound(after_ts), after_id), None
+    return limit, 'desc', None, before_id
+
+
+def _apply_range(query, column):
+    """start/end(또는 date) 파라미터를 인덱스 범위 조건으로 추가"""
+    log_date = request.args.get('date')
+    start = request.args.get('start') or log_date
+    end = request.args.get('end') or log_date
+    if start:
+        query.filter(f'{column} >= ?', _range_bound(start))
+    if end:
+        query.filter(f'{column} < ?', _range_bound(end, is_end=True))
+
+
+def _resolve_before_id(conn, table, ts_col, before_id):
+    """before_id 를 (정렬 시각, id) 키셋 커서로 변환"""
+    row = conn.execute(f'SELECT {ts_col} FROM {table} WHERE id = ?', (before_id,)).fetchone()
+    if row is None:
+        raise LookupError('before_id 에 해당하는 행이 없습니다.')
+    return row[0], before_id
+
+
+@app.route('/api/logs/events', methods=['GET'])
+def get_event_logs():
+    """이벤트 로그 조회 (키셋 페이지네이션, next_cursor 로 다음 페이지)"""
+    try:
+        limit, direction, cursor, before_id = _page_request(100)
+        fields = pagination.parse_fields(request.args.get('fields'), EVENT_LOG_FIELDS)
+        query = pagination.KeysetPage(
+            'event_logs el', EVENT_LOG_FIELDS, 'el.timestamp', 'el.id',
+            joins={'employee_name': 'LEFT JOIN employees e ON el.employee_id = e.id'}
+        )
+        _apply_range(query, 'el.timestamp')
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    event_type = request.args.get('type') or request.args.get('event_type')
+    for column, value in (('el.event_type', event_type),
+                          ('el.severity', request.args.get('severity')),
+                          ('el.device_id', request.args.get('device_id')),
+                          ('el.employee_id', request.args.get('employee_id', type=int))):
+        if value:
+            query.filter(f'{column} = ?', value)
+
+    conn = db.get_connection()
+    try:
+        if before_id is not None:
+            cursor = _resolve_before_id(conn, 'event_logs', 'timestamp', before_id)
+        logs, next_cursor = query.fetch(conn, fields, limit, direction=direction, cursor=cursor)
+    except LookupError as exc:
+        return jsonify({'error': str(exc)}), 404
+    finally:
+        conn.close()
+
+    return jsonify({'logs': logs, 'next_cursor': next_cursor, 'has_more': next_cursor is not None})
 
 
 @app.route('/api/logs/events/export', methods=['GET'])
 @login_required
 def export_event_logs():
-    """지정한 날짜의 이벤트 로그를 엑셀로 내보냄"""
+    """이벤트 로그 내보내기 (date 또는 start/end 범위 + 필터)
+
+    CSV/NDJSON 은 행을 읽는 대로 스트리밍하고, XLSX 는 통합 문서를 모두 만든 뒤 전송을 시작하므로
+    수십만 행 이상은 CSV/NDJSON 을 권장한다.
+    """
+    fmt = (request.args.get('format') or 'xlsx').lower()
+    if fmt not in log_export.FORMATS:
+        return jsonify({'error': f'지원하지 않는 형식입니다: {fmt} (xlsx, csv, ndjson)'}), 400
+
     date_param = request.args.get('date')
-    if not date_param:
-        return jsonify({'error': 'date 파라미터(YYYY-MM-DD)를 지정해주세요.'}), 400
+    start_param = request.args.get('start') or date_param
+    end_param = request.args.get('end') or date_param
+    if not start_param or not end_param:
+        return jsonify({'error': 'date(YYYY-MM-DD) 또는 start/end 파라미터를 지정해주세요.'}), 400
 
     try:
-        target_date = datetime.strptime(date_param, '%Y-%m-%d').date()
-    except ValueError:
-        return jsonify({'error': '날짜 형식은 YYYY-MM-DD 이어야 합니다.'}), 400
-
-    conn = sqlite3.connect('strap_monitor.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute('''
-        SELECT el.timestamp, el.device_id, el.event_type, el.event_data, el.severity,
-               e.name AS employee_name, e.employee_number
-        FROM event_logs el
-        LEFT JOIN employees e ON el.employee_id = e.id
-        WHERE date(el.timestamp) = ?
-        ORDER BY el.timestamp ASC
-    ''', (date_param,))
-    rows = c.fetchall()
-    conn.close()
+        start = _range_bound(start_param)
+        end = _range_bound(end_param, is_end=True)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    if start >= end:
+        return jsonify({'error': 'start 는 end 보다 이전이어야 합니다.'}), 400
+
+    where = ['el.timestamp >= ?', 'el.timestamp < ?']
+    params = [start, end]
+    for column, arg in (('el.event_type', 'event_type'), ('el.severity', 'severity'),
+                        ('el.device_id', 'device_id'), ('el.employee_id', 'employee_id')):
+        value = request.args.get(arg)
+        if value:
+            where.append(f'{column} = ?')
+            params.append(value)
+
+    mimetype, extension = log_export.FORMATS[fmt]
+    if date_param and not request.args.get('start') and not request.args.get('end'):
+        filename = f"event_logs_{date_param}.{extension}"
+    else:
+        filename = f"event_logs_{start_param[:10]}_{end_param[:10]}.{extension}"
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'EventLogs'
-    ws.append([
-        'Timestamp (KST)',
-        'Device ID',
-        'Employee Name',
-        'Employee Number',
-        'Event Type',
-        'Severity',
-        'Event Data'
-    ])
-
-    for row in rows:
-        event_data = row['event_data'] or ''
-        if event_data:
-            try:
-                parsed = json.loads(event_data)
-                if isinstance(parsed, (dict, list)):
-                    event_data = json.dumps(parsed, ensure_ascii=False)
-                else:
-                    event_data = str(parsed)
-            except Exception:
-                event_data = str(event_data)
-
-        ws.append([
-            to_kst_string(row['timestamp']),
-            row['device_id'],
-            row['employee_name'] or '',
-            row['employee_number'] or '',
-            row['event_type'],
-            row['severity'],
-            event_data
-        ])
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    filename = f"event_logs_{target_date.isoformat()}.xlsx"
-    return send_file(
-        output,
-        as_attachment=True,
-        download_name=filename,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    logger.info(f"Event log export started: format={fmt}, range=[{start}, {end})")
+    return Response(
+        log_export.stream_export(fmt, where, params, to_kst_string),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
     )
 
 
 @app.route('/api/logs/wear-sessions', methods=['GET'])
 def get_wear_sessions():
-    """착용 세션 로그"""
-    limit = request.args.get('limit', 50, type=int)
+    """착용 세션 로그 (키셋 페이지네이션, next_cursor 로 다음 페이지)"""
     active_only = request.args.get('active', 'false').lower() == 'true'
-    
-    conn = sqlite3.connect('strap_monitor.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
-    query = '''SELECT ws.*, e.name as employee_name, e.employee_number
-               FROM wear_sessions ws
-               LEFT JOIN employees e ON ws.employee_id = e.id'''
-    
+    try:
+        limit, direction, cursor, before_id = _page_request(50)
+        fields = pagination.parse_fields(request.args.get('fields'), WEAR_SESSION_FIELDS)
+        query = pagination.KeysetPage(
+            'wear_sessions ws', WEAR_SESSION_FIELDS, 'ws.start_time', 'ws.id',
+            joins={
+                'employee_name': 'LEFT JOIN employees e ON ws.employee_id = e.id',
+                'employee_number': 'LEFT JOIN employees e ON ws.employee_id = e.id',
+            }
+        )
+        _apply_range(query, 'ws.start_time')
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
     if active_only:
-        query += ' WHERE ws.is_active = 1'
-    
-    query += ' ORDER BY ws.start_time DESC LIMIT ?'
-    
-    c.execute(query, (limit,))
-    rows = c.fetchall()
-    conn.close()
-    
-    sessions = [dict(row) for row in rows]
-    return jsonify({'sessions': sessions})
+        query.filter('ws.is_active = 1')
+    for column, value in (('ws.device_id', request.args.get('device_id')),
+                          ('ws.employee_id', request.args.get('employee_id', type=int))):
+        if value:
+            query.filter(f'{column} = ?', value)
+
+    conn = db.get_connection()
+    try:
+        if before_id is not None:
+            cursor = _resolve_before_id(conn, 'wear_sessions', 'start_time', before_id)
+        sessions, next_cursor = query.fetch(conn, fields, limit, direction=direction, cursor=cursor)
+    except LookupError as exc:
+        return jsonify({'error': str(exc)}), 404
+    finally:
+        conn.close()
+
+    return jsonify({'sessions': sessions, 'next_cursor': next_cursor, 'has_more': next_cursor is not None})
+
+
+def _report_range():
+    """보고서 기간 파라미터 (month=YYYY-MM 또는 start/end=YYYY-MM-DD, 기본 최근 30일) → (시작일, 종료일)"""
+    month = request.args.get('month')
+    try:
+        if month:
+            first = datetime.strptime(month, '%Y-%m').date()
+            last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            return first.isoformat(), last.isoformat()
+        today = datetime.now().date()
+        end = datetime.strptime(request.args.get('end') or today.isoformat(), '%Y-%m-%d').date()
+        start_value = request.args.get('start')
+        start = datetime.strptime(start_value, '%Y-%m-%d').date() if start_value else end - timedelta(days=29)
+    except ValueError:
+        raise ValueError('기간은 month=YYYY-MM 또는 start/end=YYYY-MM-DD 형식이어야 합니다.')
+    if start > end:
+        raise ValueError('start 는 end 보다 늦을 수 없습니다.')
+    return start.isoformat(), end.isoformat()
+
+
+@app.route('/api/reports/compliance', methods=['GET'])
+def get_compliance_report():
+    """착용 준수 보고서 (daily_wear_stats 집계를 부서/직원/일자별로 합산)"""
+    try:
+        start, end = _report_range()
+        results = wear_aggregates.report(
+            start, end,
+            group=request.args.get('group', 'department'),
+            department=request.args.get('department'),
+            employee_id=request.args.get('employee_id', type=int)
+        )
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify({'start': start, 'end': end, 'group': request.args.get('group', 'department'),
+                    'results': results})
+
+
+@app.route('/api/reports/daily-wear', methods=['GET'])
+def get_daily_wear_report():
+    """직원/일자별 착용 집계 행"""
+    try:
+        start, end = _report_range()
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    limit = max(1, min(_coerce_int(request.args.get('limit'), 1000), 10000))
+    rows = wear_aggregates.daily_rows(
+        start, end,
+        department=request.args.get('department'),
+        employee_id=request.args.get('employee_id', type=int),
+        limit=limit
+    )
+    return jsonify({'start': start, 'end': end, 'rows': rows, 'truncated': len(rows) == limit})
+
+
+def _conditional_json(etag, payload):
+    """ETag 를 붙인 JSON 응답 (If-None-Match 가 일치하면 304)"""
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 
 @app.route('/api/stats/summary', methods=['GET'])
 def get_stats_summary():
-    """통계 요약"""
-    conn = sqlite3.connect('strap_monitor.db')
-    c = conn.cursor()
-    
-    # 총 직원 수
-    c.execute('SELECT COUNT(*) FROM employees')
-    total_employees = c.fetchone()[0]
-    
-    # 현재 착용 중인 직원 수
-    c.execute('SELECT COUNT(*) FROM wear_sessions WHERE is_active = 1')
-    currently_wearing = c.fetchone()[0]
-    
-    # 오늘 착용 해제 이벤트 수
-    c.execute('''SELECT COUNT(*) FROM event_logs 
-                 WHERE event_type = 'wear_off' 
-                 AND date(timestamp) = date('now')''')
-    today_unwear_count = c.fetchone()[0]
-    
-    # 총 이벤트 수
-    c.execute('SELECT COUNT(*) FROM event_logs')
-    total_events = c.fetchone()[0]
-    
-    conn.close()
-    
-    return jsonify({
-        'total_employees': total_employees,
-        'currently_wearing': currently_wearing,
-        'today_unwear_events': today_unwear_count,
-        'total_events': total_events
-    })
+    """통계 요약 (메모리 통계 엔진)"""
+    etag, payload = stats_engine.summary()
+    return _conditional_json(etag, payload)
 
 
 @app.route('/api/stats/unwearing', methods=['GET'])
 def get_unwearing_employees():
-    """현재 미착용 직원 목록"""
-    conn = sqlite3.connect('strap_monitor.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
-    # 기기가 할당된 직원 중 현재 착용 중이 아닌 직원
-    c.execute('''
-        SELECT e.id, e.name, e.employee_number, e.department, e.device_id,
-               (SELECT MAX(timestamp) FROM event_logs 
-                WHERE device_id = e.device_id AND event_type = 'wear_off') as last_unwear_time
-        FROM employees e
-        WHERE e.device_id IS NOT NULL
-        AND NOT EXISTS (
-            SELECT 1 FROM wear_sessions ws 
-            WHERE ws.employee_id = e.id AND ws.is_active = 1
-        )
-    ''')
-    
-    rows = c.fetchall()
-    conn.close()
+    """현재 미착용 직원 목록 (연결된 기기 중 진행 중인 착용 세션이 없는 직원)"""
+    etag, payload = stats_engine.unwearing()
+    return _conditional_json(etag, payload)
 
-    with devices_lock:
-        connected_devices = {
-            device_id for device_id, info in registered_devices.items()
-            if info.get('manager') and info['manager'].connected
-        }
 
-    unwearing = []
-    for row in rows:
-        device_id = row['device_id']
-        if not device_id or device_id not in connected_devices:
-            continue
+@app.route('/api/admin/stats-engine', methods=['GET'])
+@login_required
+def api_stats_engine():
+    """통계 엔진 버전/대조 지표"""
+    return jsonify(stats_engine.stats())
 
-        unwearing.append({
-            'id': row['id'],
-            'name': row['name'],
-            'employee_number': row['employee_number'],
-            'department': row['department'],
-            'device_id': device_id,
-            'last_unwear_time': row['last_unwear_time']
-        })
 
-    return jsonify({'unwearing': unwearing})
+@app.route('/api/admin/stats-engine/reconcile', methods=['POST'])
+@login_required
+def api_stats_engine_reconcile():
+    """DB 기준으로 통계 즉시 재계산"""
+    stats_engine.reconcile()
+    return jsonify(stats_engine.stats())
+
+
+@app.route('/api/admin/wear-aggregates', methods=['GET'])
+@login_required
+def api_wear_aggregates_stats():
+    """일일 착용 집계 지표 (미집계 종료 세션 수, 마지막 실행 시간)"""
+    return jsonify(wear_aggregates.stats())
+
+
+@app.route('/api/admin/wear-aggregates/run', methods=['POST'])
+@login_required
+def api_wear_aggregates_run():
+    """미집계 종료 세션 즉시 집계"""
+    processed = wear_aggregates.run_once()
+    stats = wear_aggregates.stats()
+    stats['processed'] = processed
+    return jsonify(stats)
+
+
+@app.route('/api/admin/db-writer', methods=['GET'])
+@login_required
+def api_db_writer_stats():
+    """쓰기 지연 작성기 큐 적체/반영 지표"""
+    return jsonify(db_writer.stats())
+
+
+@app.route('/api/admin/db-writer/flush', methods=['POST'])
+@login_required
+def api_db_writer_flush():
+    """대기 중인 쓰기를 즉시 반영"""
+    payload = request.json or {}
+    timeout = _clamp(float(payload.get('timeout', 5.0) or 5.0), 0.1, 30.0)
+    started = time.perf_counter()
+    flushed = db_writer.flush(timeout=timeout)
+    return jsonify({
+        'success': flushed,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+        'stats': db_writer.stats()
+    }), (200 if flushed else 504)
+
+
+@app.route('/api/admin/broadcast', methods=['GET'])
+@login_required
+def api_broadcast_stats():
+    """device_data 병합 전송 지표"""
+    return jsonify(device_aggregator.stats())
+
+
+@app.route('/api/admin/state-sync', methods=['GET'])
+@login_required
+def api_state_sync_stats():
+    """상태 동기화 버전/델타 이력 지표"""
+    return jsonify(state_sync.stats())
+
+
+@app.route('/api/admin/rate-controller', methods=['GET'])
+@login_required
+def api_rate_controller_stats():
+    """적응형 측정 주기 상태 (활동 등급별 기기 수, 예산 반영 주기, 예상 초당 알림 수)"""
+    return jsonify(rate_controller.stats())
+
+
+@app.route('/api/admin/link-quality', methods=['GET'])
+@login_required
+def api_link_quality_stats():
+    """링크 품질 요약 (추적 중인 기기 수, 저하 링크 목록, 판단 기준)"""
+    return jsonify(link_quality.stats())
+
+
+@app.route('/api/admin/scanner', methods=['GET'])
+@login_required
+def api_scanner_stats():
+    """스캔 서비스 상태 (스캔 중 여부, 캐시 크기, 열린 스캔 창 수)"""
+    return jsonify(scan_service.stats())
+
+
+@app.route('/api/admin/connections', methods=['GET'])
+@login_required
+def api_connection_stats():
+    """BLE 연결 시도 게이트 상태 (진행 중/대기 중 연결 수)와 연결된 기기 수"""
+    managers = list(device_registry.managers().values())
+    stats = connect_gate.stats()
+    stats['registered'] = len(managers)
+    stats['connected'] = sum(1 for manager in managers if manager.connected)
+    return jsonify(stats)
+
+
+@app.route('/api/admin/simulator', methods=['GET'])
+@login_required
+def api_simulator_stats():
+    """BLE 전송 계층 상태 (시뮬레이터면 가상 스트랩 수, 연결 수, 전송 프레임/명령 수)"""
+    return jsonify(ble_transport.stats())
+
+
+@app.route('/api/admin/simulator/disconnect', methods=['POST'])
+@login_required
+def api_simulator_disconnect():
+    """가상 스트랩 링크 끊김 주입 (count 대, 재연결 동작 확인용)"""
+    if not hasattr(ble_transport, 'inject_disconnects'):
+        return jsonify({'error': '시뮬레이터 전송 계층(BLE_TRANSPORT=sim)에서만 사용할 수 있습니다.'}), 400
+    data = request.get_json(silent=True) or {}
+    try:
+        count = int(data.get('count', 1))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'count 는 정수여야 합니다.'}), 400
+    if count < 1:
+        return jsonify({'error': 'count 는 1 이상이어야 합니다.'}), 400
+    addresses = ble_transport.inject_disconnects(
+        count, loop_for=lambda address: ble_hub.loop_for(address.replace(':', '_')))
+    return jsonify({'success': True, 'disconnected': addresses})
+
+
+@app.route('/api/admin/command-pipeline', methods=['GET'])
+@login_required
+def api_command_pipeline_stats():
+    """디바이스별 명령 파이프라인 지표 (응답 수, 시간 초과, 유실/미매칭 응답, 평균 응답 지연)"""
+    managers = list(device_registry.managers().values())
+    return jsonify({manager.device_id: manager.commands.stats() for manager in managers})
+
+
+@app.route('/api/admin/logging', methods=['GET'])
+@login_required
+def api_get_logging():
+    """카테고리별 로그 레벨/샘플링 조회"""
+    return jsonify(log_config.describe())
+
+
+@app.route('/api/admin/logging', methods=['POST'])
+@login_required
+def api_update_logging():
+    """카테고리별 로그 레벨/샘플링 변경 (예: {"levels": {"ble.rx": "INFO"}, "sampling": {"ble.rx": 50}})"""
+    payload = request.json or {}
+    try:
+        log_config.configure(levels=payload.get('levels'), sampling=payload.get('sampling'))
+    except (TypeError, ValueError) as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify(log_config.describe())
 
 
 @app.route('/api/system/reset-db', methods=['POST'])
@@ -1731,39 +2335,25 @@ def api_reset_database():
     if not payload.get('confirm'):
         return jsonify({'error': '초기화를 확인해주세요.'}), 400
 
-    with devices_lock:
-        managers = [device.get('manager') for device in registered_devices.values() if device.get('manager')]
+    for record in device_registry.clear():
+        if record.manager:
+            _stop_manager(record.manager)
+    timeseries.clear()
+    link_quality.clear()
 
-    for manager in managers:
-        if not manager:
-            continue
-        loop = getattr(manager, 'loop', None)
-        if loop and loop.is_running():
-            try:
-                future = asyncio.run_coroutine_threadsafe(manager.disconnect(), loop)
-                future.result(timeout=10)
-            except Exception as exc:
-                logger.error(f"Failed to disconnect device {manager.device_id} during reset: {exc}")
-            finally:
-                manager.request_stop()
-        else:
-            try:
-                asyncio.run(manager.disconnect())
-            except RuntimeError:
-                pass
-            manager.connected = False
-
-    with devices_lock:
-        registered_devices.clear()
+    # 대기 중인 쓰기를 반영하고 작성기 연결을 닫은 뒤 파일 삭제
+    db_writer.flush(close=True)
 
     try:
-        if os.path.exists('strap_monitor.db'):
-            os.remove('strap_monitor.db')
+        db.remove_database()
     except OSError as exc:
         logger.error(f"Failed to remove database file: {exc}")
         return jsonify({'error': '데이터베이스 파일을 삭제할 수 없습니다.'}), 500
 
     init_db()
+    employee_index.load()
+    state_sync.reset()
+    stats_engine.reconcile()
     socketio.emit('system_reset', {
         'timestamp': get_kst_now().isoformat()
     }, namespace='/')
@@ -1777,29 +2367,83 @@ def api_reset_database():
 def handle_connect():
     """클라이언트 연결"""
     logger.info(f"Client connected: {request.sid}")
+    # 기본 구독: 전체 디바이스 device_data_batch
+    join_room(ROOM_ALL)
+    device_aggregator.subscribe(request.sid, {ROOM_ALL})
     emit('connected', {'message': 'Connected to BLE Monitor Server'})
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """클라이언트 연결 해제"""
+    device_aggregator.unsubscribe(request.sid)
     logger.info(f"Client disconnected: {request.sid}")
 
 
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """device_data_batch 구독 범위 변경 (all / departments / devices)"""
+    data = data if isinstance(data, dict) else {}
+    rooms = set()
+    if data.get('all'):
+        rooms.add(ROOM_ALL)
+    for department in data.get('departments') or []:
+        if department:
+            rooms.add(department_room(str(department)))
+    for device_id in data.get('devices') or []:
+        if device_id:
+            rooms.add(device_room(str(device_id)))
+    if not rooms:
+        rooms.add(ROOM_ALL)
+
+    added, removed = device_aggregator.subscribe(request.sid, rooms)
+    for room in removed:
+        leave_room(room)
+    for room in added:
+        join_room(room)
+    emit('subscribed', {'rooms': sorted(rooms)})
+
+
+@socketio.on('state_sync')
+def handle_state_sync(data):
+    """대시보드 상태 동기화 요청 - {epoch, version} 이 유효하면 누락된 델타만, 아니면 전체 스냅샷"""
+    data = data if isinstance(data, dict) else {}
+    join_room(STATE_ROOM)
+    version = data.get('version')
+    kind, payload = state_sync.sync(data.get('epoch'), version if isinstance(version, int) else None)
+    if kind == 'snapshot':
+        emit('state_snapshot', payload)
+    else:
+        for delta in payload:
+            emit('state_delta', delta)
+
+
 @socketio.on('request_scan')
 def handle_scan_request(data):
-    """스캔 요청 (WebSocket)"""
-    timeout = data.get('timeout', 5.0) if data else 5.0
-    
-    # REST API 재사용
-    scan_devices()
+    """스캔 요청 (WebSocket) - 캐시 결과를 scan_started 로 보내고 창이 닫히면 scan_complete"""
+    try:
+        timeout = _clamp(float((data or {}).get('timeout', 5.0)), 1.0, 60.0)
+    except (TypeError, ValueError):
+        timeout = 5.0
+    window = scan_service.request_window(timeout)
+    response = _scan_payload(window)
+    response['window_seconds'] = timeout
+    emit('scan_started', response)
 
 
 if __name__ == '__main__':
     logger.info("Starting BLE Strap Monitor Backend...")
     logger.info("Admin Dashboard: http://localhost:5000/admin")
     
+    # 시뮬레이터 전송 계층이면 가상 스트랩 등록
+    if BLE_TRANSPORT == transport.TRANSPORT_SIMULATED and SIM_AUTO_REGISTER:
+        register_simulated_devices()
+
     # DB에서 등록된 기기 자동 로드
     load_devices_from_db()
+
+    # 상시 스캔 (광고 캐시 유지)
+    if scan_service.background:
+        scan_service.start()
     
     socketio.run(app, host='0.0.0.0', port=5000, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
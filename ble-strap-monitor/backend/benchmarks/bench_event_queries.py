@@ -0,0 +1,129 @@
+"""
+이벤트 로그 조회 지연 벤치마크
+마이그레이션 3(인덱스) 적용 전후로 로그 목록/날짜 필터/통계/미착용 조회 지연을 비교
+
+    python benchmarks/bench_event_queries.py --rows 10000000
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrations  # noqa: E402
+
+EVENT_TYPES = ('wear_on', 'wear_off', 'connected', 'disconnected', 'policy_applied')
+
+
+def populate(conn, rows, devices, days):
+    """재귀 CTE 로 rows 개의 이벤트와 디바이스별 착용 세션 생성"""
+    conn.executemany('INSERT INTO employees (name, employee_number, department, device_id) VALUES (?, ?, ?, ?)',
+                     [(f'직원{i}', f'E{i:05d}', f'부서{i % 10}', f'DEV{i:04d}') for i in range(devices)])
+    conn.execute(f'''
+        WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < {rows - 1})
+        INSERT INTO event_logs (timestamp, device_id, employee_id, event_type, event_data, severity)
+        SELECT datetime('now', '-' || ((n * 7919) % ({days} * 86400)) || ' seconds'),
+               'DEV' || printf('%04d', n % {devices}),
+               (n % {devices}) + 1,
+               CASE n % 5 WHEN 0 THEN 'wear_on' WHEN 1 THEN 'wear_off' WHEN 2 THEN 'connected'
+                          WHEN 3 THEN 'disconnected' ELSE 'policy_applied' END,
+               '{{"distance": "120"}}',
+               CASE WHEN n % 17 = 0 THEN 'warning' ELSE 'info' END
+        FROM seq''')
+    conn.execute(f'''
+        WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < {rows // 10 - 1})
+        INSERT INTO wear_sessions (employee_id, device_id, start_time, end_time, duration_seconds, is_active)
+        SELECT (n % {devices}) + 1, 'DEV' || printf('%04d', n % {devices}),
+               datetime('now', '-' || ((n * 7919) % ({days} * 86400)) || ' seconds'),
+               NULL, NULL, CASE WHEN n < {devices // 2} THEN 1 ELSE 0 END
+        FROM seq''')
+    conn.commit()
+
+
+def query_set(sargable, day):
+    """(이름, SQL, 파라미터) 목록 - sargable=False 이면 기존 date(...) = ? 조건"""
+    start = datetime.strptime(day, '%Y-%m-%d')
+    bounds = (start.strftime('%Y-%m-%d 00:00:00'), (start + timedelta(days=1)).strftime('%Y-%m-%d 00:00:00'))
+    date_filter = ('el.timestamp >= ? AND el.timestamp < ?', bounds) if sargable \
+        else ('date(el.timestamp) = ?', (day,))
+    today_filter = ('timestamp >= ? AND timestamp < ?', bounds) if sargable \
+        else ('date(timestamp) = ?', (day,))
+    return [
+        ('logs_latest', '''SELECT el.*, e.name FROM event_logs el LEFT JOIN employees e ON el.employee_id = e.id
+                           ORDER BY el.timestamp DESC LIMIT 100''', ()),
+        ('logs_by_type', '''SELECT el.*, e.name FROM event_logs el LEFT JOIN employees e ON el.employee_id = e.id
+                            WHERE el.event_type = ? ORDER BY el.timestamp DESC LIMIT 100''', ('wear_off',)),
+        ('logs_by_date', f'''SELECT el.*, e.name FROM event_logs el LEFT JOIN employees e ON el.employee_id = e.id
+                             WHERE {date_filter[0]} ORDER BY el.timestamp DESC LIMIT 100''', date_filter[1]),
+        ('export_day_count', f'SELECT COUNT(*) FROM event_logs el WHERE {date_filter[0]}', date_filter[1]),
+        ('today_unwear', f"SELECT COUNT(*) FROM event_logs WHERE event_type = 'wear_off' AND {today_filter[0]}",
+         today_filter[1]),
+        ('currently_wearing', 'SELECT COUNT(*) FROM wear_sessions WHERE is_active = 1', ()),
+        ('unwearing', '''SELECT e.id, (SELECT timestamp FROM event_logs
+                                       WHERE device_id = e.device_id AND event_type = 'wear_off'
+                                       ORDER BY timestamp DESC LIMIT 1)
+                         FROM employees e
+                         WHERE e.device_id IS NOT NULL
+                         AND NOT EXISTS (SELECT 1 FROM wear_sessions ws
+                                         WHERE ws.employee_id = e.id AND ws.is_active = 1)''', ()),
+    ]
+
+
+def measure(conn, queries, repeat):
+    results = {}
+    for name, sql, params in queries:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        plan = ' / '.join(row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params))
+        results[name] = (statistics.median(samples), plan)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000, help='event_logs 행 수')
+    parser.add_argument('--devices', type=int, default=500)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', help='DB 파일 경로 (기본: 임시 파일)')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix='strap-bench-'), 'bench.db')
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF')
+
+    migrations.migrate(conn, target=2)
+    started = time.perf_counter()
+    populate(conn, args.rows, args.devices, args.days)
+    print(f'populated {args.rows:,} event rows in {time.perf_counter() - started:.1f}s ({path})')
+
+    day = conn.execute('SELECT date(MAX(timestamp), \'-3 days\') FROM event_logs').fetchone()[0]
+    before = measure(conn, query_set(False, day), args.repeat)
+
+    started = time.perf_counter()
+    migrations.migrate(conn)
+    print(f'migration 3 (indexes) applied in {time.perf_counter() - started:.1f}s')
+    after = measure(conn, query_set(True, day), args.repeat)
+
+    print()
+    print(f'{"query":<20} {"before ms":>12} {"after ms":>12} {"speedup":>9}')
+    for name, (before_ms, _) in before.items():
+        after_ms, plan = after[name]
+        print(f'{name:<20} {before_ms:>12.2f} {after_ms:>12.2f} {before_ms / max(after_ms, 1e-6):>8.1f}x')
+    print()
+    for name, (_, plan) in after.items():
+        print(f'{name:<20} {plan}')
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,417 @@
+"""
+알림 → 파싱 → 기록 → 전송 경로 마이크로 벤치마크
+결과를 benchmarks/baseline.json 과 비교해 허용 범위를 넘게 느려진 항목을 표시 (회귀가 있으면 종료 코드 1)
+실행 인자(반복 횟수, 행 수 등)가 기준값과 다른 항목은 비교하지 않고, 꼬리 지연(p95)은 표시만 하고 판정에서 제외
+
+- parse_*: EXT_PAYLOAD_RE / parse_frame 처리량
+- notification_handler: 가짜 BLE 클라이언트(RATE 명령에 RESP 응답)로 DeviceManager.notification_handler 전체 경로 처리량
+- state_change: _check_state_change 호출 비용과 쓰기 지연 작성기가 DB 에 반영하기까지의 변경당 비용
+- api_devices_<N>: 등록 기기 10/100/1000 대일 때 GET /api/devices 지연
+- export_<format>: 이벤트 로그 1M 행 스트리밍 내보내기 시간과 내보내기 중 익명 메모리(RssAnon) 최대 증가량
+  (DB mmap 으로 읽은 파일 페이지는 제외)
+
+DB 는 임시 디렉터리(/dev/shm 이 있으면 그 아래)의 새 파일을 사용
+
+    python benchmarks/bench_hot_paths.py                    # 실행 후 baseline.json 과 비교
+    python benchmarks/bench_hot_paths.py --update-baseline  # 현재 결과를 기준값으로 저장
+    python benchmarks/bench_hot_paths.py --only parse,api_devices --export-rows 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+GROUPS = ('parse', 'notification_handler', 'state_change', 'api_devices', 'export')
+
+# 그룹별 결과 값에 영향을 주는 실행 인자 (기준값과 다르면 비교하지 않음)
+GROUP_PARAMS = {
+    'parse': ('parse_iterations', 'repeat'),
+    'notification_handler': ('notifications',),
+    'state_change': ('state_changes',),
+    'api_devices': ('api_repeat',),
+    'export': ('export_rows',),
+}
+
+TEXT_FRAMES = [
+    f'DIST:{120 + i % 40};RAW:{2000 + i};AVG:{1990 + i};DIFF:{i % 30};STATE:{"CLOSED" if i % 2 else "OPEN"}'
+    for i in range(64)
+] + ['DIST:ERR;RAW:2048;AVG:2040;DIFF:3;STATE:OPEN']
+
+
+def _prepare_environment(tmp_dir):
+    """app 임포트 전에 호출 - 임시 DB, 시뮬레이터 전송 계층, 백그라운드 스레드 최소화"""
+    os.environ['STRAP_MONITOR_DB'] = os.path.join(tmp_dir, 'bench.db')
+    os.environ.setdefault('BLE_TRANSPORT', 'sim')
+    os.environ.setdefault('SIM_DEVICES', '0')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('LOG_LEVELS', 'db=WARNING,ble.tx=WARNING')
+    os.environ.setdefault('LINK_QUALITY_EMIT_SECONDS', '0')
+    os.environ.setdefault('WEAR_AGGREGATE_INTERVAL_SECONDS', '0')
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def _result(value, unit, higher_is_better, gate=True, **extra):
+    """gate=False 면 비교 결과를 표시만 하고 회귀 판정에는 쓰지 않음"""
+    result = {'value': round(value, 3), 'unit': unit, 'higher_is_better': higher_is_better, 'gate': gate}
+    result.update(extra)
+    return result
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _best_rate(fn, items, repeat):
+    """repeat 회 중 가장 빠른 실행의 초당 처리 수 (백그라운드 스레드/스케줄링 잡음 제거)"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - started)
+    return len(items) / best
+
+
+# ----- 파싱 -----
+
+def bench_parse(app, args):
+    import frames
+
+    texts = TEXT_FRAMES * (args.parse_iterations // len(TEXT_FRAMES))
+    encoded = [text.encode() for text in texts]
+    binary = [frames.pack_binary_frame('CLOSED', i, 120 + i % 40, 2000, 1990, i % 30) for i in range(len(texts))]
+    return {
+        'parse_regex_ops': _result(_best_rate(frames.EXT_PAYLOAD_RE.match, texts, args.repeat), 'ops/s', True),
+        'parse_frame_text_ops': _result(_best_rate(frames.parse_frame, encoded, args.repeat), 'ops/s', True),
+        'parse_frame_binary_ops': _result(_best_rate(frames.parse_frame, binary, args.repeat), 'ops/s', True),
+    }
+
+
+# ----- 알림 처리 -----
+
+class FakeClient:
+    """BleakClient 대체 - RATE 명령에는 펌웨어처럼 RESP:RATE= 알림으로 응답"""
+
+    def __init__(self):
+        self.manager = None
+        self.is_connected = True
+
+    async def write_gatt_char(self, uuid, data, response=False):
+        command = data.decode()
+        verb, _, value = command.partition(':')
+        reply = f'RESP:{verb}={value}' if verb == 'RATE' else 'RESP:UNKNOWN'
+        asyncio.get_running_loop().call_soon(
+            asyncio.ensure_future, self.manager.notification_handler(None, bytearray(reply.encode())))
+
+
+def _fake_manager(app, device_id):
+    manager = app.DeviceManager(device_id, f'BE:00:00:00:{device_id[-4:-2]}:{device_id[-2:]}', device_id)
+    manager.client = FakeClient()
+    manager.client.manager = manager
+    manager.connected = True
+    return manager
+
+
+def bench_notification_handler(app, args):
+    frames_count = args.notifications
+    manager = _fake_manager(app, 'BENCH0001')
+    # 200 프레임마다 착용 상태가 바뀌는 실제와 비슷한 비율
+    payloads = [
+        bytearray(f'DIST:{120 + i % 40};RAW:2000;AVG:1990;DIFF:{i % 30};'
+                  f'STATE:{"CLOSED" if (i // 200) % 2 else "OPEN"}'.encode())
+        for i in range(frames_count)
+    ]
+
+    async def run():
+        samples = []
+        started = time.perf_counter()
+        for payload in payloads:
+            call_started = time.perf_counter()
+            await manager.notification_handler(None, payload)
+            samples.append(time.perf_counter() - call_started)
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0)
+        return elapsed, samples
+
+    elapsed, samples = asyncio.run(run())
+    app.db_writer.flush(timeout=60)
+    return {
+        'notification_handler_ops': _result(frames_count / elapsed, 'ops/s', True),
+        'notification_handler_p50_us': _result(statistics.median(samples) * 1e6, 'us', False),
+        'notification_handler_p99_us': _result(_percentile(samples, 99) * 1e6, 'us', False),
+    }
+
+
+# ----- 상태 변경 기록 -----
+
+def bench_state_change(app, args):
+    changes = args.state_changes
+    manager = app.DeviceManager('BENCH0002', 'BE:00:00:00:00:02', 'BENCH0002')
+    data = {'device_id': 'BENCH0002', 'distance': '120', 'raw': 2000, 'avg': 1990, 'diff': 12}
+    app.db_writer.flush(timeout=60)
+
+    samples = []
+    started = time.perf_counter()
+    for i in range(changes):
+        data['state'] = 'CLOSED' if i % 2 == 0 else 'OPEN'
+        call_started = time.perf_counter()
+        manager._check_state_change(data)
+        samples.append(time.perf_counter() - call_started)
+    app.db_writer.flush(timeout=120)
+    persisted = time.perf_counter() - started
+    return {
+        'state_change_call_p50_us': _result(statistics.median(samples) * 1e6, 'us', False),
+        'state_change_persisted_us': _result(persisted / changes * 1e6, 'us', False,
+                                             note='submit + write-behind commit, per change'),
+    }
+
+
+# ----- /api/devices -----
+
+def bench_api_devices(app, args):
+    from device_registry import DeviceRecord
+
+    client = app.app.test_client()
+    results = {}
+    for count in args.device_counts:
+        app.device_registry.clear()
+        app.link_quality.clear()
+        for index in range(count):
+            device_id = f'BENCH{index:04d}'
+            manager = _fake_manager(app, device_id)
+            manager.last_data = {'device_id': device_id, 'employee_name': None,
+                                 'timestamp': datetime.now().isoformat(), 'distance': '120',
+                                 'raw': 2000, 'avg': 1990, 'diff': 12, 'state': 'CLOSED', 'seq': None}
+            for _ in range(8):
+                app.link_quality.record(device_id)
+            app.device_registry.add(DeviceRecord(device_id, manager.address, device_id, manager))
+
+        samples = []
+        for _ in range(args.api_repeat):
+            started = time.perf_counter()
+            response = client.get('/api/devices')
+            samples.append(time.perf_counter() - started)
+            assert response.status_code == 200 and len(response.get_json()['devices']) == count
+        results[f'api_devices_{count}_p50_ms'] = _result(statistics.median(samples) * 1000, 'ms', False)
+        # p95 는 api_repeat 표본 몇 개로 정해져 실행마다 크게 흔들리므로 판정에서 제외
+        results[f'api_devices_{count}_p95_ms'] = _result(_percentile(samples, 95) * 1000, 'ms', False, gate=False)
+    app.device_registry.clear()
+    app.link_quality.clear()
+    return results
+
+
+# ----- 이벤트 로그 내보내기 -----
+
+def _populate_events(app, rows, day):
+    conn = app.db.get_connection()
+    try:
+        conn.execute('DELETE FROM event_logs')
+        conn.executemany('INSERT OR IGNORE INTO employees (name, employee_number, department, device_id) '
+                         'VALUES (?, ?, ?, ?)',
+                         [(f'직원{i}', f'B{i:05d}', f'부서{i % 10}', f'DEV{i:04d}') for i in range(500)])
+        conn.execute(f'''
+            WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < {rows - 1})
+            INSERT INTO event_logs (timestamp, device_id, employee_id, event_type, event_data, severity)
+            SELECT datetime(?, '+' || ((n * 7919) % 86400) || ' seconds'),
+                   'DEV' || printf('%04d', n % 500), (n % 500) + 1,
+                   CASE n % 2 WHEN 0 THEN 'wear_on' ELSE 'wear_off' END,
+                   '{{"distance": "120", "raw": 2000, "avg": 1990, "diff": 12, "state": "CLOSED"}}',
+                   CASE WHEN n % 2 = 1 THEN 'warning' ELSE 'info' END
+            FROM seq''', (f'{day} 00:00:00',))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _rss_bytes():
+    """힙/SQLite 페이지 캐시 등 익명 메모리 (Linux /proc/self/status 의 RssAnon)"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class RssSampler:
+    """with 블록 동안 RssAnon 을 주기적으로 읽어 시작 대비 최대 증가량 기록"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_growth = 0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self._start = _rss_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_growth = max(self.peak_growth, _rss_bytes() - self._start)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_growth = max(self.peak_growth, _rss_bytes() - self._start)
+
+
+def _export(client, fmt, day):
+    response = client.get(f'/api/logs/events/export?format={fmt}&date={day}')
+    assert response.status_code == 200, response.status_code
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    return size
+
+
+def bench_export(app, args):
+    rows = args.export_rows
+    day = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    started = time.perf_counter()
+    _populate_events(app, rows, day)
+    print(f'  populated {rows:,} event rows in {time.perf_counter() - started:.1f}s')
+
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+
+    results = {}
+    for fmt in args.export_formats:
+        with RssSampler() as sampler:
+            started = time.perf_counter()
+            size = _export(client, fmt, day)
+            elapsed = time.perf_counter() - started
+
+        results[f'export_{fmt}_seconds'] = _result(elapsed, 's', False, rows=rows, bytes=size)
+        results[f'export_{fmt}_rows_per_s'] = _result(rows / elapsed, 'rows/s', True)
+        results[f'export_{fmt}_rss_growth_mib'] = _result(sampler.peak_growth / (1024 * 1024), 'MiB', False)
+    return results
+
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'notification_handler': bench_notification_handler,
+    'state_change': bench_state_change,
+    'api_devices': bench_api_devices,
+    'export': bench_export,
+}
+
+
+# ----- 기준값 비교 -----
+
+def compare(results, baseline, tolerance):
+    """(이름, 현재, 기준, 변화율, 회귀 여부, 비고) 목록 - 변화율은 나빠진 방향이 양수
+
+    실행 인자가 기준값과 다르면 비교하지 않고, gate 가 꺼진 항목은 변화율만 표시
+    """
+    rows = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None or not reference['value']:
+            rows.append((name, result, None, None, False, 'no baseline'))
+            continue
+        if reference.get('params') != result.get('params'):
+            rows.append((name, result, reference, None, False, 'params differ'))
+            continue
+        ratio = result['value'] / reference['value']
+        change = (1 - ratio) if result['higher_is_better'] else (ratio - 1)
+        gated = result.get('gate', True)
+        rows.append((name, result, reference, change, gated and change > tolerance, '' if gated else 'not gated'))
+    return rows
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', help=f'쉼표로 구분한 그룹 ({", ".join(GROUPS)})')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='기준값 JSON 경로')
+    parser.add_argument('--update-baseline', action='store_true', help='현재 결과로 기준값 파일을 덮어씀')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='회귀로 볼 악화 비율 (기본 30%%)')
+    parser.add_argument('--repeat', type=int, default=5, help='처리량 측정 반복 횟수 (가장 빠른 실행 사용)')
+    parser.add_argument('--parse-iterations', type=int, default=100_000)
+    parser.add_argument('--notifications', type=int, default=20_000)
+    parser.add_argument('--state-changes', type=int, default=5_000)
+    parser.add_argument('--device-counts', default='10,100,1000')
+    parser.add_argument('--api-repeat', type=int, default=50)
+    parser.add_argument('--export-rows', type=int, default=1_000_000)
+    parser.add_argument('--export-formats', default='csv,ndjson', help='xlsx 도 지정 가능 (느림)')
+    args = parser.parse_args()
+    args.device_counts = [int(value) for value in args.device_counts.split(',') if value]
+    args.export_formats = [value for value in args.export_formats.split(',') if value]
+    groups = args.only.split(',') if args.only else list(GROUPS)
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f'unknown group: {", ".join(sorted(unknown))}')
+
+    tmp_dir = tempfile.mkdtemp(prefix='strap-bench-', dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+    _prepare_environment(tmp_dir)
+    import app  # noqa: E402  (환경 변수 설정 후 임포트)
+
+    results = {}
+    for group in groups:
+        print(f'{group} ...')
+        started = time.perf_counter()
+        group_results = BENCHMARKS[group](app, args)
+        params = {name: getattr(args, name) for name in GROUP_PARAMS[group]}
+        for result in group_results.values():
+            result['params'] = params
+        results.update(group_results)
+        print(f'  done in {time.perf_counter() - started:.1f}s')
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    rows = compare(results, baseline, args.tolerance)
+    print()
+    print(f'{"benchmark":<34} {"current":>14} {"baseline":>14} {"change":>9}')
+    for name, result, reference, change, regressed, note in rows:
+        current = f'{result["value"]:,.2f} {result["unit"]}'
+        previous = f'{reference["value"]:,.2f}' if reference else '-'
+        delta = f'{change * 100:+.1f}%' if change is not None else '-'
+        flag = '  REGRESSION' if regressed else (f'  ({note})' if note else '')
+        print(f'{name:<34} {current:>14} {previous:>14} {delta:>9}{flag}')
+
+    report = {'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.update_baseline:
+        # 일부 그룹만 실행한 경우 나머지 기준값은 유지
+        merged = dict(baseline)
+        merged.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'environment': report['environment'], 'results': merged}, f, indent=2,
+                      ensure_ascii=False, sort_keys=True)
+            f.write('\n')
+        print(f'\nbaseline updated: {args.baseline}')
+        return 0
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
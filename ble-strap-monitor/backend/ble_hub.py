@@ -0,0 +1,166 @@
+"""
+BLE 이벤트 루프 허브
+모든 DeviceManager 코루틴을 고정 크기의 asyncio 루프 풀에서 태스크로 실행
+"""
+import asyncio
+import concurrent.futures
+import logging
+from threading import Event, Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+
+class BleHub:
+    """디바이스별 태스크를 공유 이벤트 루프에 배치하고 스레드 안전한 제출 API 제공"""
+
+    def __init__(self, loop_count=1, name='ble-hub'):
+        self.loop_count = max(1, int(loop_count))
+        self.name = name
+        self._lock = Lock()
+        self._loops = []
+        self._threads = []
+        self._assignments = {}  # {device_id: loop}
+        self._tasks = {}  # {device_id: concurrent.futures.Future}
+
+    # ----- 수명 주기 -----
+
+    def start(self):
+        """루프 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self._loops:
+                return
+            for index in range(self.loop_count):
+                loop = asyncio.new_event_loop()
+                ready = Event()
+                thread = Thread(
+                    target=self._run_loop,
+                    args=(loop, ready),
+                    name=f'{self.name}-{index}',
+                    daemon=True
+                )
+                thread.start()
+                ready.wait()
+                self._loops.append(loop)
+                self._threads.append(thread)
+        logger.info(f"BLE hub started with {self.loop_count} event loop(s)")
+
+    def stop(self, timeout=5):
+        """모든 태스크를 취소하고 루프 종료"""
+        with self._lock:
+            loops, threads = self._loops, self._threads
+            self._loops, self._threads = [], []
+            self._assignments.clear()
+            self._tasks.clear()
+        for loop in loops:
+            if loop.is_running():
+                loop.call_soon_threadsafe(loop.stop)
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    def is_running(self):
+        with self._lock:
+            return bool(self._loops) and all(loop.is_running() for loop in self._loops)
+
+    @staticmethod
+    def _run_loop(loop, ready):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        except Exception as exc:
+            logger.error(f"BLE hub loop crashed: {exc}")
+        finally:
+            pending = asyncio.all_tasks(loop=loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    # ----- 루프 배정 -----
+
+    def loop_for(self, device_id):
+        """디바이스에 배정된 루프 반환 (없으면 가장 한가한 루프에 배정)"""
+        self.start()
+        with self._lock:
+            loop = self._assignments.get(device_id)
+            if loop is not None:
+                return loop
+            load = {id(loop): 0 for loop in self._loops}
+            for assigned in self._assignments.values():
+                load[id(assigned)] = load.get(id(assigned), 0) + 1
+            loop = min(self._loops, key=lambda candidate: load[id(candidate)])
+            self._assignments[device_id] = loop
+            return loop
+
+    def release(self, device_id):
+        """디바이스의 루프 배정 해제"""
+        with self._lock:
+            self._assignments.pop(device_id, None)
+
+    # ----- 태스크 제출 -----
+
+    def spawn(self, device_id, coro_factory):
+        """디바이스의 장기 실행 태스크(run_forever 등) 등록"""
+        self.cancel(device_id)
+        loop = self.loop_for(device_id)
+        future = asyncio.run_coroutine_threadsafe(coro_factory(), loop)
+
+        def _on_done(fut):
+            with self._lock:
+                if self._tasks.get(device_id) is fut:
+                    del self._tasks[device_id]
+            if not fut.cancelled() and fut.exception() is not None:
+                logger.error(f"[{device_id}] Hub task failed: {fut.exception()}")
+
+        with self._lock:
+            self._tasks[device_id] = future
+        future.add_done_callback(_on_done)
+        return future
+
+    def cancel(self, device_id):
+        """디바이스의 장기 실행 태스크 취소"""
+        with self._lock:
+            future = self._tasks.pop(device_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+            return True
+        return False
+
+    def submit(self, device_id, coro):
+        """디바이스 루프에서 코루틴 실행 (concurrent.futures.Future 반환)"""
+        if not self.is_running():
+            coro.close()
+            raise RuntimeError('loop_inactive')
+        return asyncio.run_coroutine_threadsafe(coro, self.loop_for(device_id))
+
+    def run(self, device_id, coro, timeout=10):
+        """코루틴을 디바이스 루프에서 실행하고 결과를 기다림"""
+        future = self.submit(device_id, coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError as exc:
+            future.cancel()
+            raise TimeoutError('timeout') from exc
+
+    def call_soon(self, device_id, callback, *args):
+        """디바이스 루프에서 콜백 실행 예약"""
+        if not self.is_running():
+            raise RuntimeError('loop_inactive')
+        self.loop_for(device_id).call_soon_threadsafe(callback, *args)
+
+    # ----- 상태 -----
+
+    def stats(self):
+        """루프/태스크 현황"""
+        with self._lock:
+            per_loop = []
+            for loop in self._loops:
+                per_loop.append(sum(1 for assigned in self._assignments.values() if assigned is loop))
+            return {
+                'loops': len(self._loops),
+                'threads': sum(1 for thread in self._threads if thread.is_alive()),
+                'tasks': len(self._tasks),
+                'devices_per_loop': per_loop
+            }
@@ -0,0 +1,190 @@
+"""
+BLE 스캔 서비스
+BLE 허브 루프에서 BleakScanner 를 detection callback 으로 실행하고 광고 정보를 TTL 캐시에 유지
+스캔 창(window) 요청 시 창이 열려 있는 동안 새로 발견된 기기를 즉시 전송
+"""
+import asyncio
+import logging
+import time
+import uuid
+from threading import Lock
+
+from bleak import BleakScanner
+
+logger = logging.getLogger(__name__)
+
+# 허브에서 스캐너 태스크/루프 배정에 쓰는 키
+SCANNER_TASK_ID = '__scanner__'
+
+# 스캐너 시작 실패 시 재시도 대기(초)
+RESTART_DELAY_SECONDS = 5.0
+
+
+class _ScanWindow:
+    __slots__ = ('id', 'ends_at', 'seen')
+
+    def __init__(self, seconds):
+        self.id = uuid.uuid4().hex[:8]
+        self.ends_at = time.monotonic() + seconds
+        self.seen = set()
+
+
+class ScanService:
+    """광고 캐시(주소 → 이름/RSSI/마지막 수신 시각)와 스캔 창 관리"""
+
+    def __init__(self, hub, emit, ttl=30.0, name_filter='ESP32', background=True, scanner_factory=BleakScanner):
+        self.hub = hub
+        self.emit = emit  # (event, data) → Socket.IO 전송
+        self.ttl = ttl
+        self.name_filter = name_filter
+        self.background = background  # False 면 스캔 창이 열려 있을 때만 스캔
+        self.scanner_factory = scanner_factory
+        self._lock = Lock()
+        self._cache = {}
+        self._windows = []
+        self._wake = None
+        self._loop = None
+        self._started = False
+        self._scanning = False
+        self._counters = {'advertisements': 0, 'windows': 0, 'scanner_errors': 0}
+
+    def start(self):
+        """허브 루프에 스캐너 태스크 등록 (여러 번 호출해도 한 번만)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.hub.spawn(SCANNER_TASK_ID, self._run)
+
+    # ----- 조회 -----
+
+    def devices(self):
+        """TTL 안에 광고가 수신된 기기 목록 (RSSI 높은 순)"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [address for address, entry in self._cache.items() if entry['last_seen'] < cutoff]
+            for address in expired:
+                del self._cache[address]
+            entries = [dict(entry) for entry in self._cache.values()]
+        entries.sort(key=lambda entry: entry['rssi'] if entry['rssi'] is not None else -999, reverse=True)
+        return entries
+
+    def rssi(self, address):
+        """TTL 안에 받은 마지막 광고의 (RSSI, 수신 시각) 또는 None"""
+        with self._lock:
+            entry = self._cache.get(address)
+            if entry is None or entry['last_seen'] < time.time() - self.ttl:
+                return None
+            return entry['rssi'], entry['last_seen']
+
+    def request_window(self, seconds):
+        """스캔 창 열기 → 창 id (창이 닫히면 scan_complete 전송)"""
+        window = _ScanWindow(max(0.5, float(seconds)))
+        with self._lock:
+            self._windows.append(window)
+            self._counters['windows'] += 1
+        self.start()
+        self._notify()
+        return window
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._counters)
+            snapshot.update({
+                'scanning': self._scanning,
+                'background': self.background,
+                'cached': len(self._cache),
+                'open_windows': len(self._windows),
+                'ttl_seconds': self.ttl
+            })
+        return snapshot
+
+    # ----- 스캐너 루프 -----
+
+    def _notify(self):
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            loop.call_soon_threadsafe(wake.set)
+
+    def _should_scan(self):
+        with self._lock:
+            return self.background or bool(self._windows)
+
+    def _next_deadline(self):
+        with self._lock:
+            if not self._windows:
+                return None
+            return max(0.0, min(window.ends_at for window in self._windows) - time.monotonic())
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            if not self._should_scan():
+                await self._wake.wait()
+                self._wake.clear()
+                continue
+
+            scanner = self.scanner_factory(detection_callback=self._on_detect)
+            try:
+                await scanner.start()
+                self._scanning = True
+                logger.info("BLE scanner started")
+                while self._should_scan():
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=self._next_deadline())
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    self._close_windows()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._counters['scanner_errors'] += 1
+                logger.error(f"BLE scanner failed: {exc}")
+                self._close_windows(force=True)
+                await asyncio.sleep(RESTART_DELAY_SECONDS)
+            finally:
+                self._scanning = False
+                try:
+                    await scanner.stop()
+                except Exception:
+                    pass
+            logger.info("BLE scanner stopped")
+
+    def _close_windows(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            closed = [window for window in self._windows if force or window.ends_at <= now]
+            self._windows = [window for window in self._windows if window not in closed]
+        if not closed:
+            return
+        devices = self.devices()
+        for window in closed:
+            logger.info(f"Scan window {window.id} closed ({len(window.seen)} new, {len(devices)} cached)")
+            self.emit('scan_complete', {'window_id': window.id, 'devices': devices})
+
+    def _on_detect(self, device, advertisement):
+        """detection callback (허브 루프) - 캐시 갱신, 열린 창에서 처음 본 기기는 즉시 전송"""
+        name = advertisement.local_name or device.name
+        if self.name_filter and (not name or self.name_filter not in name):
+            return
+        now = time.time()
+        with self._lock:
+            self._counters['advertisements'] += 1
+            entry = self._cache.get(device.address)
+            if entry is None:
+                entry = {'address': device.address, 'name': name, 'rssi': None,
+                         'first_seen': now, 'last_seen': now}
+                self._cache[device.address] = entry
+            entry['name'] = name or entry['name']
+            entry['rssi'] = advertisement.rssi
+            entry['last_seen'] = now
+            snapshot = dict(entry)
+            fresh = []
+            for window in self._windows:
+                if device.address not in window.seen:
+                    window.seen.add(device.address)
+                    fresh.append(window.id)
+        for window_id in fresh:
+            self.emit('scan_result', {'window_id': window_id, 'device': snapshot})
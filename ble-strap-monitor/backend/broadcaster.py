@@ -0,0 +1,162 @@
+"""
+device_data 브로드캐스트 집계기
+디바이스별 최신 프레임만 보관했다가 주기마다 device_data_batch 로 묶어 룸 단위로 전송
+"""
+import logging
+import time
+from threading import Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+ROOM_ALL = 'devices:all'
+
+
+def department_room(department):
+    return f'dept:{department}'
+
+
+def device_room(device_id):
+    return f'device:{device_id}'
+
+
+class DeviceDataAggregator:
+    """프레임 병합 후 틱마다 일괄 전송 (상태 변경 등 긴급 프레임은 즉시 전송)"""
+
+    def __init__(self, socketio, interval_ms=250, event_name='device_data_batch', namespace='/'):
+        self.socketio = socketio
+        self.interval = max(10, int(interval_ms)) / 1000.0
+        self.event_name = event_name
+        self.namespace = namespace
+        self._pending = {}  # {device_id: (payload, department)}
+        self._subscriptions = {}  # {sid: set(rooms)}
+        self._room_refs = {}  # {room: 구독 클라이언트 수}
+        self._lock = Lock()
+        self._thread = None
+        self._stats = {'published': 0, 'coalesced': 0, 'batches': 0, 'emits': 0}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, name='device-data-aggregator', daemon=True)
+            self._thread.start()
+
+    # ----- 구독 관리 -----
+
+    def subscribe(self, sid, rooms):
+        """클라이언트의 구독 룸 교체, (추가된 룸, 제거된 룸) 반환"""
+        rooms = set(rooms)
+        with self._lock:
+            previous = self._subscriptions.get(sid, set())
+            added = rooms - previous
+            removed = previous - rooms
+            for room in added:
+                self._room_refs[room] = self._room_refs.get(room, 0) + 1
+            for room in removed:
+                self._release_room(room)
+            self._subscriptions[sid] = rooms
+        return added, removed
+
+    def unsubscribe(self, sid):
+        """클라이언트 연결 해제 시 구독 정리"""
+        with self._lock:
+            rooms = self._subscriptions.pop(sid, set())
+            for room in rooms:
+                self._release_room(room)
+        return rooms
+
+    def subscriptions(self, sid):
+        with self._lock:
+            return set(self._subscriptions.get(sid, set()))
+
+    def _release_room(self, room):
+        count = self._room_refs.get(room, 0) - 1
+        if count > 0:
+            self._room_refs[room] = count
+        else:
+            self._room_refs.pop(room, None)
+
+    # ----- 프레임 등록/전송 -----
+
+    def publish(self, device_id, payload, department=None, urgent=False):
+        """디바이스 최신 프레임 등록 (urgent=True 이면 해당 디바이스 프레임을 즉시 전송)"""
+        self.start()
+        with self._lock:
+            if device_id in self._pending:
+                self._stats['coalesced'] += 1
+            self._pending[device_id] = (payload, department)
+            self._stats['published'] += 1
+        if urgent:
+            self.flush_device(device_id)
+
+    def flush_device(self, device_id):
+        """특정 디바이스의 대기 프레임을 즉시 전송"""
+        with self._lock:
+            item = self._pending.pop(device_id, None)
+        if item is not None:
+            self._emit_batch({device_id: item})
+
+    def flush(self):
+        """대기 중인 모든 프레임 전송"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            self._emit_batch(pending)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['pending'] = len(self._pending)
+            snapshot['subscribers'] = len(self._subscriptions)
+            snapshot['rooms'] = dict(self._room_refs)
+        snapshot['interval_ms'] = int(self.interval * 1000)
+        return snapshot
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.error(f"device_data batch flush failed: {exc}")
+            remaining = self.interval - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _emit_batch(self, pending):
+        """구독자가 있는 전체/부서/디바이스 룸에만 해당 프레임을 묶어서 전송"""
+        with self._lock:
+            active_rooms = set(self._room_refs)
+        if not active_rooms:
+            return
+
+        timestamp = time.time()
+        emits = 0
+        if ROOM_ALL in active_rooms:
+            self._emit(ROOM_ALL, [payload for payload, _ in pending.values()], timestamp)
+            emits += 1
+
+        by_department = {}
+        for device_id, (payload, department) in pending.items():
+            if department and department_room(department) in active_rooms:
+                by_department.setdefault(department, []).append(payload)
+            room = device_room(device_id)
+            if room in active_rooms:
+                self._emit(room, [payload], timestamp)
+                emits += 1
+        for department, items in by_department.items():
+            self._emit(department_room(department), items, timestamp)
+            emits += 1
+
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['emits'] += emits
+
+    def _emit(self, room, items, timestamp):
+        self.socketio.emit(self.event_name, {
+            'devices': items,
+            'count': len(items),
+            'server_time': timestamp
+        }, to=room, namespace=self.namespace)
@@ -0,0 +1,189 @@
+"""
+일괄 명령 작업
+여러 디바이스에 같은 명령을 BLE 허브에서 동시 전송하고 작업 id 별 진행 상황/지연 시간 분포를 보관
+"""
+import bisect
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock, Thread
+
+import fanout
+
+logger = logging.getLogger(__name__)
+
+# 지연 시간 히스토그램 상한(ms), 마지막 구간은 그 이상
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+ERROR_MESSAGES = {
+    fanout.ERROR_TIMEOUT: '명령 전송 시간이 초과되었습니다.',
+    fanout.ERROR_DEADLINE: '작업 제한 시간 내에 처리하지 못했습니다.',
+    fanout.ERROR_LOOP_INACTIVE: '디바이스 연결 루프가 실행 중이 아닙니다.',
+}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def latency_summary(latencies):
+    """성공한 전송의 지연 시간(ms) 목록 → 히스토그램과 백분위"""
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for value in latencies:
+        counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+    buckets = [{'le_ms': bound, 'count': count} for bound, count in zip(LATENCY_BUCKETS_MS, counts)]
+    buckets.append({'le_ms': None, 'count': counts[-1]})
+
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+    return {
+        'count': len(ordered),
+        'min_ms': ordered[0] if ordered else None,
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'max_ms': ordered[-1] if ordered else None,
+        'buckets': buckets
+    }
+
+
+class CommandJob:
+    """일괄 명령 1건의 상태 (결과는 디바이스가 끝나는 순서대로 누적)"""
+
+    def __init__(self, command, device_ids, action=None, selector=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.command = command
+        self.action = action
+        self.selector = selector
+        self.device_ids = list(device_ids)
+        self.status = 'pending'
+        self.created_at = _now()
+        self.completed_at = None
+        self.elapsed_ms = None
+        self.results = []
+        self.success = 0
+        self.failed = 0
+        self.rejected = 0  # 전송은 됐지만 펌웨어가 UNKNOWN/ERR 로 응답
+        self.histogram = None
+
+    def summary(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'action': self.action,
+            'command': self.command,
+            'selector': self.selector,
+            'total': len(self.device_ids),
+            'completed': len(self.results),
+            'success': self.success,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'created_at': self.created_at,
+            'completed_at': self.completed_at,
+            'elapsed_ms': self.elapsed_ms,
+            'latency': self.histogram
+        }
+
+    def to_dict(self):
+        data = self.summary()
+        data['results'] = list(self.results)
+        return data
+
+
+class CommandJobStore:
+    """작업 생성/실행과 최근 작업 보관 (오래된 완료 작업부터 정리)"""
+
+    def __init__(self, hub, emit, concurrency=16, deadline=60.0, item_timeout=10.0, history=50):
+        self.hub = hub
+        self.emit = emit  # (event, data) → Socket.IO 전송
+        self.concurrency = concurrency
+        self.deadline = deadline
+        self.item_timeout = item_timeout
+        self.history = history
+        self._jobs = OrderedDict()
+        self._lock = Lock()
+
+    def submit(self, command, managers, action=None, selector=None):
+        """managers({device_id: DeviceManager}) 에 command 를 보내는 작업을 시작하고 즉시 반환"""
+        job = CommandJob(command, managers.keys(), action=action, selector=selector)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        Thread(target=self._run, args=(job, dict(managers)), name=f'command-job-{job.id}', daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self, limit=20):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.summary() for job in reversed(jobs[-limit:])]
+
+    def _trim(self):
+        while len(self._jobs) > self.history:
+            oldest_id = next(iter(self._jobs))
+            if self._jobs[oldest_id].status == 'running':
+                break
+            self._jobs.pop(oldest_id)
+
+    def _run(self, job, managers):
+        started = time.monotonic()
+        job.status = 'running'
+        self.emit('bulk_command_job', job.summary())
+        latencies = []
+
+        def on_result(result):
+            error = result['error']
+            reply = result['value'] if isinstance(result['value'], dict) else {}
+            outcome = {
+                'job_id': job.id,
+                'device_id': result['device_id'],
+                'success': result['success'],
+                'error': ERROR_MESSAGES.get(error, error),
+                'error_code': error if error in ERROR_MESSAGES else None,
+                'response': reply.get('response'),
+                'accepted': reply.get('accepted'),
+                'elapsed_ms': result['elapsed_ms'],
+                'timestamp': _now()
+            }
+            with self._lock:
+                job.results.append(outcome)
+                if result['success']:
+                    job.success += 1
+                    latencies.append(result['elapsed_ms'])
+                    if reply.get('accepted') is False:
+                        job.rejected += 1
+                else:
+                    job.failed += 1
+            self.emit('bulk_command_result', outcome)
+
+        try:
+            fanout.fan_out(
+                self.hub, job.device_ids,
+                lambda device_id: managers[device_id].send_command(job.command),
+                on_result=on_result,
+                concurrency=self.concurrency,
+                deadline=self.deadline,
+                item_timeout=self.item_timeout
+            )
+            job.status = 'completed'
+        except Exception as exc:
+            logger.error(f"Bulk command job {job.id} failed: {exc}")
+            job.status = 'failed'
+
+        with self._lock:
+            job.histogram = latency_summary(latencies)
+            job.elapsed_ms = round((time.monotonic() - started) * 1000, 3)
+            job.completed_at = _now()
+        logger.info(f"Bulk command job {job.id} ({job.command}) {job.status}: "
+                    f"{job.success}/{len(job.device_ids)} ok in {job.elapsed_ms:.0f} ms")
+        self.emit('bulk_command_job', job.summary())
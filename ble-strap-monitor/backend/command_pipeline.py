@@ -0,0 +1,177 @@
+"""
+디바이스 명령 파이프라인
+명령 쓰기를 응답을 기다리지 않고 이어서 보내고, 펌웨어의 RESP: 알림을 보낸 순서대로 대기 중인 명령에 매칭
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_PREFIX = 'RESP:'
+
+# 명령 접두사 → 기대 응답 키 (펌웨어는 명령 1건당 RESP: 1건을 수신 순서대로 전송)
+RESPONSE_KEYS = {
+    'FMT': 'FMT',
+    'RATE': 'RATE',
+    'CAL': 'CAL',
+    'BEEP': 'BEEP',
+    'STATE': 'STATE',
+    'AUX': 'AUX',
+    'MOSFET': 'AUX',
+    'AUX2': 'AUX2',
+    'MOSFET2': 'AUX2',
+    'BUZZER': 'BUZZER',
+    'GPIO': 'GPIO',
+    'GPIOF': 'GPIO',
+    'POLICY': 'POLICY',
+}
+
+# 응답 알림이 없는 명령 (쓰기 확인만 기다림)
+NO_RESPONSE_COMMANDS = {'ONCE'}
+
+UNKNOWN_KEY = 'UNKNOWN'
+
+
+def response_key(command):
+    """명령의 기대 응답 키 (응답이 없는 명령은 None, 펌웨어가 모르는 명령은 UNKNOWN)"""
+    upper = command.strip().upper()
+    if upper in NO_RESPONSE_COMMANDS:
+        return None
+    return RESPONSE_KEYS.get(upper.split(':', 1)[0], UNKNOWN_KEY)
+
+
+def reply_key(text):
+    """'RESP:GPIO=4,HIGH' → 'GPIO', 'RESP:CAL-OK' → 'CAL'"""
+    body = text[len(RESPONSE_PREFIX):]
+    for index, char in enumerate(body):
+        if char in '=-,':
+            return body[:index].upper()
+    return body.strip().upper()
+
+
+def is_rejection(text):
+    """펌웨어가 명령을 처리하지 못했다는 응답인지 (RESP:UNKNOWN, RESP:GPIO=ERR,... 등)"""
+    return reply_key(text) == UNKNOWN_KEY or '=ERR' in text
+
+
+class ResponseLost(Exception):
+    """뒤에 보낸 명령의 응답이 먼저 도착 - 이 명령의 응답 알림은 유실됨"""
+
+
+class _Pending:
+    __slots__ = ('command', 'key', 'future', 'started')
+
+    def __init__(self, command, key, future, started):
+        self.command = command
+        self.key = key
+        self.future = future
+        self.started = started
+
+
+def _settle(future, result=None, exc=None):
+    def apply():
+        if future.done():
+            return
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is future.get_loop():
+        apply()
+    else:
+        future.get_loop().call_soon_threadsafe(apply)
+
+
+class CommandPipeline:
+    """디바이스 1대의 명령 큐 (request 는 디바이스 루프에서, handle_response 는 알림 핸들러에서 호출)"""
+
+    def __init__(self, write, timeout=5.0, max_in_flight=4):
+        self._write = write  # async (command) → GATT 쓰기
+        self.timeout = timeout
+        self._window = asyncio.Semaphore(max(1, int(max_in_flight)))
+        self._pending = deque()
+        self._counters = {'sent': 0, 'replies': 0, 'timeouts': 0, 'lost': 0, 'unmatched': 0}
+        self._latency_total = 0.0
+
+    async def request(self, command, timeout=None):
+        """명령을 보내고 응답 dict {command, response, accepted, latency_ms} 반환 (응답 시간 초과 시 TimeoutError)"""
+        timeout = self.timeout if timeout is None else timeout
+        key = response_key(command)
+        async with self._window:
+            started = time.perf_counter()
+            if key is None:
+                await self._write(command)
+                self._counters['sent'] += 1
+                return self._reply(command, None, started)
+
+            entry = _Pending(command, key, asyncio.get_running_loop().create_future(), started)
+            # 쓰기 확인보다 응답 알림이 먼저 올 수 있으므로 쓰기 전에 등록
+            self._pending.append(entry)
+            try:
+                await self._write(command)
+                self._counters['sent'] += 1
+                response = await asyncio.wait_for(entry.future, timeout)
+            except asyncio.TimeoutError:
+                self._counters['timeouts'] += 1
+                raise TimeoutError('timeout')
+            finally:
+                self._discard(entry)
+            return self._reply(command, response, started)
+
+    def _reply(self, command, response, started):
+        latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        if response is not None:
+            self._counters['replies'] += 1
+            self._latency_total += latency_ms
+        return {
+            'command': command,
+            'response': response,
+            'accepted': response is None or not is_rejection(response),
+            'latency_ms': latency_ms
+        }
+
+    def _discard(self, entry):
+        try:
+            self._pending.remove(entry)
+        except ValueError:
+            pass
+
+    def handle_response(self, text):
+        """RESP: 알림을 가장 오래된 대기 명령부터 매칭, 매칭되면 True"""
+        key = reply_key(text)
+        for index, entry in enumerate(self._pending):
+            if entry.key == key or key == UNKNOWN_KEY:
+                break
+        else:
+            self._counters['unmatched'] += 1
+            logger.debug(f"Unmatched response: {text}")
+            return False
+
+        # 응답은 보낸 순서대로 오므로 앞선 명령의 응답은 유실된 것
+        for _ in range(index):
+            lost = self._pending.popleft()
+            self._counters['lost'] += 1
+            _settle(lost.future, exc=ResponseLost(f'response_lost: {lost.command}'))
+        entry = self._pending.popleft()
+        _settle(entry.future, result=text)
+        return True
+
+    def fail_all(self, exc=None):
+        """연결 해제 시 대기 중인 명령을 모두 실패 처리 (어느 스레드에서든 호출 가능)"""
+        while self._pending:
+            entry = self._pending.popleft()
+            _settle(entry.future, exc=exc or Exception('Device not connected'))
+
+    def stats(self):
+        snapshot = dict(self._counters)
+        snapshot['pending'] = len(self._pending)
+        replies = self._counters['replies']
+        snapshot['avg_latency_ms'] = round(self._latency_total / replies, 3) if replies else None
+        return snapshot
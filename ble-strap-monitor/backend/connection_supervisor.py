@@ -0,0 +1,116 @@
+"""
+BLE 연결 감독
+재연결 지연(지터가 있는 지수 백오프)과 어댑터 동시 연결 시도 제한/시작 간격(ConnectGate)
+"""
+import asyncio
+import contextlib
+import random
+import time
+from collections import deque
+from threading import Lock
+
+
+class Backoff:
+    """equal jitter 지수 백오프 - 상한의 절반 + 나머지 절반 범위의 난수 (기기들이 같은 순간에 몰리지 않도록)"""
+
+    def __init__(self, base=2.0, maximum=60.0, factor=2.0):
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+        self.attempt = 0
+
+    def next(self):
+        cap = min(self.maximum, self.base * (self.factor ** self.attempt))
+        self.attempt += 1
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def reset(self):
+        self.attempt = 0
+
+
+class ConnectGate:
+    """동시에 진행되는 connect() 수를 제한하고 시작 시각을 spacing 간격으로 벌림
+
+    여러 허브 루프에서 공유하므로 대기자는 각자의 루프 future 로 깨우고, 순서는 요청 순(FIFO).
+    """
+
+    def __init__(self, max_concurrent=4, spacing=0.25):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.spacing = max(0.0, spacing)
+        self._lock = Lock()
+        self._in_flight = 0
+        self._waiters = deque()
+        self._next_start = 0.0
+        self._counters = {'connects': 0, 'queued': 0, 'max_waiting': 0}
+
+    async def acquire(self):
+        waiter = None
+        with self._lock:
+            if self._in_flight < self.max_concurrent and not self._waiters:
+                self._in_flight += 1
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                self._counters['queued'] += 1
+                self._counters['max_waiting'] = max(self._counters['max_waiting'], len(self._waiters))
+
+        if waiter is not None:
+            try:
+                # release() 가 슬롯을 넘겨주면 깨어남 (_in_flight 는 이미 반영됨)
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    handed_over = waiter not in self._waiters
+                    if not handed_over:
+                        self._waiters.remove(waiter)
+                # 슬롯은 결과가 설정된 대기자만 소유 - 결과 전에 취소됐으면 _hand_over 가 다음 대기자에게 넘김
+                if handed_over and not waiter.cancelled():
+                    self.release()
+                raise
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.spacing
+            self._counters['connects'] += 1
+        if start > now:
+            try:
+                await asyncio.sleep(start - now)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.get_loop().call_soon_threadsafe(self._hand_over, waiter)
+                return
+            self._in_flight -= 1
+
+    def _hand_over(self, waiter):
+        """대기자 루프에서 실행 - 취소 처리와 같은 루프이므로 둘 중 한쪽만 슬롯을 반환"""
+        if waiter.done():
+            # 넘겨받기 직전에 취소된 대기자 (취소 처리 쪽은 반환하지 않음) - 다음 대기자에게 다시 넘김
+            self.release()
+        else:
+            waiter.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._counters)
+            snapshot.update({
+                'in_flight': self._in_flight,
+                'waiting': len(self._waiters),
+                'max_concurrent': self.max_concurrent,
+                'spacing_ms': int(self.spacing * 1000)
+            })
+        return snapshot
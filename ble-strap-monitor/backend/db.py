@@ -0,0 +1,133 @@
+"""
+SQLite 접근 계층
+WAL 모드/synchronous=NORMAL/mmap 이 적용된 연결을 풀에서 재사용
+"""
+import logging
+import os
+import sqlite3
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.environ.get('STRAP_MONITOR_DB', 'strap_monitor.db')
+DB_MMAP_BYTES = int(os.environ.get('STRAP_MONITOR_DB_MMAP_MB', '256')) * 1024 * 1024
+DB_POOL_SIZE = int(os.environ.get('STRAP_MONITOR_DB_POOL', '8'))
+DB_CACHED_STATEMENTS = 256
+DB_BUSY_TIMEOUT_MS = 5000
+
+_pool_lock = Lock()
+_idle = []  # 반납된 유휴 연결
+_generation = 0  # close_all() 이후 이전 세대 연결은 반납 시 폐기
+
+
+def configure(path):
+    """DB 파일 경로 변경 (기존 연결은 모두 닫음)"""
+    global DB_PATH
+    close_all()
+    DB_PATH = path
+
+
+def connect():
+    """풀과 무관한 새 연결 생성 (전용 스레드용)"""
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000.0,
+        check_same_thread=False,
+        cached_statements=DB_CACHED_STATEMENTS
+    )
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA mmap_size={DB_MMAP_BYTES}')
+    conn.execute(f'PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+
+class PooledConnection:
+    """sqlite3.Connection 대리 객체 - close() 시 실제로 닫지 않고 풀에 반납"""
+
+    __slots__ = ('_conn', '_generation')
+
+    def __init__(self, conn, generation):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_generation', generation)
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, '_conn')
+        if conn is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    def close(self):
+        conn = object.__getattribute__(self, '_conn')
+        if conn is None:
+            return
+        object.__setattr__(self, '_conn', None)
+        _release(conn, self._generation)
+
+    def __del__(self):
+        # 반납되지 않은 연결이 쓰기 잠금을 계속 쥐고 있지 않도록 회수
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def get_connection():
+    """풀에서 연결을 빌려옴 (사용 후 close() 로 반납)"""
+    with _pool_lock:
+        generation = _generation
+        conn = _idle.pop() if _idle else None
+    if conn is None:
+        conn = connect()
+    return PooledConnection(conn, generation)
+
+
+def _release(conn, generation):
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+    except sqlite3.Error as exc:
+        logger.error(f"Discarding broken pooled connection: {exc}")
+        conn.close()
+        return
+
+    with _pool_lock:
+        if generation == _generation and len(_idle) < DB_POOL_SIZE:
+            _idle.append(conn)
+            return
+    conn.close()
+
+
+def close_all():
+    """유휴 연결을 닫고 사용 중인 연결은 반납 시 폐기되도록 세대 증가"""
+    global _generation
+    with _pool_lock:
+        _generation += 1
+        idle = list(_idle)
+        _idle.clear()
+    for conn in idle:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+def remove_database():
+    """연결을 모두 닫고 DB 파일(WAL/SHM 포함) 삭제"""
+    close_all()
+    for suffix in ('', '-wal', '-shm'):
+        path = DB_PATH + suffix
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,236 @@
+"""
+쓰기 지연(write-behind) SQLite 작성기
+BLE 콜백의 INSERT/UPDATE 를 큐에 모아 N ms 또는 M 행마다 하나의 트랜잭션으로 반영
+센서/롤업처럼 유실 가능한 쓰기는 큐 적체가 상한을 넘으면 버리고, 이벤트/세션 쓰기는 대기도 유실도 없이 항상 넣음
+"""
+import logging
+import queue
+import sqlite3
+import time
+from threading import Event, Lock, Thread
+
+import metrics
+
+logger = logging.getLogger('db.writer')
+
+# 큐가 가득 차 버린 쓰기 경고 로그 최소 간격(초) - 그 사이 버린 건수는 합쳐서 기록
+DROP_WARNING_INTERVAL = 10.0
+
+DB_WRITE_SECONDS = metrics.REGISTRY.histogram(
+    'strap_db_write_batch_seconds', 'Write-behind batch transaction latency')
+DB_ROWS_WRITTEN = metrics.REGISTRY.counter(
+    'strap_db_rows_written_total', 'Rows written by the write-behind writer')
+DB_WRITES_DROPPED = metrics.REGISTRY.counter(
+    'strap_db_writes_dropped_total', 'Writes dropped because the writer queue was full')
+
+
+class _FlushMarker:
+    """큐에 삽입되어 해당 지점까지의 쓰기가 반영되었음을 알리는 표식"""
+
+    __slots__ = ('done', 'close')
+
+    def __init__(self, close=False):
+        self.done = Event()
+        self.close = close
+
+
+class DbWriter:
+    """전용 스레드에서 배치 단위로 SQL 쓰기를 수행"""
+
+    def __init__(self, connect, flush_interval_ms=250, max_batch_rows=500, max_queue=10000):
+        self._connect = connect  # 작성 스레드 전용 연결 생성 함수
+        self.flush_interval = max(1, int(flush_interval_ms)) / 1000.0
+        self.max_batch_rows = max(1, int(max_batch_rows))
+        self.max_queue = max(1, int(max_queue))  # 유실 가능한 쓰기를 받는 큐 적체 상한
+        self._queue = queue.Queue()  # 크기 제한 없음 - 상한은 submit() 에서 유실 가능한 쓰기에만 적용
+        self._drop_lock = Lock()
+        self._dropped_since_warning = 0
+        self._last_drop_warning = 0.0
+        self._conn = None
+        self._thread = None
+        self._start_lock = Lock()
+        self._stats_lock = Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'errors': 0,
+            'batches': 0,
+            'high_water': 0,
+            'last_batch_rows': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'last_flush_at': None
+        }
+
+    # ----- 수명 주기 -----
+
+    def start(self):
+        """작성 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, name='db-writer', daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout=5.0, close=False):
+        """현재까지 큐에 쌓인 쓰기를 반영할 때까지 대기 (close=True 이면 연결도 닫음)"""
+        self.start()
+        marker = _FlushMarker(close=close)
+        self._queue.put_nowait(marker)
+        return marker.done.wait(timeout)
+
+    # ----- 제출 -----
+
+    def submit(self, sql, params=(), critical=False):
+        """쓰기 작업을 큐에 넣고 즉시 반환 (버려지면 False) - BLE 허브 루프에서 호출되므로 절대 대기하지 않음
+
+        critical=True 인 작업(이벤트/세션)은 적체와 관계없이 항상 넣고,
+        센서 샘플처럼 유실 가능한 작업은 적체가 max_queue 이상이면 버린다.
+        """
+        self.start()
+        depth = self._queue.qsize()
+        if not critical and depth >= self.max_queue:
+            self._dropped(sql)
+            return False
+        self._queue.put_nowait((sql, params))
+
+        depth += 1
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+            if depth > self._stats['high_water']:
+                self._stats['high_water'] = depth
+        return True
+
+    def _dropped(self, sql):
+        DB_WRITES_DROPPED.inc()
+        with self._stats_lock:
+            self._stats['dropped'] += 1
+        now = time.monotonic()
+        with self._drop_lock:
+            self._dropped_since_warning += 1
+            if now - self._last_drop_warning < DROP_WARNING_INTERVAL:
+                return
+            count = self._dropped_since_warning
+            self._dropped_since_warning = 0
+            self._last_drop_warning = now
+        logger.warning(f"DB writer queue full, dropped {count} write(s) (latest: {' '.join(sql.split()[:3])})")
+
+    # ----- 상태 -----
+
+    def stats(self):
+        """큐 적체 및 반영 지표"""
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot['queue_depth'] = self._queue.qsize()
+        snapshot['queue_capacity'] = self.max_queue
+        snapshot['queue_utilization'] = round(snapshot['queue_depth'] / self.max_queue, 4)
+        snapshot['flush_interval_ms'] = int(self.flush_interval * 1000)
+        snapshot['max_batch_rows'] = self.max_batch_rows
+        snapshot['running'] = bool(self._thread and self._thread.is_alive())
+        return snapshot
+
+    # ----- 작성 스레드 -----
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _close_connection(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error as exc:
+                logger.error(f"DB writer close error: {exc}")
+            self._conn = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            markers = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if isinstance(item, _FlushMarker):
+                    markers.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch_rows:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+            for marker in markers:
+                if marker.close:
+                    self._close_connection()
+                marker.done.set()
+
+    def _write_batch(self, batch):
+        started = time.perf_counter()
+        written = 0
+        errors = 0
+        try:
+            conn = self._connection()
+            with conn:
+                written = self._execute_grouped(conn, batch)
+        except sqlite3.Error as exc:
+            logger.error(f"DB writer batch failed ({len(batch)} rows), retrying row by row: {exc}")
+            written, errors = self._write_rows_individually(batch)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        DB_WRITE_SECONDS.observe(elapsed_ms / 1000)
+        DB_ROWS_WRITTEN.inc(amount=written)
+        with self._stats_lock:
+            self._stats['written'] += written
+            self._stats['errors'] += errors
+            self._stats['batches'] += 1
+            self._stats['last_batch_rows'] = len(batch)
+            self._stats['last_flush_ms'] = round(elapsed_ms, 3)
+            if elapsed_ms > self._stats['max_flush_ms']:
+                self._stats['max_flush_ms'] = round(elapsed_ms, 3)
+            self._stats['last_flush_at'] = time.time()
+
+    @staticmethod
+    def _execute_grouped(conn, batch):
+        """연속된 동일 SQL 은 executemany 로 묶어서 실행"""
+        index = 0
+        while index < len(batch):
+            sql = batch[index][0]
+            end = index + 1
+            while end < len(batch) and batch[end][0] == sql:
+                end += 1
+            if end - index == 1:
+                conn.execute(sql, batch[index][1])
+            else:
+                conn.executemany(sql, [params for _, params in batch[index:end]])
+            index = end
+        return len(batch)
+
+    def _write_rows_individually(self, batch):
+        written = 0
+        errors = 0
+        try:
+            conn = self._connection()
+        except sqlite3.Error as exc:
+            logger.error(f"DB writer cannot open database: {exc}")
+            return 0, len(batch)
+        for sql, params in batch:
+            try:
+                with conn:
+                    conn.execute(sql, params)
+                written += 1
+            except sqlite3.Error as exc:
+                errors += 1
+                logger.error(f"DB writer dropped row: {exc}")
+        return written, errors
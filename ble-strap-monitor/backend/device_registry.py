@@ -0,0 +1,94 @@
+"""
+디바이스 레지스트리
+등록된 디바이스 레코드를 copy-on-write 딕셔너리로 보관 - 조회는 잠금 없이 현재 스냅샷을 읽고,
+등록/해제만 짧은 잠금 안에서 새 딕셔너리로 교체
+"""
+from threading import Lock
+from types import MappingProxyType
+
+
+class DeviceRecord:
+    """등록 정보(불변)와 DeviceManager 참조
+
+    연결 상태/최근 데이터는 해당 디바이스의 연결 태스크만 쓰는 DeviceManager 속성을 그대로 읽으므로
+    알림 처리 경로에서 레지스트리 잠금을 잡지 않는다.
+    """
+
+    __slots__ = ('device_id', 'address', 'name', 'manager')
+
+    def __init__(self, device_id, address, name, manager=None):
+        self.device_id = device_id
+        self.address = address
+        self.name = name
+        self.manager = manager
+
+    @property
+    def connected(self):
+        return self.manager.connected if self.manager else False
+
+    @property
+    def last_data(self):
+        return self.manager.last_data if self.manager else None
+
+
+class DeviceRegistry:
+    """device_id → DeviceRecord (읽기는 불변 스냅샷, 쓰기는 교체)"""
+
+    def __init__(self):
+        self._write_lock = Lock()
+        self._records = MappingProxyType({})
+
+    # ----- 조회 (잠금 없음) -----
+
+    def snapshot(self):
+        """현재 레코드 매핑 (읽기 전용, 이후 등록/해제의 영향을 받지 않음)"""
+        return self._records
+
+    def get(self, device_id):
+        return self._records.get(device_id)
+
+    def records(self):
+        return list(self._records.values())
+
+    def managers(self):
+        """{device_id: DeviceManager}"""
+        return {device_id: record.manager for device_id, record in self._records.items() if record.manager}
+
+    def addresses(self):
+        return {record.address for record in self._records.values()}
+
+    def __contains__(self, device_id):
+        return device_id in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    # ----- 등록/해제 -----
+
+    def add(self, record):
+        """새 레코드 등록 (이미 있으면 False)"""
+        with self._write_lock:
+            if record.device_id in self._records:
+                return False
+            records = dict(self._records)
+            records[record.device_id] = record
+            self._records = MappingProxyType(records)
+        return True
+
+    def remove(self, device_id, record=None):
+        """레코드 해제 → 해제된 레코드 (record 지정 시 같은 레코드일 때만)"""
+        with self._write_lock:
+            current = self._records.get(device_id)
+            if current is None or (record is not None and current is not record):
+                return None
+            records = dict(self._records)
+            del records[device_id]
+            self._records = MappingProxyType(records)
+        return current
+
+    def clear(self):
+        """전체 해제 → 해제된 레코드 목록"""
+        with self._write_lock:
+            previous = self._records
+            self._records = MappingProxyType({})
+        return list(previous.values())
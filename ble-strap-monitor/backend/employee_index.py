@@ -0,0 +1,64 @@
+"""
+디바이스 → 직원 메모리 인덱스
+알림 처리/목록 조회 시 DB 왕복 없이 O(1)로 직원 정보를 조회
+"""
+import logging
+from collections import namedtuple
+from threading import Lock
+
+import db
+
+logger = logging.getLogger(__name__)
+
+EmployeeRef = namedtuple('EmployeeRef', ['employee_id', 'name', 'employee_number', 'department'])
+
+
+class EmployeeIndex:
+    """device_id → EmployeeRef 매핑 (읽기는 잠금 없이, 쓰기는 사본 교체)"""
+
+    def __init__(self):
+        self._by_device = {}
+        self._lock = Lock()
+
+    def load(self):
+        """DB 에서 전체 매핑을 다시 읽어 교체"""
+        conn = db.get_connection()
+        try:
+            rows = conn.execute('''SELECT id, name, employee_number, department, device_id
+                                   FROM employees
+                                   WHERE device_id IS NOT NULL AND device_id != ''
+                                   ORDER BY id ASC''').fetchall()
+        finally:
+            conn.close()
+
+        mapping = {}
+        for employee_id, name, number, department, device_id in rows:
+            # 동일 기기가 여러 직원에 할당된 경우 가장 먼저 등록된 직원 우선
+            mapping.setdefault(device_id, EmployeeRef(employee_id, name, number, department))
+
+        with self._lock:
+            self._by_device = mapping
+        logger.info(f"Employee index loaded ({len(mapping)} device assignments)")
+        return len(mapping)
+
+    def invalidate(self):
+        """직원 정보 변경 후 호출 - 매핑 재적재"""
+        try:
+            self.load()
+        except Exception as exc:
+            logger.error(f"Failed to reload employee index: {exc}")
+
+    def clear(self):
+        with self._lock:
+            self._by_device = {}
+
+    def get(self, device_id):
+        """디바이스에 할당된 직원 (없으면 None)"""
+        return self._by_device.get(device_id)
+
+    def snapshot(self):
+        """현재 매핑의 읽기 전용 사본"""
+        return dict(self._by_device)
+
+    def __len__(self):
+        return len(self._by_device)
@@ -0,0 +1,94 @@
+"""
+디바이스 팬아웃 실행기
+여러 디바이스에 같은 작업을 BLE 허브 루프에서 동시 실행 (동시 실행 수 제한, 디바이스별 타임아웃, 전체 마감 시각)
+"""
+import asyncio
+import concurrent.futures
+import logging
+import time
+from threading import BoundedSemaphore, Lock
+
+logger = logging.getLogger(__name__)
+
+# 결과 error 코드
+ERROR_TIMEOUT = 'timeout'  # 디바이스별 제한 시간 초과
+ERROR_DEADLINE = 'deadline'  # 전체 마감 시각까지 시작/완료하지 못함
+ERROR_LOOP_INACTIVE = 'loop_inactive'
+
+
+async def _with_timeout(coro, timeout):
+    return await asyncio.wait_for(coro, timeout=max(0.001, timeout))
+
+
+def fan_out(hub, device_ids, make_coro, on_result=None, concurrency=16, deadline=30.0, item_timeout=10.0):
+    """device_ids 마다 make_coro(device_id) 를 실행하고 결과 목록을 device_ids 순서로 반환 (블로킹)
+
+    각 결과는 {device_id, success, error, value, elapsed_ms} 이며, on_result 는 디바이스가 끝나는 즉시
+    (허브 루프 스레드 또는 호출 스레드에서) 한 번씩 호출된다.
+    """
+    started = time.monotonic()
+    ends_at = started + deadline
+    slots = BoundedSemaphore(max(1, int(concurrency)))
+    results = {}
+    results_lock = Lock()
+    in_flight = {}
+
+    def finish(device_id, item_started, success, error=None, value=None):
+        with results_lock:
+            if device_id in results:
+                return
+            result = {
+                'device_id': device_id,
+                'success': success,
+                'error': error,
+                'value': value,
+                'elapsed_ms': round((time.monotonic() - item_started) * 1000, 3) if item_started else None
+            }
+            results[device_id] = result
+        if on_result is not None:
+            try:
+                on_result(result)
+            except Exception as exc:
+                logger.error(f"Fan-out result callback failed for {device_id}: {exc}")
+
+    def on_done(device_id, item_started, future):
+        slots.release()
+        if future.cancelled():
+            finish(device_id, item_started, False, ERROR_DEADLINE)
+            return
+        exc = future.exception()
+        if exc is None:
+            finish(device_id, item_started, True, value=future.result())
+        elif isinstance(exc, asyncio.TimeoutError):
+            finish(device_id, item_started, False, ERROR_TIMEOUT)
+        else:
+            finish(device_id, item_started, False, str(exc) or exc.__class__.__name__)
+
+    for device_id in device_ids:
+        remaining = ends_at - time.monotonic()
+        if remaining <= 0 or not slots.acquire(timeout=remaining):
+            finish(device_id, None, False, ERROR_DEADLINE)
+            continue
+
+        item_started = time.monotonic()
+        coro = _with_timeout(make_coro(device_id), min(item_timeout, ends_at - item_started))
+        try:
+            future = hub.submit(device_id, coro)
+        except RuntimeError:
+            slots.release()
+            finish(device_id, item_started, False, ERROR_LOOP_INACTIVE)
+            continue
+        in_flight[device_id] = future
+        future.add_done_callback(lambda f, d=device_id, t=item_started: on_done(d, t, f))
+
+    if in_flight:
+        concurrent.futures.wait(list(in_flight.values()), timeout=max(0.0, ends_at - time.monotonic()))
+        for future in in_flight.values():
+            if not future.done():
+                future.cancel()
+
+    # 취소 콜백이 아직 실행되지 않은 항목도 결과를 채움
+    for device_id in device_ids:
+        if device_id not in results:
+            finish(device_id, None, False, ERROR_DEADLINE)
+    return [results[device_id] for device_id in device_ids]
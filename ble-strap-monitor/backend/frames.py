@@ -0,0 +1,74 @@
+"""
+BLE 알림 프레임 파서
+텍스트 프레임(DIST:...;STATE:...)과 FMT:BIN 으로 협상되는 고정 길이 바이너리 프레임을 모두 처리
+"""
+import re
+import struct
+
+# 텍스트 프레임 정규식
+EXT_PAYLOAD_RE = re.compile(
+    r"^DIST:(?P<dist>ERR|\d+);RAW:(?P<raw>\d+);AVG:(?P<avg>\d+);"
+    r"DIFF:(?P<diff>\d+);STATE:(?P<state>OPEN|CLOSED)$"
+)
+
+# 바이너리 프레임 (little-endian, 12바이트)
+#   magic(u8) state(u8) seq(u16) dist(u16, 0xFFFF=ERR) raw(u16) avg(u16) diff(u16)
+BIN_FRAME_MAGIC = 0xB1
+BIN_FRAME = struct.Struct('<BBHHHHH')
+BIN_DIST_ERR = 0xFFFF
+
+# 연결 시 펌웨어에 전송하는 포맷 협상 명령과 기대 응답
+FORMAT_BINARY_COMMAND = 'FMT:BIN'
+FORMAT_TEXT_COMMAND = 'FMT:TEXT'
+FORMAT_BINARY_ACK = 'RESP:FMT=BIN'
+
+_STATES = ('OPEN', 'CLOSED')
+
+
+def parse_frame(data):
+    """알림 페이로드를 파싱해 (format, fields) 반환, 센서 프레임이 아니면 None
+
+    fields 는 dist(str: 숫자 또는 'ERR'), raw, avg, diff, state, seq(바이너리만) 키를 가진다.
+    """
+    if len(data) == BIN_FRAME.size and data[0] == BIN_FRAME_MAGIC:
+        _, state, seq, dist, raw, avg, diff = BIN_FRAME.unpack(data)
+        if state > 1:
+            return None
+        return 'binary', {
+            'dist': 'ERR' if dist == BIN_DIST_ERR else str(dist),
+            'raw': raw,
+            'avg': avg,
+            'diff': diff,
+            'state': _STATES[state],
+            'seq': seq
+        }
+
+    try:
+        text = data.decode('utf-8') if isinstance(data, (bytes, bytearray)) else data
+    except UnicodeDecodeError:
+        return None
+    match = EXT_PAYLOAD_RE.match(text)
+    if not match:
+        return None
+    return 'text', {
+        'dist': match.group('dist'),
+        'raw': int(match.group('raw')),
+        'avg': int(match.group('avg')),
+        'diff': int(match.group('diff')),
+        'state': match.group('state'),
+        'seq': None
+    }
+
+
+def pack_binary_frame(state, seq, dist, raw, avg, diff):
+    """바이너리 프레임 생성 (테스트/시뮬레이터용)"""
+    dist_value = BIN_DIST_ERR if dist in (None, 'ERR') else int(dist)
+    return BIN_FRAME.pack(
+        BIN_FRAME_MAGIC,
+        1 if state == 'CLOSED' else 0,
+        seq & 0xFFFF,
+        dist_value & 0xFFFF,
+        raw & 0xFFFF,
+        avg & 0xFFFF,
+        min(int(diff), 0xFFFF)
+    )
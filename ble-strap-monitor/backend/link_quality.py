@@ -0,0 +1,237 @@
+"""
+BLE 링크 품질 추적
+센서 프레임 도착 시각을 디바이스별 고정 크기 배열(링버퍼)에 기록하고, 기대 주기(RATE)와 비교해
+도착 간격 지터, 누락된 주기 추정, 최근 초당 프레임 수, 마지막 프레임 이후 경과 시간을 계산
+기록은 프레임마다 O(1) (할당 없음), 통계는 조회 시에만 계산
+"""
+import logging
+import time
+from array import array
+from threading import Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+# 기대 주기의 이 배수보다 도착 간격이 길면 사이에 누락된 주기가 있는 것으로 추정
+MISS_FACTOR = 1.5
+
+# RFC 3550 도착 간격 지터 평활 계수
+JITTER_GAIN = 1 / 16
+
+
+class _Link:
+    """디바이스 하나의 최근 window 개 프레임 (도착 시각, 직전 간격에서 추정한 누락 주기 수)"""
+
+    __slots__ = ('address', 'arrivals', 'missed', 'index', 'count', 'last_arrival', 'jitter_ms',
+                 'frames', 'missed_total', 'rssi', 'rssi_at')
+
+    def __init__(self, window, address=None):
+        self.address = address
+        self.arrivals = array('d', bytes(8 * window))
+        self.missed = array('I', bytes(4 * window))
+        self.index = 0  # 다음에 쓸 위치
+        self.count = 0
+        self.last_arrival = None
+        self.jitter_ms = 0.0
+        self.frames = 0
+        self.missed_total = 0
+        self.rssi = None
+        self.rssi_at = None
+
+    def restart(self, address):
+        """재연결 - 끊긴 동안의 간격을 누락으로 세지 않도록 최근 구간만 비움 (누적 값과 RSSI 는 유지)"""
+        self.address = address
+        self.index = 0
+        self.count = 0
+        self.last_arrival = None
+        self.jitter_ms = 0.0
+
+    def add(self, now, nominal_ms):
+        missed = 0
+        if self.last_arrival is not None and nominal_ms:
+            gap_ms = (now - self.last_arrival) * 1000
+            periods = max(1, round(gap_ms / nominal_ms))
+            if gap_ms > nominal_ms * MISS_FACTOR:
+                missed = periods - 1
+            # 누락된 주기를 뺀 나머지 편차만 지터에 반영
+            deviation = abs(gap_ms - periods * nominal_ms)
+            self.jitter_ms += (deviation - self.jitter_ms) * JITTER_GAIN
+        size = len(self.arrivals)
+        self.arrivals[self.index] = now
+        self.missed[self.index] = missed
+        self.index = (self.index + 1) % size
+        self.count = min(self.count + 1, size)
+        self.last_arrival = now
+        self.frames += 1
+        self.missed_total += missed
+
+    def oldest(self):
+        size = len(self.arrivals)
+        return self.arrivals[(self.index - self.count) % size]
+
+    def window_missed(self):
+        if self.count == len(self.missed):
+            return sum(self.missed)
+        start = (self.index - self.count) % len(self.missed)
+        return sum(self.missed[(start + offset) % len(self.missed)] for offset in range(self.count))
+
+
+class LinkQualityTracker:
+    """record() 는 알림 처리 경로(허브 루프)에서, snapshot() 은 API/브로드캐스트 스레드에서 호출"""
+
+    def __init__(self, interval_of, rssi_of=None, window=64, degraded_loss_ratio=0.2,
+                 degraded_jitter_ratio=0.5, stale_periods=5, min_stale_seconds=3.0):
+        self.interval_of = interval_of  # device_id → 기대 주기(ms) 또는 None
+        self.rssi_of = rssi_of  # address → (rssi, 수신 시각 epoch 초) 또는 None
+        self.window = max(2, int(window))
+        self.degraded_loss_ratio = degraded_loss_ratio
+        self.degraded_jitter_ratio = degraded_jitter_ratio  # 지터가 기대 주기의 이 비율을 넘으면 저하
+        self.stale_periods = stale_periods  # 기대 주기 N회 동안 프레임이 없으면 저하
+        self.min_stale_seconds = min_stale_seconds
+        self._links = {}  # {device_id: _Link}
+        self._lock = Lock()
+        self._degraded = set()  # 마지막 브로드캐스트 시점의 저하 링크
+        self._thread = None
+
+    # ----- 연결 수명 -----
+
+    def reset(self, device_id, address=None):
+        """연결 수립 시 호출"""
+        with self._lock:
+            link = self._links.get(device_id)
+            if link is None:
+                self._links[device_id] = _Link(self.window, address)
+            else:
+                link.restart(address)
+
+    def forget(self, device_id):
+        with self._lock:
+            self._links.pop(device_id, None)
+            self._degraded.discard(device_id)
+
+    def clear(self):
+        with self._lock:
+            self._links = {}
+            self._degraded = set()
+
+    # ----- 기록 -----
+
+    def record(self, device_id, now=None):
+        """센서 프레임 1건 도착"""
+        link = self._links.get(device_id)
+        if link is None:
+            return
+        link.add(time.monotonic() if now is None else now, self.interval_of(device_id))
+
+    # ----- 조회 -----
+
+    def snapshot(self, device_id, now=None):
+        """링크 품질 dict (추적 중이 아니면 None)"""
+        link = self._links.get(device_id)
+        if link is None:
+            return None
+        now = time.monotonic() if now is None else now
+        nominal_ms = self.interval_of(device_id)
+        self._refresh_rssi(link)
+
+        count = link.count
+        since_last = now - link.last_arrival if link.last_arrival is not None else None
+        recent_fps = None
+        if count >= 2:
+            span = now - link.oldest()
+            recent_fps = round((count - 1) / span, 2) if span > 0 else None
+        missed = link.window_missed()
+        loss_ratio = round(missed / (missed + count), 4) if count else None
+
+        return {
+            'nominal_interval_ms': nominal_ms,
+            'expected_fps': round(1000 / nominal_ms, 2) if nominal_ms else None,
+            'recent_fps': recent_fps,
+            'jitter_ms': round(link.jitter_ms, 2),
+            'missed_recent': missed,
+            'missed_total': link.missed_total,
+            'loss_ratio': loss_ratio,
+            'frames': link.frames,
+            'since_last_frame_ms': round(since_last * 1000) if since_last is not None else None,
+            'rssi': link.rssi,
+            'rssi_age_seconds': round(time.time() - link.rssi_at, 1) if link.rssi_at is not None else None,
+            'degraded': self._is_degraded(nominal_ms, since_last, loss_ratio, link.jitter_ms, count)
+        }
+
+    def snapshots(self, now=None):
+        """{device_id: 링크 품질 dict}"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            device_ids = list(self._links)
+        snapshots = {}
+        for device_id in device_ids:
+            snapshot = self.snapshot(device_id, now)
+            if snapshot is not None:
+                snapshots[device_id] = snapshot
+        return snapshots
+
+    def _refresh_rssi(self, link):
+        # 연결 중인 기기는 광고를 멈추므로 마지막으로 받은 광고 RSSI 를 수신 시각과 함께 유지
+        if self.rssi_of is None or link.address is None:
+            return
+        seen = self.rssi_of(link.address)
+        if seen is not None and seen[0] is not None and (link.rssi_at is None or seen[1] > link.rssi_at):
+            link.rssi, link.rssi_at = seen
+
+    def _is_degraded(self, nominal_ms, since_last, loss_ratio, jitter_ms, count):
+        if not nominal_ms:
+            return False
+        stale_after = max(self.min_stale_seconds, nominal_ms * self.stale_periods / 1000)
+        if since_last is not None and since_last > stale_after:
+            return True
+        if count < self.window // 4:
+            # 연결 직후 표본이 적을 때는 손실률/지터로 판단하지 않음
+            return False
+        return loss_ratio > self.degraded_loss_ratio or jitter_ms > nominal_ms * self.degraded_jitter_ratio
+
+    # ----- 브로드캐스트 -----
+
+    def start(self, emit, interval=5.0):
+        """interval 초마다 emit('link_quality', {...}) (저하 링크가 새로 생기거나 회복되면 로그)"""
+        if self._thread is not None or not interval:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, args=(emit, interval), name='link-quality', daemon=True)
+            self._thread.start()
+
+    def _run(self, emit, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                emit('link_quality', self.broadcast_payload())
+            except Exception as exc:
+                logger.error(f"Link quality broadcast failed: {exc}")
+
+    def broadcast_payload(self):
+        snapshots = self.snapshots()
+        degraded = {device_id for device_id, snapshot in snapshots.items() if snapshot['degraded']}
+        with self._lock:
+            appeared = degraded - self._degraded
+            recovered = self._degraded - degraded
+            self._degraded = degraded
+        for device_id in sorted(appeared):
+            snapshot = snapshots[device_id]
+            logger.warning(f"[{device_id}] Link degraded: {snapshot['recent_fps']} fps "
+                           f"(expected {snapshot['expected_fps']}), loss {snapshot['loss_ratio']}, "
+                           f"jitter {snapshot['jitter_ms']} ms, last frame {snapshot['since_last_frame_ms']} ms ago")
+        for device_id in sorted(recovered):
+            logger.info(f"[{device_id}] Link recovered")
+        return {'devices': snapshots, 'degraded': sorted(degraded)}
+
+    def stats(self):
+        snapshots = self.snapshots()
+        degraded = sorted(device_id for device_id, snapshot in snapshots.items() if snapshot['degraded'])
+        return {
+            'tracked': len(snapshots),
+            'degraded': degraded,
+            'window': self.window,
+            'degraded_loss_ratio': self.degraded_loss_ratio,
+            'degraded_jitter_ratio': self.degraded_jitter_ratio,
+            'stale_periods': self.stale_periods
+        }
@@ -0,0 +1,194 @@
+"""
+로깅 구성
+카테고리(ble.rx, ble.tx, db, http)별 레벨, 수신 프레임 샘플링, 비차단 큐 핸들러 제공
+"""
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from threading import Lock
+
+# 카테고리 → 실제 로거 이름
+CATEGORIES = {
+    'ble.rx': ('ble.rx',),
+    'ble.tx': ('ble.tx',),
+    'db': ('db',),
+    'http': ('http', 'werkzeug'),
+}
+
+DEFAULT_LEVELS = {
+    'ble.rx': 'WARNING',  # 프레임 단위 로그는 기본 비활성화
+    'ble.tx': 'INFO',
+    'db': 'INFO',
+    'http': 'WARNING',
+}
+
+_config_lock = Lock()
+_listener = None
+_queue_handler = None
+_samplers = {}
+
+
+class CategoryLogger:
+    """레벨 검사와 1/N 샘플링을 메시지 포맷 이전에 수행하는 로거 래퍼"""
+
+    __slots__ = ('category', 'logger', 'sample_every', '_counter')
+
+    def __init__(self, category, sample_every=1):
+        self.category = category
+        self.logger = logging.getLogger(CATEGORIES.get(category, (category,))[0])
+        self.sample_every = max(1, int(sample_every))
+        self._counter = itertools.count()
+
+    def should_log(self, level=logging.INFO):
+        """이번 호출을 기록해야 하면 True (레벨 미달 또는 샘플링 제외 시 False)"""
+        if not self.logger.isEnabledFor(level):
+            return False
+        if self.sample_every == 1:
+            return True
+        return next(self._counter) % self.sample_every == 0
+
+    def log(self, level, message, **fields):
+        self.logger.log(level, message, extra={'fields': fields} if fields else None)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 레코드를 버리고 개수만 기록"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 로그"""
+
+    def format(self, record):
+        payload = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        fields = getattr(record, 'fields', None)
+        if isinstance(fields, dict):
+            payload.update(fields)
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """기본 텍스트 로그 (구조화 필드는 key=value 로 덧붙임)"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if isinstance(fields, dict) and fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return line
+
+
+def _parse_levels(spec):
+    """'ble.rx=INFO,db=DEBUG' 형식 파싱"""
+    levels = {}
+    for token in (spec or '').split(','):
+        if '=' not in token:
+            continue
+        name, level = token.split('=', 1)
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging():
+    """루트 로거를 비차단 큐 핸들러로 구성 (환경 변수로 초기값 지정)"""
+    global _listener, _queue_handler
+    with _config_lock:
+        if _listener is not None:
+            return
+
+        log_queue = queue.Queue(maxsize=int(os.environ.get('LOG_QUEUE_SIZE', '10000')))
+        stream = logging.StreamHandler()
+        if os.environ.get('LOG_FORMAT', 'text').lower() == 'json':
+            stream.setFormatter(JsonFormatter())
+        else:
+            stream.setFormatter(TextFormatter())
+
+        _queue_handler = _DroppingQueueHandler(log_queue)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+
+        _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+    levels = dict(DEFAULT_LEVELS)
+    levels.update(_parse_levels(os.environ.get('LOG_LEVELS')))
+    sampling = {'ble.rx': int(os.environ.get('LOG_RX_SAMPLE', '100'))}
+    configure(levels=levels, sampling=sampling)
+
+
+def get_category(category):
+    """카테고리 로거 래퍼 (샘플링 설정 공유)"""
+    with _config_lock:
+        sampler = _samplers.get(category)
+        if sampler is None:
+            sampler = _samplers[category] = CategoryLogger(category)
+        return sampler
+
+
+def configure(levels=None, sampling=None):
+    """카테고리 레벨/샘플링 변경 (런타임 조정용), 잘못된 값은 ValueError"""
+    levels = levels or {}
+    sampling = sampling or {}
+    for category in list(levels) + list(sampling):
+        if category not in CATEGORIES:
+            raise ValueError(f'unknown category: {category}')
+
+    resolved = {}
+    for category, level in levels.items():
+        value = logging.getLevelName(str(level).upper())
+        if not isinstance(value, int):
+            raise ValueError(f'invalid level for {category}: {level}')
+        resolved[category] = value
+    for category, every in sampling.items():
+        if int(every) < 1:
+            raise ValueError(f'invalid sampling for {category}: {every}')
+
+    for category, value in resolved.items():
+        for name in CATEGORIES[category]:
+            logging.getLogger(name).setLevel(value)
+    for category, every in sampling.items():
+        get_category(category).sample_every = int(every)
+
+
+def describe():
+    """현재 로깅 설정 및 큐 상태"""
+    categories = {}
+    for category, names in CATEGORIES.items():
+        categories[category] = {
+            'level': logging.getLevelName(logging.getLogger(names[0]).getEffectiveLevel()),
+            'sample_every': get_category(category).sample_every
+        }
+    return {
+        'root_level': logging.getLevelName(logging.getLogger().level),
+        'categories': categories,
+        'queue_depth': _queue_handler.queue.qsize() if _queue_handler else 0,
+        'dropped': _queue_handler.dropped if _queue_handler else 0
+    }
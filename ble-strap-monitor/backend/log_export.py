@@ -0,0 +1,154 @@
+"""
+이벤트 로그 스트리밍 내보내기
+서버 측 커서에서 청크 단위로 읽어 CSV/NDJSON 은 바로 전송하고, XLSX 는 write-only 워크북을 임시 파일에 기록한 뒤 전송
+XLSX 는 ZIP 컨테이너라 통합 문서를 모두 만든 뒤에야 첫 바이트를 보낼 수 있으므로 (메모리는 일정하지만
+첫 바이트까지 시간 = 전체 생성 시간) 대용량 내보내기는 CSV/NDJSON 을 사용
+"""
+import codecs
+import csv
+import io
+import json
+import logging
+import tempfile
+
+from openpyxl import Workbook
+
+import db
+
+logger = logging.getLogger('db.export')
+
+FORMATS = {
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson; charset=utf-8', 'ndjson'),
+}
+
+HEADERS = (
+    'Timestamp (KST)',
+    'Device ID',
+    'Employee Name',
+    'Employee Number',
+    'Event Type',
+    'Severity',
+    'Event Data'
+)
+
+EXPORT_QUERY = '''
+    SELECT el.id, el.timestamp, el.device_id, el.event_type, el.event_data, el.severity,
+           e.name AS employee_name, e.employee_number
+    FROM event_logs el
+    LEFT JOIN employees e ON el.employee_id = e.id
+'''
+
+CHUNK_ROWS = 1000
+FILE_CHUNK_BYTES = 64 * 1024
+
+
+def iter_event_rows(where, params, chunk_rows=CHUNK_ROWS):
+    """조건에 맞는 이벤트 로그를 시간순으로 청크 단위 조회 (연결은 소진/중단 시 반납)"""
+    conn = db.get_connection()
+    try:
+        cursor = conn.execute(
+            EXPORT_QUERY + (' WHERE ' + ' AND '.join(where) if where else '') +
+            ' ORDER BY el.timestamp ASC, el.id ASC',
+            params
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def _format_event_data(event_data):
+    """JSON 이벤트 데이터를 한글이 보이는 문자열로 정리"""
+    if not event_data:
+        return ''
+    try:
+        parsed = json.loads(event_data)
+    except Exception:
+        return str(event_data)
+    if isinstance(parsed, (dict, list)):
+        return json.dumps(parsed, ensure_ascii=False)
+    return str(parsed)
+
+
+def _row_values(row, to_kst):
+    _, timestamp, device_id, event_type, event_data, severity, employee_name, employee_number = row
+    return [
+        to_kst(timestamp),
+        device_id,
+        employee_name or '',
+        employee_number or '',
+        event_type,
+        severity,
+        _format_event_data(event_data)
+    ]
+
+
+def stream_csv(chunks, to_kst):
+    """CSV 청크 생성기 (엑셀 호환을 위해 UTF-8 BOM 포함)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADERS)
+    yield codecs.BOM_UTF8 + buffer.getvalue().encode('utf-8')
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_row_values(row, to_kst) for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def stream_ndjson(chunks, to_kst):
+    """한 줄에 이벤트 하나씩 JSON 으로 생성"""
+    for rows in chunks:
+        lines = []
+        for row in rows:
+            event_id, timestamp, device_id, event_type, event_data, severity, employee_name, employee_number = row
+            try:
+                data = json.loads(event_data) if event_data else None
+            except Exception:
+                data = event_data
+            lines.append(json.dumps({
+                'id': event_id,
+                'timestamp': timestamp,
+                'timestamp_kst': to_kst(timestamp),
+                'device_id': device_id,
+                'employee_name': employee_name,
+                'employee_number': employee_number,
+                'event_type': event_type,
+                'severity': severity,
+                'event_data': data
+            }, ensure_ascii=False))
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def stream_xlsx(chunks, to_kst):
+    """write-only 워크북을 디스크 임시 파일에 모두 기록한 뒤 파일을 조각내어 전송 (스트리밍 아님)"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('EventLogs')
+    ws.append(list(HEADERS))
+    for rows in chunks:
+        for row in rows:
+            ws.append(_row_values(row, to_kst))
+
+    with tempfile.TemporaryFile() as output:
+        wb.save(output)
+        output.seek(0)
+        while True:
+            block = output.read(FILE_CHUNK_BYTES)
+            if not block:
+                break
+            yield block
+
+
+def stream_export(fmt, where, params, to_kst):
+    """포맷별 응답 본문 생성기"""
+    chunks = iter_event_rows(where, params)
+    if fmt == 'csv':
+        return stream_csv(chunks, to_kst)
+    if fmt == 'ndjson':
+        return stream_ndjson(chunks, to_kst)
+    return stream_xlsx(chunks, to_kst)
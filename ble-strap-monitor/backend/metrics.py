@@ -0,0 +1,207 @@
+"""
+Prometheus 지표
+카운터/히스토그램 값은 스레드별 샤드(dict)에 기록하므로 기록 경로에 잠금이 없고,
+/metrics 수집 시에만 샤드를 합산해 텍스트 노출 형식으로 변환
+"""
+import threading
+from bisect import bisect_left
+from threading import Lock
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 초 단위 지연 히스토그램 기본 구간
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 샤드가 이 수를 넘으면 새 샤드 등록 시 종료된 스레드 샤드를 정리 (수집기가 없어도 무한히 늘지 않도록)
+SHARD_SWEEP_THRESHOLD = 64
+
+
+def _merge(target, source):
+    for key, value in source.items():
+        if isinstance(value, list):
+            value = list(value)
+            existing = target.get(key)
+            if existing is None:
+                target[key] = value
+            else:
+                for index, item in enumerate(value):
+                    existing[index] += item
+        else:
+            target[key] = target.get(key, 0) + value
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, registry, name, documentation, labels=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def _header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *label_values, amount=1):
+        values = self.registry._values()
+        key = (self.name, label_values)
+        values[key] = values.get(key, 0) + amount
+
+    def render(self, merged):
+        lines = self._header()
+        for label_values, value in sorted(merged.get(self.name, {}).items()):
+            lines.append(f'{self.name}{_labels(self.labels, label_values)} {_number(value)}')
+        return lines
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        values = self.registry._values()
+        key = (self.name, label_values)
+        counts = values.get(key)
+        if counts is None:
+            # 구간별 개수 (마지막은 +Inf) + 합계
+            counts = values[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def render(self, merged):
+        lines = self._header()
+        for label_values, counts in sorted(merged.get(self.name, {}).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_labels(self.labels, label_values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labels, label_values)} {_number(counts[-1])}')
+            lines.append(f'{self.name}_count{_labels(self.labels, label_values)} {cumulative}')
+        return lines
+
+
+class Gauge(_Metric):
+    """수집 시점에 callback 으로 값을 읽는 게이지 (callback → 숫자 또는 {레이블 값 튜플: 숫자})"""
+
+    kind = 'gauge'
+
+    def __init__(self, registry, name, documentation, callback, labels=()):
+        super().__init__(registry, name, documentation, labels)
+        self.callback = callback
+
+    def render(self, merged):
+        lines = self._header()
+        value = self.callback()
+        samples = value.items() if isinstance(value, dict) else [((), value)]
+        for label_values, sample in sorted(samples):
+            if sample is not None:
+                lines.append(f'{self.name}{_labels(self.labels, label_values)} {_number(sample)}')
+        return lines
+
+
+class Registry:
+    """지표 정의와 스레드별 샤드 관리"""
+
+    def __init__(self):
+        self._metrics = []
+        self._local = threading.local()
+        self._lock = Lock()
+        self._shards = []  # [(thread, values)]
+        self._retired = {}  # 종료된 스레드 샤드 합계 (카운터가 줄어들지 않도록 유지)
+        self._sweep_at = SHARD_SWEEP_THRESHOLD
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(self, name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labels, buckets))
+
+    def gauge(self, name, documentation, callback, labels=()):
+        return self._register(Gauge(self, name, documentation, callback, labels))
+
+    def _register(self, metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"duplicate metric: {metric.name}")
+            self._metrics.append(metric)
+        return metric
+
+    def _values(self):
+        """현재 스레드 샤드 (스레드마다 처음 한 번만 잠금)"""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+                if len(self._shards) > self._sweep_at:
+                    self._retire_dead()
+                    # 살아 있는 샤드가 많으면 다음 정리를 늦춰 등록 비용을 상각
+                    self._sweep_at = max(SHARD_SWEEP_THRESHOLD, 2 * len(self._shards))
+            return values
+
+    def _retire_dead(self):
+        """종료된 스레드 샤드를 합계에 합치고 목록에서 제거 (self._lock 안에서 호출)"""
+        alive = []
+        for thread, values in self._shards:
+            if thread.is_alive():
+                alive.append((thread, values))
+            else:
+                # 더 이상 기록하는 스레드가 없으므로 그대로 합쳐 둠
+                _merge(self._retired, values)
+        self._shards = alive
+
+    def collect(self):
+        """(지표 목록, {지표 이름: {레이블 값 튜플: 값}}) - 샤드 합산"""
+        with self._lock:
+            self._retire_dead()
+            merged = {}
+            _merge(merged, self._retired)
+            snapshots = [values.copy() for _, values in self._shards]
+            metrics = list(self._metrics)
+        for snapshot in snapshots:
+            _merge(merged, snapshot)
+
+        by_name = {}
+        for (name, label_values), value in merged.items():
+            by_name.setdefault(name, {})[label_values] = value
+        return metrics, by_name
+
+    def render(self):
+        """Prometheus 텍스트 노출 형식"""
+        metrics, by_name = self.collect()
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render(by_name))
+        return '\n'.join(lines) + '\n'
+
+
+# 프로세스 공용 레지스트리
+REGISTRY = Registry()
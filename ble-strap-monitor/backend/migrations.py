@@ -0,0 +1,198 @@
+"""
+스키마 마이그레이션
+버전 순서대로 한 번씩만 적용하고 schema_migrations 테이블에 적용 이력을 기록
+"""
+import logging
+import time
+from collections import namedtuple
+
+logger = logging.getLogger('db.migrations')
+
+Migration = namedtuple('Migration', ['version', 'name', 'statements'])
+
+MIGRATIONS = (
+    # 기존 init_db() 스키마 (IF NOT EXISTS 이므로 기존 DB 에는 영향 없음)
+    Migration(1, 'baseline', (
+        '''CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT DEFAULT 'admin',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            employee_number TEXT UNIQUE NOT NULL,
+            department TEXT,
+            position TEXT,
+            device_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS devices (
+            id TEXT PRIMARY KEY,
+            address TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_connected TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS event_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            device_id TEXT NOT NULL,
+            employee_id INTEGER,
+            event_type TEXT NOT NULL,
+            event_data TEXT,
+            severity TEXT DEFAULT 'info'
+        )''',
+        '''CREATE TABLE IF NOT EXISTS wear_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            employee_id INTEGER,
+            device_id TEXT NOT NULL,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP,
+            duration_seconds INTEGER,
+            is_active BOOLEAN DEFAULT 1
+        )''',
+        # 구버전 샘플링 테이블 (신규 기록은 sensor_rollups 사용)
+        '''CREATE TABLE IF NOT EXISTS sensor_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            device_id TEXT NOT NULL,
+            distance INTEGER,
+            raw_hall INTEGER,
+            avg_hall INTEGER,
+            diff_hall INTEGER,
+            state TEXT
+        )''',
+        '''CREATE TABLE IF NOT EXISTS system_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )''',
+    )),
+    # 센서 롤업 (1s/1m/1h 집계)
+    Migration(2, 'sensor_rollups', (
+        '''CREATE TABLE IF NOT EXISTS sensor_rollups (
+            tier TEXT NOT NULL,
+            device_id TEXT NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            samples INTEGER NOT NULL,
+            dist_samples INTEGER NOT NULL,
+            dist_min INTEGER,
+            dist_max INTEGER,
+            dist_sum INTEGER NOT NULL DEFAULT 0,
+            diff_min INTEGER,
+            diff_max INTEGER,
+            diff_sum INTEGER NOT NULL DEFAULT 0,
+            closed_seconds REAL NOT NULL DEFAULT 0,
+            open_seconds REAL NOT NULL DEFAULT 0,
+            last_state TEXT,
+            PRIMARY KEY (tier, device_id, bucket_start)
+        ) WITHOUT ROWID''',
+    )),
+    # 로그/세션 조회용 인덱스
+    Migration(3, 'event_and_session_indexes', (
+        # 최신순 목록, 날짜 범위 필터, 내보내기
+        'CREATE INDEX IF NOT EXISTS idx_event_logs_timestamp ON event_logs (timestamp)',
+        # event_type 필터 + 날짜 범위 (오늘 착용 해제 수 등)
+        'CREATE INDEX IF NOT EXISTS idx_event_logs_type_timestamp ON event_logs (event_type, timestamp)',
+        # 디바이스별 이력, 디바이스별 마지막 착용 해제 시각
+        'CREATE INDEX IF NOT EXISTS idx_event_logs_device_type_timestamp '
+        'ON event_logs (device_id, event_type, timestamp)',
+        # 진행 중인 세션만 담는 부분 인덱스 (세션 종료, 착용 중 집계, 미착용 직원 조회)
+        'CREATE INDEX IF NOT EXISTS idx_wear_sessions_active_device '
+        'ON wear_sessions (device_id) WHERE is_active = 1',
+        'CREATE INDEX IF NOT EXISTS idx_wear_sessions_active_employee '
+        'ON wear_sessions (employee_id) WHERE is_active = 1',
+        'CREATE INDEX IF NOT EXISTS idx_wear_sessions_start_time ON wear_sessions (start_time)',
+        'CREATE INDEX IF NOT EXISTS idx_sensor_data_device_timestamp ON sensor_data (device_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_employees_device_id ON employees (device_id)',
+        'ANALYZE',
+    )),
+    # 키셋 페이지네이션 필터용 (디바이스/직원 + 정렬 시각)
+    Migration(4, 'keyset_pagination_indexes', (
+        'CREATE INDEX IF NOT EXISTS idx_event_logs_device_timestamp ON event_logs (device_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_event_logs_employee_timestamp ON event_logs (employee_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_wear_sessions_device_start ON wear_sessions (device_id, start_time)',
+        'CREATE INDEX IF NOT EXISTS idx_wear_sessions_employee_start ON wear_sessions (employee_id, start_time)',
+        'ANALYZE',
+    )),
+    # 직원별 일일 착용 집계 (종료된 세션을 증분 반영)
+    Migration(5, 'daily_wear_stats', (
+        '''CREATE TABLE IF NOT EXISTS daily_wear_stats (
+            day TEXT NOT NULL,
+            employee_id INTEGER NOT NULL,
+            department TEXT,
+            worn_seconds INTEGER NOT NULL DEFAULT 0,
+            unworn_seconds INTEGER NOT NULL DEFAULT 0,
+            longest_unworn_seconds INTEGER NOT NULL DEFAULT 0,
+            wear_on_count INTEGER NOT NULL DEFAULT 0,
+            wear_off_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP,
+            PRIMARY KEY (day, employee_id)
+        ) WITHOUT ROWID''',
+        'CREATE INDEX IF NOT EXISTS idx_daily_wear_stats_department_day ON daily_wear_stats (department, day)',
+        'CREATE INDEX IF NOT EXISTS idx_daily_wear_stats_employee_day ON daily_wear_stats (employee_id, day)',
+        # 집계 반영 여부 (기존 종료 세션은 0 으로 시작해 첫 집계 때 채워짐)
+        'ALTER TABLE wear_sessions ADD COLUMN aggregated INTEGER NOT NULL DEFAULT 0',
+        'CREATE INDEX IF NOT EXISTS idx_wear_sessions_pending_aggregate '
+        'ON wear_sessions (end_time) WHERE is_active = 0 AND aggregated = 0',
+        # 직원별 직전 세션 종료 시각 (미착용 간격 계산)
+        'CREATE INDEX IF NOT EXISTS idx_wear_sessions_employee_end ON wear_sessions (employee_id, end_time)',
+    )),
+    # 이벤트 삽입마다 유지하던 중복 인덱스 제거
+    Migration(6, 'drop_redundant_indexes', (
+        # (device_id, timestamp) 인덱스를 최신순으로 훑다 첫 wear_off 에서 멈추는 조회로 대체
+        'DROP INDEX IF EXISTS idx_event_logs_device_type_timestamp',
+        # sensor_data 는 더 이상 기록하지 않음 (sensor_rollups 사용)
+        'DROP INDEX IF EXISTS idx_sensor_data_device_timestamp',
+    )),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def applied_versions(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    return {row[0] for row in conn.execute('SELECT version FROM schema_migrations')}
+
+
+def migrate(conn, target=None):
+    """미적용 마이그레이션을 버전 순서대로 각각 하나의 트랜잭션으로 적용, 적용된 버전 목록 반환"""
+    target = LATEST_VERSION if target is None else target
+    conn.commit()
+    done = applied_versions(conn)
+    conn.commit()
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version in done or migration.version > target:
+            continue
+        started = time.perf_counter()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for statement in migration.statements:
+                conn.execute(statement)
+            conn.execute('INSERT INTO schema_migrations (version, name) VALUES (?, ?)',
+                         (migration.version, migration.name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Migration {migration.version} ({migration.name}) failed")
+            raise
+        applied.append(migration.version)
+        logger.info(f"Applied migration {migration.version} ({migration.name}) "
+                    f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return applied
+
+
+def current_version(conn):
+    """적용된 최신 스키마 버전 (없으면 0)"""
+    done = applied_versions(conn)
+    conn.commit()
+    return max(done) if done else 0
@@ -0,0 +1,96 @@
+"""
+키셋 페이지네이션
+(정렬 시각, id) 기준의 안정적인 정렬과 불투명 커서 토큰, 필드 선택(projection) 처리
+"""
+import base64
+import json
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(direction, ts, row_id):
+    """다음 페이지 위치를 불투명 토큰으로 인코딩"""
+    raw = json.dumps({'d': direction, 't': ts, 'i': row_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """토큰을 (direction, ts, id) 로 복원, 손상된 토큰은 ValueError"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        direction, ts, row_id = data['d'], data['t'], int(data['i'])
+    except Exception as exc:
+        raise ValueError('invalid cursor') from exc
+    if direction not in ('asc', 'desc'):
+        raise ValueError('invalid cursor')
+    return direction, ts, row_id
+
+
+def parse_fields(spec, allowed):
+    """'a,b,c' 형식의 필드 목록 검증 (미지정 시 전체)"""
+    if not spec:
+        return list(allowed)
+    fields = [name.strip() for name in spec.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+class KeysetPage:
+    """(ts_col, id_col) 키셋으로 한 페이지를 조회하는 쿼리 빌더
+
+    columns 는 {응답 필드: SQL 식}, joins 는 {응답 필드: 해당 필드에 필요한 JOIN 절}.
+    """
+
+    def __init__(self, table, columns, ts_col, id_col, joins=None):
+        self.table = table
+        self.columns = columns
+        self.ts_col = ts_col
+        self.id_col = id_col
+        self.joins = joins or {}
+        self.where = []
+        self.params = []
+
+    def filter(self, clause, *params):
+        self.where.append(clause)
+        self.params.extend(params)
+        return self
+
+    def fetch(self, conn, fields, limit, direction='desc', cursor=None):
+        """한 페이지 조회 → (행 dict 목록, 다음 페이지 토큰 또는 None)"""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        where = list(self.where)
+        params = list(self.params)
+        if cursor is not None:
+            cursor_ts, cursor_id = cursor
+            operator = '<' if direction == 'desc' else '>'
+            # 행 값 비교는 (ts, id) 인덱스 범위 탐색으로 처리됨
+            where.append(f'({self.ts_col}, {self.id_col}) {operator} (?, ?)')
+            params.extend([cursor_ts, cursor_id])
+
+        select = [f'{self.columns[name]} AS {name}' for name in fields]
+        select.append(f'{self.ts_col} AS _cursor_ts')
+        select.append(f'{self.id_col} AS _cursor_id')
+        joins = []
+        for name in fields:
+            join = self.joins.get(name)
+            if join and join not in joins:
+                joins.append(join)
+
+        order = 'DESC' if direction == 'desc' else 'ASC'
+        sql = (f"SELECT {', '.join(select)} FROM {self.table} {' '.join(joins)}"
+               f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+               f" ORDER BY {self.ts_col} {order}, {self.id_col} {order} LIMIT ?")
+        params.append(limit + 1)
+
+        rows = conn.execute(sql, params).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [dict(zip(fields, row[:len(fields)])) for row in rows]
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(direction, last[-2], last[-1])
+        return items, next_cursor
@@ -0,0 +1,242 @@
+"""
+적응형 측정 주기 제어
+착용 상태가 안정적이고 거리 변동이 작은 기기는 RATE 주기를 늘리고, 임계값 근처/상태 변경 시 다시 줄임
+전체 알림 수(초당)가 예산을 넘으면 활동 중인 기기의 빠른 주기를 함께 늘려 예산 안에 맞춤
+"""
+import logging
+import time
+from collections import deque
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+# 펌웨어 clampRate() 범위와 부팅 시 기본 주기
+FIRMWARE_MIN_MS = 50
+FIRMWARE_MAX_MS = 2000
+FIRMWARE_DEFAULT_MS = 120
+
+# 기기 활동 등급
+CLASS_ACTIVE = 'active'  # 상태 변경 직후, 임계값 근처, 거리 변동 큼
+CLASS_STABLE = 'stable'  # 상태 유지 + 거리 변동 작음
+CLASS_IDLE = 'idle'  # 오랫동안 안정
+
+
+def _clamp_ms(value):
+    return max(FIRMWARE_MIN_MS, min(FIRMWARE_MAX_MS, int(value)))
+
+
+class _DeviceRate:
+    __slots__ = ('state', 'state_since', 'window', 'dist_sum', 'dist_sq_sum', 'level',
+                 'current_ms', 'pending_ms', 'last_change', 'retry_at', 'urgent_until')
+
+    def __init__(self, window, now):
+        self.state = None
+        self.state_since = now
+        self.window = deque(maxlen=window)
+        self.dist_sum = 0
+        self.dist_sq_sum = 0
+        self.level = CLASS_ACTIVE
+        self.current_ms = FIRMWARE_DEFAULT_MS
+        self.pending_ms = None  # 전송 중인 RATE 값
+        self.last_change = now
+        self.retry_at = 0.0
+        self.urgent_until = 0.0
+
+    def push_distance(self, distance):
+        if len(self.window) == self.window.maxlen:
+            old = self.window[0]
+            self.dist_sum -= old
+            self.dist_sq_sum -= old * old
+        self.window.append(distance)
+        self.dist_sum += distance
+        self.dist_sq_sum += distance * distance
+
+    def variance(self):
+        count = len(self.window)
+        if count < 2:
+            return None
+        mean = self.dist_sum / count
+        return max(0.0, self.dist_sq_sum / count - mean * mean)
+
+
+class RateController:
+    """observe() 가 프레임마다 기기별 목표 주기를 판단하고, 바꿔야 하면 새 주기(ms)를 반환"""
+
+    def __init__(self, fast_ms=120, slow_ms=1000, idle_ms=2000, stable_seconds=30, idle_seconds=600,
+                 window=20, variance_threshold=25.0, margin_mm=20, urgent_seconds=10,
+                 min_change_seconds=5, airtime_budget=300.0, enabled=True):
+        self.fast_ms = _clamp_ms(fast_ms)
+        self.slow_ms = max(self.fast_ms, _clamp_ms(slow_ms))
+        self.idle_ms = max(self.slow_ms, _clamp_ms(idle_ms))
+        self.stable_seconds = stable_seconds
+        self.idle_seconds = idle_seconds
+        self.window = max(2, int(window))
+        self.variance_threshold = variance_threshold
+        self.margin_mm = margin_mm
+        self.urgent_seconds = urgent_seconds
+        self.min_change_seconds = min_change_seconds
+        self.airtime_budget = airtime_budget  # 전체 기기 초당 알림 수 상한 (0 이면 제한 없음)
+        self.enabled = enabled
+        self.thresholds = ()  # 착용 정책 거리 임계값 (distance_close, distance_open)
+        self._devices = {}
+        self._lock = Lock()
+        self._counts = {CLASS_ACTIVE: 0, CLASS_STABLE: 0, CLASS_IDLE: 0}
+        self._active_ms = self.fast_ms  # 예산 반영 후 활동 기기 주기
+        self._counters = {'rate_changes': 0, 'rate_failures': 0, 'budget_limited': 0}
+
+    def set_thresholds(self, distance_close=None, distance_open=None, enabled=True):
+        """착용 정책 변경 시 호출 - 거리 판정이 꺼져 있으면 임계값 접근 감지도 끔"""
+        values = (distance_close, distance_open) if enabled else ()
+        self.thresholds = tuple(int(value) for value in values if value is not None)
+
+    # ----- 연결 수명 -----
+
+    def reset(self, device_id, now=None):
+        """(재)연결 시 호출 - 펌웨어는 RATE 를 RAM 에만 두므로 기본 주기에서 다시 시작"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            previous = self._devices.get(device_id)
+            if previous is not None:
+                self._counts[previous.level] -= 1
+            self._devices[device_id] = _DeviceRate(self.window, now)
+            self._counts[CLASS_ACTIVE] += 1
+            self._rebalance()
+
+    def forget(self, device_id):
+        with self._lock:
+            previous = self._devices.pop(device_id, None)
+            if previous is not None:
+                self._counts[previous.level] -= 1
+                self._rebalance()
+
+    # ----- 판단 -----
+
+    def observe(self, device_id, distance, state, now=None):
+        """센서 프레임 1건 반영 → 새로 적용할 주기(ms) 또는 None"""
+        device = self._devices.get(device_id)
+        if device is None or not self.enabled:
+            return None
+        now = time.monotonic() if now is None else now
+
+        if state != device.state:
+            if device.state is not None:
+                device.urgent_until = now + self.urgent_seconds
+            device.state = state
+            device.state_since = now
+            device.window.clear()
+            device.dist_sum = device.dist_sq_sum = 0
+        if distance is not None:
+            device.push_distance(distance)
+
+        level = self._classify(device, distance, now)
+        if level != device.level:
+            with self._lock:
+                self._counts[device.level] -= 1
+                self._counts[level] += 1
+                device.level = level
+                self._rebalance()
+
+        if device.pending_ms is not None or now < device.retry_at:
+            return None
+        target = self._target_ms(device, now)
+        if target == device.current_ms:
+            return None
+        # 주기를 줄이는(빠르게) 변경은 즉시, 늘리는 변경은 최소 간격을 두고
+        if target > device.current_ms and now - device.last_change < self.min_change_seconds:
+            return None
+        device.pending_ms = target
+        return target
+
+    def _classify(self, device, distance, now):
+        if now < device.urgent_until:
+            return CLASS_ACTIVE
+        if distance is not None and any(abs(distance - threshold) <= self.margin_mm
+                                        for threshold in self.thresholds):
+            return CLASS_ACTIVE
+        variance = device.variance()
+        if variance is not None and variance > self.variance_threshold:
+            return CLASS_ACTIVE
+        stable_for = now - device.state_since
+        if stable_for >= self.idle_seconds:
+            return CLASS_IDLE
+        if stable_for >= self.stable_seconds:
+            return CLASS_STABLE
+        return CLASS_ACTIVE
+
+    def _target_ms(self, device, now):
+        if device.level == CLASS_IDLE:
+            return self.idle_ms
+        if device.level == CLASS_STABLE:
+            return self.slow_ms
+        # 상태 변경 직후에는 예산과 관계없이 최고 주기
+        if now < device.urgent_until:
+            return self.fast_ms
+        return self._active_ms
+
+    def _rebalance(self):
+        """잠금 안에서 호출 - 안정/유휴 기기 부하를 뺀 나머지 예산으로 활동 기기 주기 결정"""
+        active = self._counts[CLASS_ACTIVE]
+        if not self.airtime_budget or not active:
+            self._active_ms = self.fast_ms
+            return
+        background = (self._counts[CLASS_STABLE] * 1000.0 / self.slow_ms
+                      + self._counts[CLASS_IDLE] * 1000.0 / self.idle_ms)
+        remaining = self.airtime_budget - background
+        if remaining <= 0:
+            active_ms = self.slow_ms
+        else:
+            active_ms = min(self.slow_ms, max(self.fast_ms, int(active * 1000.0 / remaining + 0.999)))
+        if active_ms != self._active_ms:
+            if active_ms > self.fast_ms and self._active_ms == self.fast_ms:
+                self._counters['budget_limited'] += 1
+                logger.info(f"Airtime budget reached ({active} active devices), "
+                            f"active interval raised to {active_ms} ms")
+            self._active_ms = active_ms
+
+    # ----- 전송 결과 -----
+
+    def confirm(self, device_id, interval_ms, now=None):
+        """RESP:RATE= 로 확인된 실제 주기 반영"""
+        device = self._devices.get(device_id)
+        if device is None:
+            return
+        device.current_ms = int(interval_ms)
+        device.pending_ms = None
+        device.last_change = time.monotonic() if now is None else now
+        self._counters['rate_changes'] += 1
+
+    def failed(self, device_id, now=None):
+        """RATE 전송 실패 - 최소 간격 후 다시 시도"""
+        device = self._devices.get(device_id)
+        if device is None:
+            return
+        device.pending_ms = None
+        device.retry_at = (time.monotonic() if now is None else now) + self.min_change_seconds
+        self._counters['rate_failures'] += 1
+
+    # ----- 조회 -----
+
+    def interval(self, device_id):
+        device = self._devices.get(device_id)
+        return device.current_ms if device is not None else None
+
+    def level(self, device_id):
+        device = self._devices.get(device_id)
+        return device.level if device is not None else None
+
+    def stats(self):
+        with self._lock:
+            devices = list(self._devices.values())
+            snapshot = dict(self._counters)
+            snapshot.update({
+                'enabled': self.enabled,
+                'devices': dict(self._counts),
+                'active_interval_ms': self._active_ms,
+                'fast_ms': self.fast_ms,
+                'slow_ms': self.slow_ms,
+                'idle_ms': self.idle_ms,
+                'airtime_budget': self.airtime_budget
+            })
+        snapshot['notifications_per_second'] = round(
+            sum(1000.0 / device.current_ms for device in devices), 2)
+        return snapshot
@@ -0,0 +1,178 @@
+"""
+대시보드 상태 동기화
+디바이스 목록/통계/최근 이벤트를 버전이 붙은 스냅샷과 델타로 Socket.IO 에 푸시 (재연결 시 누락된 델타만 재전송)
+"""
+import logging
+import time
+from collections import deque
+from threading import Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+STATE_ROOM = 'state'
+
+
+class StateSync:
+    """변경분을 틱마다 하나의 state_delta(버전 +1)로 묶어 state 룸에 전송"""
+
+    def __init__(self, socketio, device_provider, stats_provider, interval_ms=200,
+                 history=500, recent_events=50, namespace='/'):
+        self.socketio = socketio
+        self.device_provider = device_provider  # (device_id=None) → dict 또는 dict 목록
+        self.stats_provider = stats_provider  # () → (summary_etag, summary, unwearing_etag, unwearing)
+        self.interval = max(10, int(interval_ms)) / 1000.0
+        self.namespace = namespace
+        self.epoch = f'{int(time.time() * 1000):x}'  # 서버 재시작 시 클라이언트가 전체 스냅샷을 받도록
+        self.version = 0
+        self._lock = Lock()
+        self._log = deque(maxlen=history)  # 최근 델타 [(version, changes)]
+        self._pending_devices = {}  # {device_id: dict 또는 None(삭제)}
+        self._pending_events = []
+        self._stats_dirty = False
+        self._stats_etags = (None, None)
+        self._recent_events = deque(maxlen=recent_events)
+        self._thread = None
+        self._counters = {'deltas': 0, 'snapshots': 0, 'replays': 0}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, name='state-sync', daemon=True)
+            self._thread.start()
+
+    # ----- 변경 등록 -----
+
+    def device_changed(self, device_id):
+        """디바이스 요약 변경 (등록/연결 상태/착용 상태/담당자)"""
+        self.start()
+        with self._lock:
+            self._pending_devices[device_id] = True
+
+    def device_removed(self, device_id):
+        self.start()
+        with self._lock:
+            self._pending_devices[device_id] = None
+
+    def all_devices_changed(self):
+        """담당자 변경 등으로 전체 디바이스 요약을 다시 보내야 할 때"""
+        self.start()
+        devices = self.device_provider()
+        with self._lock:
+            for device in devices:
+                self._pending_devices[device['id']] = True
+
+    def stats_changed(self):
+        self.start()
+        with self._lock:
+            self._stats_dirty = True
+
+    def event_logged(self, event):
+        """최근 이벤트 1건 추가 (event_logs 행과 같은 키)"""
+        self.start()
+        with self._lock:
+            self._recent_events.appendleft(event)
+            self._pending_events.append(event)
+
+    def load_recent_events(self, events):
+        """시작/초기화 시 DB 의 최근 이벤트로 교체 (최신순)"""
+        with self._lock:
+            self._recent_events.clear()
+            self._recent_events.extend(events)
+
+    def reset(self):
+        """DB 초기화 후 - 새 epoch 로 바꿔 모든 클라이언트가 스냅샷을 다시 받도록"""
+        with self._lock:
+            self.epoch = f'{int(time.time() * 1000):x}'
+            self.version = 0
+            self._log.clear()
+            self._pending_devices.clear()
+            self._pending_events = []
+            self._recent_events.clear()
+            self._stats_etags = (None, None)
+            self._stats_dirty = False
+
+    # ----- 전송 -----
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.error(f"State delta flush failed: {exc}")
+            remaining = self.interval - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def flush(self):
+        """대기 중인 변경을 하나의 델타로 만들어 전송 (변경이 없으면 아무것도 하지 않음)"""
+        with self._lock:
+            pending_devices, self._pending_devices = self._pending_devices, {}
+            events, self._pending_events = self._pending_events, []
+            stats_dirty, self._stats_dirty = self._stats_dirty, False
+
+        changes = {}
+        if pending_devices:
+            changes['devices'] = {}
+            for device_id, present in pending_devices.items():
+                changes['devices'][device_id] = self.device_provider(device_id) if present else None
+        if events:
+            changes['events'] = events
+        if stats_dirty:
+            summary_etag, summary, unwearing_etag, unwearing = self.stats_provider()
+            previous_summary, previous_unwearing = self._stats_etags
+            if summary_etag != previous_summary:
+                changes['stats'] = summary
+            if unwearing_etag != previous_unwearing:
+                changes['unwearing'] = unwearing.get('unwearing', [])
+            self._stats_etags = (summary_etag, unwearing_etag)
+        if not changes:
+            return None
+
+        with self._lock:
+            self.version += 1
+            delta = {'epoch': self.epoch, 'version': self.version, 'changes': changes}
+            self._log.append(delta)
+            self._counters['deltas'] += 1
+        self.socketio.emit('state_delta', delta, to=STATE_ROOM, namespace=self.namespace)
+        return delta
+
+    # ----- 클라이언트 동기화 -----
+
+    def sync(self, epoch=None, version=None):
+        """클라이언트의 (epoch, version) 기준으로 ('deltas', [...]) 또는 ('snapshot', {...}) 반환"""
+        with self._lock:
+            if epoch == self.epoch and version is not None:
+                if version >= self.version:
+                    return 'deltas', []
+                if self._log and self._log[0]['version'] <= version + 1:
+                    self._counters['replays'] += 1
+                    return 'deltas', [delta for delta in self._log if delta['version'] > version]
+            self._counters['snapshots'] += 1
+            epoch, version = self.epoch, self.version
+            recent_events = list(self._recent_events)
+
+        summary_etag, summary, unwearing_etag, unwearing = self.stats_provider()
+        return 'snapshot', {
+            'epoch': epoch,
+            'version': version,
+            'devices': self.device_provider(),
+            'stats': summary,
+            'unwearing': unwearing.get('unwearing', []),
+            'recent_events': recent_events
+        }
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._counters)
+            snapshot.update({
+                'epoch': self.epoch,
+                'version': self.version,
+                'history': len(self._log),
+                'oldest_version': self._log[0]['version'] if self._log else None,
+                'interval_ms': int(self.interval * 1000)
+            })
+        return snapshot
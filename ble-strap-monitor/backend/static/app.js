@@ -19,6 +19,17 @@ let policyBroadcastState = {
 };
 let debugInitialized = false;
 
+// 서버 푸시 상태 (state_snapshot 으로 초기화, state_delta 로 버전 순서대로 갱신)
+let syncState = {
+    ready: false,
+    epoch: null,
+    version: 0,
+    devices: new Map(),
+    stats: null,
+    unwearing: [],
+    recentEvents: []
+};
+
 function formatKST(dateInput) {
     if (!dateInput) {
         return '정보 없음';
@@ -582,6 +593,15 @@ function initWebSocket() {
     socket.on('connect', () => {
         updateConnectionStatus(true);
         console.log('Connected to server');
+        requestStateSync();
+    });
+
+    socket.on('state_snapshot', (snapshot) => {
+        applyStateSnapshot(snapshot);
+    });
+
+    socket.on('state_delta', (delta) => {
+        applyStateDelta(delta);
     });
 
     socket.on('disconnect', () => {
@@ -593,6 +613,11 @@ function initWebSocket() {
         handleDeviceData(data);
     });
 
+    socket.on('device_data_batch', (batch) => {
+        const items = Array.isArray(batch?.devices) ? batch.devices : [];
+        items.forEach(handleDeviceData);
+    });
+
     socket.on('state_change', (data) => {
         handleStateChange(data);
     });
@@ -611,7 +636,6 @@ function initWebSocket() {
             detail: detailParts.join(' · '),
             deviceId: data.device_id
         });
-        loadDevices();
     });
 
     socket.on('device_disconnected', (data) => {
@@ -628,15 +652,18 @@ function initWebSocket() {
             deviceId: data.device_id,
             autoOpen: true
         });
-        loadDevices();
     });
     
     socket.on('device_status', (data) => {
         updateDeviceStatus(data);
-        if (['connected', 'ready', 'disconnected', 'error'].includes(data.status)) {
-            loadDevices();
-            loadDevicesForMonitoring();
-        }
+    });
+
+    socket.on('scan_result', (data) => {
+        handleScanResult(data);
+    });
+
+    socket.on('scan_complete', (data) => {
+        handleScanComplete(data);
     });
 
     socket.on('policy_push_summary', (data) => {
@@ -739,9 +766,15 @@ function handlePolicyPushSummary(data = {}) {
             ? Number(data.failed)
             : policyBroadcastState.failed;
 
-        const statusText = total === 0
+        let statusText = total === 0
             ? '전파할 연결된 기기가 없습니다.'
             : `전파 완료 • 성공 ${policyBroadcastState.success} / 실패 ${policyBroadcastState.failed}`;
+        if (Number(data.skipped) > 0) {
+            statusText += ` • 이미 적용 ${Number(data.skipped)}`;
+        }
+        if (Number(data.deferred) > 0) {
+            statusText += ` • 재연결 시 적용 ${Number(data.deferred)}`;
+        }
 
         renderPolicySummary({
             timestamp: policyBroadcastState.lastUpdated,
@@ -780,17 +813,24 @@ function handlePolicyPushResult(data = {}) {
         detailParts.push('현재 기기가 연결되어 있지 않습니다.');
     }
 
-    const message = success
-        ? '정책 명령을 장치로 전송했습니다.'
-        : '정책 명령 전송에 실패했습니다.';
-    const title = success ? '정책 전파 성공' : '정책 전파 실패';
+    if (data.deferred) {
+        detailParts.push('재연결 시 자동으로 적용됩니다.');
+    }
 
-    showNotification(message, success ? 'success' : 'danger', {
-        title,
-        detail: detailParts.join(' · ') || undefined,
-        deviceId: data.device_id,
-        autoOpen: !success
-    });
+    // 이미 같은 정책이 적용된 기기는 알림 없이 진행률만 갱신
+    if (!data.skipped) {
+        const message = success
+            ? '정책 명령을 장치로 전송했습니다.'
+            : '정책 명령 전송에 실패했습니다.';
+        const title = success ? '정책 전파 성공' : '정책 전파 실패';
+
+        showNotification(message, success ? 'success' : (data.deferred ? 'warning' : 'danger'), {
+            title,
+            detail: detailParts.join(' · ') || undefined,
+            deviceId: data.device_id,
+            autoOpen: !success
+        });
+    }
 
     if (policyBroadcastState.total > 0) {
         const progress = Math.min(policyBroadcastState.success + policyBroadcastState.failed, policyBroadcastState.total);
@@ -819,6 +859,8 @@ function handleSystemReset(data = {}) {
     });
 
     renderPolicySummary({ timestamp: policyBroadcastState.lastUpdated, status: '정책 정보를 다시 불러오는 중입니다.' });
+    syncState.ready = false;
+    requestStateSync();
     loadInitialData();
 }
 
@@ -858,13 +900,88 @@ function handleStateChange(data) {
         });
     }
 
-    loadStats();
-
     if (document.getElementById('logs-page').classList.contains('active')) {
         loadLogs();
     }
 }
 
+// 상태 동기화
+function requestStateSync() {
+    socket.emit('state_sync', {
+        epoch: syncState.epoch,
+        version: syncState.ready ? syncState.version : null
+    });
+}
+
+function applyStateSnapshot(snapshot = {}) {
+    syncState = {
+        ready: true,
+        epoch: snapshot.epoch,
+        version: snapshot.version || 0,
+        devices: new Map((snapshot.devices || []).map(device => [device.id, device])),
+        stats: snapshot.stats || null,
+        unwearing: snapshot.unwearing || [],
+        recentEvents: snapshot.recent_events || []
+    };
+    renderSyncedState(['devices', 'stats', 'unwearing', 'events']);
+}
+
+function applyStateDelta(delta = {}) {
+    if (!syncState.ready || delta.epoch !== syncState.epoch) {
+        requestStateSync();
+        return;
+    }
+    if (delta.version <= syncState.version) {
+        return;
+    }
+    if (delta.version !== syncState.version + 1) {
+        // 누락된 델타가 있으면 마지막 버전 이후분을 다시 요청
+        requestStateSync();
+        return;
+    }
+
+    const changes = delta.changes || {};
+    Object.entries(changes.devices || {}).forEach(([deviceId, device]) => {
+        if (device) {
+            syncState.devices.set(deviceId, device);
+        } else {
+            syncState.devices.delete(deviceId);
+        }
+    });
+    if (changes.stats) {
+        syncState.stats = changes.stats;
+    }
+    if (changes.unwearing) {
+        syncState.unwearing = changes.unwearing;
+    }
+    if (Array.isArray(changes.events)) {
+        const eventKey = event => `${event.timestamp}|${event.device_id}|${event.event_type}`;
+        const known = new Set(syncState.recentEvents.map(eventKey));
+        const fresh = changes.events.filter(event => !known.has(eventKey(event))).reverse();
+        syncState.recentEvents = [...fresh, ...syncState.recentEvents].slice(0, 50);
+    }
+    syncState.version = delta.version;
+    renderSyncedState(Object.keys(changes));
+}
+
+function syncedDevices() {
+    return Array.from(syncState.devices.values());
+}
+
+function renderSyncedState(changedKeys) {
+    if (changedKeys.includes('devices')) {
+        devices = syncedDevices();
+        renderDeviceList(devices);
+        renderMonitoringDevices(devices);
+    }
+    if (changedKeys.some(key => ['devices', 'stats', 'unwearing'].includes(key))) {
+        renderStatsCards(syncState.stats || {}, syncedDevices(), syncState.unwearing);
+    }
+    if (changedKeys.includes('events')) {
+        renderUnwearLogs(syncState.recentEvents.filter(event => event.event_type === 'wear_off').slice(0, 20));
+    }
+}
+
 // 초기 데이터 로드
 async function loadInitialData() {
     await Promise.all([
@@ -884,6 +1001,10 @@ async function loadDashboard() {
 }
 
 async function loadStats() {
+    if (syncState.ready) {
+        renderStatsCards(syncState.stats || {}, syncedDevices(), syncState.unwearing);
+        return;
+    }
     try {
         const [summaryRes, devicesRes, unwearRes] = await Promise.all([
             fetch('/api/stats/summary'),
@@ -894,32 +1015,33 @@ async function loadStats() {
         const summary = await summaryRes.json();
         const devicesData = await devicesRes.json();
         const unwearData = await unwearRes.json();
+        renderStatsCards(summary, devicesData.devices, unwearData.unwearing);
+    } catch (error) {
+        console.error('Failed to load stats:', error);
+    }
+}
 
-        const totalEmployeesEl = document.getElementById('stat-total-employees');
-        if (totalEmployeesEl) {
-            totalEmployeesEl.textContent = summary.total_employees ?? 0;
-        }
+function renderStatsCards(summary, devicesList, unwearingList) {
+    const devicesForStats = Array.isArray(devicesList) ? devicesList : [];
 
-        const totalDevicesEl = document.getElementById('stat-total-devices');
-        if (totalDevicesEl) {
-            totalDevicesEl.textContent = Array.isArray(devicesData.devices) ? devicesData.devices.length : 0;
-        }
+    const totalEmployeesEl = document.getElementById('stat-total-employees');
+    if (totalEmployeesEl) {
+        totalEmployeesEl.textContent = summary.total_employees ?? 0;
+    }
 
-        const offlineCount = Array.isArray(devicesData.devices)
-            ? devicesData.devices.filter(device => !device.connected).length
-            : 0;
-        const offlineEl = document.getElementById('stat-devices-offline');
-        if (offlineEl) {
-            offlineEl.textContent = offlineCount;
-        }
+    const totalDevicesEl = document.getElementById('stat-total-devices');
+    if (totalDevicesEl) {
+        totalDevicesEl.textContent = devicesForStats.length;
+    }
 
-        const nonwearCount = Array.isArray(unwearData.unwearing) ? unwearData.unwearing.length : 0;
-        const nonwearEl = document.getElementById('stat-nonwearing');
-        if (nonwearEl) {
-            nonwearEl.textContent = nonwearCount;
-        }
-    } catch (error) {
-        console.error('Failed to load stats:', error);
+    const offlineEl = document.getElementById('stat-devices-offline');
+    if (offlineEl) {
+        offlineEl.textContent = devicesForStats.filter(device => !device.connected).length;
+    }
+
+    const nonwearEl = document.getElementById('stat-nonwearing');
+    if (nonwearEl) {
+        nonwearEl.textContent = Array.isArray(unwearingList) ? unwearingList.length : 0;
     }
 }
 
@@ -1003,28 +1125,34 @@ async function loadMonitoring() {
 }
 
 async function loadDevicesForMonitoring() {
+    if (syncState.ready) {
+        renderMonitoringDevices(syncedDevices());
+        return;
+    }
     try {
         const res = await fetch('/api/devices');
         const data = await res.json();
-        const devicesForView = Array.isArray(data.devices) ? data.devices : [];
-
-        const sortedDevices = [...devicesForView].sort((a, b) => {
-            const stateA = a?.last_data?.state || '';
-            const stateB = b?.last_data?.state || '';
-            if (stateA === 'OPEN' && stateB !== 'OPEN') return -1;
-            if (stateA !== 'OPEN' && stateB === 'OPEN') return 1;
-            const nameA = (a?.last_data?.employee_name || a?.employee_name || a?.name || '').toString();
-            const nameB = (b?.last_data?.employee_name || b?.employee_name || b?.name || '').toString();
-            return nameA.localeCompare(nameB);
-        });
-
-        renderMonitoringGrid('monitoring-grid', sortedDevices);
-        renderMonitoringGrid('dashboard-monitoring', sortedDevices);
+        renderMonitoringDevices(Array.isArray(data.devices) ? data.devices : []);
     } catch (error) {
         console.error('Failed to load devices:', error);
     }
 }
 
+function renderMonitoringDevices(devicesForView) {
+    const sortedDevices = [...devicesForView].sort((a, b) => {
+        const stateA = a?.last_data?.state || '';
+        const stateB = b?.last_data?.state || '';
+        if (stateA === 'OPEN' && stateB !== 'OPEN') return -1;
+        if (stateA !== 'OPEN' && stateB === 'OPEN') return 1;
+        const nameA = (a?.last_data?.employee_name || a?.employee_name || a?.name || '').toString();
+        const nameB = (b?.last_data?.employee_name || b?.employee_name || b?.name || '').toString();
+        return nameA.localeCompare(nameB);
+    });
+
+    renderMonitoringGrid('monitoring-grid', sortedDevices);
+    renderMonitoringGrid('dashboard-monitoring', sortedDevices);
+}
+
 function updateMonitoringDisplay(data) {
     const item = mapRealtimeDataToMonitoringItem(data);
     refreshMonitoringCard('monitoring-grid', item);
@@ -1032,34 +1160,42 @@ function updateMonitoringDisplay(data) {
 }
 
 async function loadUnwearLogs() {
+    if (syncState.ready) {
+        renderUnwearLogs(syncState.recentEvents.filter(event => event.event_type === 'wear_off').slice(0, 20));
+        return;
+    }
     try {
         const res = await fetch('/api/logs/events?type=wear_off&limit=20');
         const data = await res.json();
-        
-        const container = document.getElementById('unwear-logs');
-        if (!data.logs || data.logs.length === 0) {
-            container.innerHTML = '<p style="color: var(--text-secondary); text-align: center;">착용 해제 로그가 없습니다</p>';
-            return;
-        }
-        
-        container.innerHTML = data.logs.map(log => {
-            const time = formatKST(log.timestamp);
-            const employeeName = log.employee_name || '미배정';
-            
-            return `
-                <div class="log-entry warning">
-                    <div class="log-time">${time}</div>
-                    <div class="log-message">
-                        <strong>${employeeName}</strong> - ${log.device_id}
-                    </div>
-                </div>
-            `;
-        }).join('');
+        renderUnwearLogs(data.logs || []);
     } catch (error) {
         console.error('Failed to load unwear logs:', error);
     }
 }
 
+function renderUnwearLogs(logs) {
+    const container = document.getElementById('unwear-logs');
+    if (!container) return;
+    if (!logs || logs.length === 0) {
+        container.innerHTML = '<p style="color: var(--text-secondary); text-align: center;">착용 해제 로그가 없습니다</p>';
+        return;
+    }
+    
+    container.innerHTML = logs.map(log => {
+        const time = formatKST(log.timestamp);
+        const employeeName = log.employee_name || '미배정';
+        
+        return `
+            <div class="log-entry warning">
+                <div class="log-time">${time}</div>
+                <div class="log-message">
+                    <strong>${employeeName}</strong> - ${log.device_id}
+                </div>
+            </div>
+        `;
+    }).join('');
+}
+
 // 직원 관리
 async function loadEmployees() {
     try {
@@ -1214,59 +1350,68 @@ async function deleteEmployee(employeeId) {
 
 // 기기 관리
 async function loadDevices() {
+    if (syncState.ready) {
+        devices = syncedDevices();
+        renderDeviceList(devices);
+        return;
+    }
     try {
         const res = await fetch('/api/devices');
         const data = await res.json();
         devices = data.devices || [];
-        
-        const container = document.getElementById('devices-list');
-        if (devices.length === 0) {
-            container.innerHTML = '<p style="color: var(--text-secondary); text-align: center;">등록된 기기가 없습니다</p>';
-            return;
-        }
-        
-        container.innerHTML = devices.map(device => {
-            const connected = Boolean(device.connected);
-            const connectedClass = connected ? 'success' : 'inactive';
-            const connectedText = connected ? '연결됨' : '연결 대기';
-            const lastData = device.last_data || {};
-            const stateMeta = resolveStateMeta(lastData.state);
-            const employeeName = lastData.employee_name || device.employee_name || '-';
-            const reconnectBtn = !device.connected 
-                ? `<button class="btn btn-sm btn-warning" style="margin-left: 8px;" onclick="reconnectDevice('${device.id}')">재연결</button>`
-                : '';
-            
-            return `
-                <div class="device-card${stateMeta.css === 'warning' ? ' unwearing-alert' : ''}" data-device-id="${device.id}">
-                    <div class="device-header">
-                        <div class="device-name">
-                            <span class="status-dot ${connectedClass}"></span>
-                            ${device.name}
-                        </div>
-                        <div>
-                            <span class="badge badge-${connectedClass}">${connectedText}</span>
-                            ${reconnectBtn}
-                            <button class="btn btn-sm btn-danger" style="margin-left: 8px;" onclick="removeDevice('${device.id}')">삭제</button>
-                        </div>
-                    </div>
-                    <div style="font-size: 13px; color: var(--text-secondary); margin-top: 8px;">
-                        ${device.address}
-                    </div>
-                    <div style="font-size: 12px; color: var(--text-secondary); margin-top: 4px;">
-                        담당자: ${employeeName}
-                        ${lastData.state ? ` · 상태: <span style="color: inherit; font-weight: 600;">${stateMeta.text}</span>` : ''}
-                    </div>
-                </div>
-            `;
-        }).join('');
-
-        renderPolicySummary();
-        updateDebugDeviceOptions();
+        renderDeviceList(devices);
     } catch (error) {
         console.error('Failed to load devices:', error);
     }
 }
 
+function renderDeviceList(devicesList) {
+    const container = document.getElementById('devices-list');
+    if (container) {
+        container.innerHTML = devicesList.length === 0
+            ? '<p style="color: var(--text-secondary); text-align: center;">등록된 기기가 없습니다</p>'
+            : devicesList.map(renderDeviceCard).join('');
+    }
+
+    renderPolicySummary();
+    updateDebugDeviceOptions();
+}
+
+function renderDeviceCard(device) {
+    const connected = Boolean(device.connected);
+    const connectedClass = connected ? 'success' : 'inactive';
+    const connectedText = connected ? '연결됨' : '연결 대기';
+    const lastData = device.last_data || {};
+    const stateMeta = resolveStateMeta(lastData.state);
+    const employeeName = lastData.employee_name || device.employee_name || '-';
+    const reconnectBtn = !device.connected 
+        ? `<button class="btn btn-sm btn-warning" style="margin-left: 8px;" onclick="reconnectDevice('${device.id}')">재연결</button>`
+        : '';
+
+    return `
+        <div class="device-card${stateMeta.css === 'warning' ? ' unwearing-alert' : ''}" data-device-id="${device.id}">
+            <div class="device-header">
+                <div class="device-name">
+                    <span class="status-dot ${connectedClass}"></span>
+                    ${device.name}
+                </div>
+                <div>
+                    <span class="badge badge-${connectedClass}">${connectedText}</span>
+                    ${reconnectBtn}
+                    <button class="btn btn-sm btn-danger" style="margin-left: 8px;" onclick="removeDevice('${device.id}')">삭제</button>
+                </div>
+            </div>
+            <div style="font-size: 13px; color: var(--text-secondary); margin-top: 8px;">
+                ${device.address}
+            </div>
+            <div style="font-size: 12px; color: var(--text-secondary); margin-top: 4px;">
+                담당자: ${employeeName}
+                ${lastData.state ? ` · 상태: <span style="color: inherit; font-weight: 600;">${stateMeta.text}</span>` : ''}
+            </div>
+        </div>
+    `;
+}
+
 async function reconnectDevice(deviceId) {
     try {
         const res = await fetch(`/api/devices/${deviceId}/reconnect`, {
@@ -1285,6 +1430,39 @@ async function reconnectDevice(deviceId) {
     }
 }
 
+// 스캔 창 결과 (주소 → 기기), scan_result 로 들어오는 새 기기를 누적
+let scanResultsByAddress = {};
+
+function renderScanResults(scanning) {
+    const scanResults = document.getElementById('scan-results');
+    if (!scanResults) return;
+    const devices = Object.values(scanResultsByAddress)
+        .sort((a, b) => (b.rssi ?? -999) - (a.rssi ?? -999));
+
+    if (devices.length === 0) {
+        scanResults.innerHTML = scanning
+            ? '<p style="color: var(--text-secondary); text-align: center;">스캔 중...</p>'
+            : '<p style="color: var(--text-secondary); text-align: center;">디바이스를 찾지 못했습니다</p>';
+        return;
+    }
+
+    scanResults.innerHTML = devices.map(d => `
+        <div class="device-card">
+            <div class="device-header">
+                <div class="device-name">${d.name}</div>
+                ${d.registered
+                    ? '<span style="font-size: 12px; color: var(--text-secondary);">등록됨</span>'
+                    : `<button class="btn btn-sm btn-success" onclick="registerDevice('${d.address}', '${d.name}')">등록</button>`}
+            </div>
+            <div style="font-size: 13px; color: var(--text-secondary); margin-top: 8px;">
+                ${d.address} | RSSI: ${d.rssi || 'N/A'}
+            </div>
+        </div>
+    `).join('') + (scanning
+        ? '<p style="color: var(--text-secondary); text-align: center; font-size: 12px;">스캔 중...</p>'
+        : '');
+}
+
 async function startScan() {
     const scanResults = document.getElementById('scan-results');
     scanResults.innerHTML = '<p style="color: var(--text-secondary); text-align: center;">스캔 중...</p>';
@@ -1296,29 +1474,35 @@ async function startScan() {
             body: JSON.stringify({ timeout: 5 })
         });
         const data = await res.json();
-        
-        if (!data.devices || data.devices.length === 0) {
-            scanResults.innerHTML = '<p style="color: var(--text-secondary); text-align: center;">디바이스를 찾지 못했습니다</p>';
-            return;
+        if (!res.ok) {
+            throw new Error(data.error || 'scan failed');
         }
-        
-        scanResults.innerHTML = data.devices.map(d => `
-            <div class="device-card">
-                <div class="device-header">
-                    <div class="device-name">${d.name}</div>
-                    <button class="btn btn-sm btn-success" onclick="registerDevice('${d.address}', '${d.name}')">등록</button>
-                </div>
-                <div style="font-size: 13px; color: var(--text-secondary); margin-top: 8px;">
-                    ${d.address} | RSSI: ${d.rssi || 'N/A'}
-                </div>
-            </div>
-        `).join('');
+
+        // 캐시된 결과를 먼저 표시하고 창이 열린 동안 scan_result 로 갱신
+        scanResultsByAddress = {};
+        (data.devices || []).forEach(d => { scanResultsByAddress[d.address] = d; });
+        renderScanResults(true);
     } catch (error) {
         scanResults.innerHTML = '<p style="color: var(--danger);">스캔에 실패했습니다</p>';
         console.error('Scan failed:', error);
     }
 }
 
+function handleScanResult(data = {}) {
+    const device = data.device;
+    if (!device || !document.getElementById('scan-results')) return;
+    const existing = scanResultsByAddress[device.address];
+    scanResultsByAddress[device.address] = { ...existing, ...device };
+    renderScanResults(true);
+}
+
+function handleScanComplete(data = {}) {
+    if (!document.getElementById('scan-results')) return;
+    scanResultsByAddress = {};
+    (data.devices || []).forEach(d => { scanResultsByAddress[d.address] = d; });
+    renderScanResults(false);
+}
+
 async function registerDevice(address, name) {
     try {
         const res = await fetch('/api/devices/register', {
@@ -1934,10 +2118,13 @@ async function exportLogs() {
     }
 }
 
-// 로그 페이지
-async function loadLogs() {
+// 로그 페이지 (append=true 이면 next_cursor 로 이전 로그를 이어서 불러옴)
+let logsNextCursor = null;
+
+async function loadLogs(append = false) {
     const typeFilter = document.getElementById('log-type-filter')?.value || '';
     const dateFilter = document.getElementById('log-date-input')?.value || '';
+    const moreBtn = document.getElementById('logs-more-btn');
     
     try {
         let url = '/api/logs/events?limit=100';
@@ -1947,6 +2134,9 @@ async function loadLogs() {
         if (dateFilter) {
             url += `&date=${encodeURIComponent(dateFilter)}`;
         }
+        if (append && logsNextCursor) {
+            url += `&cursor=${encodeURIComponent(logsNextCursor)}`;
+        }
 
         const res = await fetch(url);
         const container = document.getElementById('logs-container');
@@ -1961,12 +2151,16 @@ async function loadLogs() {
         }
 
         const data = await res.json();
-        if (!data.logs || data.logs.length === 0) {
+        logsNextCursor = data.next_cursor || null;
+        if (moreBtn) {
+            moreBtn.style.display = logsNextCursor ? '' : 'none';
+        }
+        if (!append && (!data.logs || data.logs.length === 0)) {
             container.innerHTML = '<p style="color: var(--text-secondary); text-align: center;">로그가 없습니다</p>';
             return;
         }
         
-        container.innerHTML = data.logs.map(log => {
+        const html = (data.logs || []).map(log => {
             const time = formatKST(log.timestamp);
             const employeeName = log.employee_name || '미배정';
             const eventText = log.event_type === 'wear_on' ? '착용' : '착용 해제';
@@ -1986,6 +2180,11 @@ async function loadLogs() {
                 </div>
             `;
         }).join('');
+        if (append) {
+            container.insertAdjacentHTML('beforeend', html);
+        } else {
+            container.innerHTML = html;
+        }
     } catch (error) {
         console.error('Failed to load logs:', error);
     }
@@ -0,0 +1,250 @@
+"""
+대시보드 통계 엔진
+착용 상태 변경/연결 이벤트로 요약 카운터와 미착용 직원 집합을 메모리에서 증분 갱신하고 주기적으로 DB 와 대조
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from threading import Lock, Thread
+
+import db
+
+logger = logging.getLogger('db.stats')
+
+
+class StatsEngine:
+    """/api/stats/summary, /api/stats/unwearing 응답을 메모리에서 제공 (버전 기반 ETag)"""
+
+    def __init__(self, writer=None, reconcile_interval=300):
+        self.writer = writer
+        self.reconcile_interval = reconcile_interval
+        self._lock = Lock()
+        self._epoch = int(time.time())  # 재시작 시 ETag 충돌 방지
+        self._summary_version = 0
+        self._unwearing_version = 0
+        self._summary_cache = None  # (version, payload)
+        self._unwearing_cache = None
+
+        self._total_employees = 0
+        self._total_events = 0
+        self._today = None  # today_unwear_events 기준 UTC 날짜 (YYYY-MM-DD)
+        self._today_unwear = 0
+        self._employees = []  # 기기가 할당된 직원 (id 순) - (id, name, number, department, device_id)
+        self._active_by_device = {}  # {device_id: [진행 중 세션의 employee_id, ...]}
+        self._active_by_employee = {}  # {employee_id: 진행 중 세션 수}
+        self._last_unwear = {}  # {device_id: 마지막 wear_off 시각}
+        self._connected = set()
+        self._thread = None
+        self._listeners = []
+        self._stats = {'reconciles': 0, 'drift_corrections': 0, 'last_reconcile_ms': 0.0}
+
+    def start(self):
+        if self._thread is not None or not self.reconcile_interval:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, name='stats-reconcile', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.reconcile_interval)
+            try:
+                self.reconcile()
+            except Exception as exc:
+                logger.error(f"Stats reconcile failed: {exc}")
+
+    def add_listener(self, callback):
+        """통계 버전이 바뀔 때 호출할 콜백 등록 (잠금 밖에서 인자 없이 호출)"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as exc:
+                logger.error(f"Stats listener failed: {exc}")
+
+    # ----- 증분 갱신 -----
+
+    def record_state_change(self, device_id, employee_id, event_type, timestamp):
+        """착용 이벤트 1건 반영 (timestamp 는 event_logs 에 기록한 UTC 문자열)"""
+        with self._lock:
+            self._total_events += 1
+            if event_type == 'wear_on':
+                self._active_by_device.setdefault(device_id, []).append(employee_id)
+                if employee_id is not None:
+                    self._active_by_employee[employee_id] = self._active_by_employee.get(employee_id, 0) + 1
+            else:
+                # wear_sessions 종료는 device_id 기준이므로 해당 기기의 진행 중 세션을 모두 닫음
+                for closed_employee in self._active_by_device.pop(device_id, []):
+                    if closed_employee is None:
+                        continue
+                    remaining = self._active_by_employee.get(closed_employee, 0) - 1
+                    if remaining > 0:
+                        self._active_by_employee[closed_employee] = remaining
+                    else:
+                        self._active_by_employee.pop(closed_employee, None)
+                self._roll_day(timestamp[:10])
+                if timestamp[:10] == self._today:
+                    self._today_unwear += 1
+                self._last_unwear[device_id] = timestamp
+            self._summary_version += 1
+            self._unwearing_version += 1
+        self._notify()
+
+    def set_connected(self, device_id, connected):
+        """디바이스 연결 상태 반영 (미착용 목록은 연결된 기기만 포함)"""
+        with self._lock:
+            if connected == (device_id in self._connected):
+                return
+            if connected:
+                self._connected.add(device_id)
+            else:
+                self._connected.discard(device_id)
+            self._unwearing_version += 1
+        self._notify()
+
+    def _roll_day(self, day=None):
+        day = day or datetime.utcnow().strftime('%Y-%m-%d')
+        if self._today is None or day > self._today:
+            if self._today is not None:
+                self._summary_version += 1
+            self._today = day
+            self._today_unwear = 0
+
+    # ----- 조회 -----
+
+    def summary(self):
+        """(ETag, 응답 dict) - 버전이 바뀌지 않았으면 캐시된 dict 재사용"""
+        with self._lock:
+            self._roll_day()
+            version = self._summary_version
+            if self._summary_cache is None or self._summary_cache[0] != version:
+                self._summary_cache = (version, {
+                    'total_employees': self._total_employees,
+                    'currently_wearing': sum(len(sessions) for sessions in self._active_by_device.values()),
+                    'today_unwear_events': self._today_unwear,
+                    'total_events': self._total_events
+                })
+            return self._etag('summary', version), self._summary_cache[1]
+
+    def unwearing(self):
+        """(ETag, 응답 dict) - 연결되어 있고 진행 중 세션이 없는 직원 목록"""
+        with self._lock:
+            version = self._unwearing_version
+            if self._unwearing_cache is None or self._unwearing_cache[0] != version:
+                items = []
+                for employee_id, name, number, department, device_id in self._employees:
+                    if device_id not in self._connected or self._active_by_employee.get(employee_id):
+                        continue
+                    items.append({
+                        'id': employee_id,
+                        'name': name,
+                        'employee_number': number,
+                        'department': department,
+                        'device_id': device_id,
+                        'last_unwear_time': self._last_unwear.get(device_id)
+                    })
+                self._unwearing_cache = (version, {'unwearing': items})
+            return self._etag('unwearing', version), self._unwearing_cache[1]
+
+    def _etag(self, kind, version):
+        return f'{kind}-{self._epoch}-{version}'
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'summary_version': self._summary_version,
+                'unwearing_version': self._unwearing_version,
+                'connected_devices': len(self._connected),
+                'employees_with_device': len(self._employees)
+            })
+        return snapshot
+
+    # ----- DB 대조 -----
+
+    def reload_employees(self):
+        """직원 CRUD 후 호출 - 직원 수와 기기 할당 목록만 다시 읽음"""
+        conn = db.get_connection()
+        try:
+            total = conn.execute('SELECT COUNT(*) FROM employees').fetchone()[0]
+            employees = conn.execute('''SELECT id, name, employee_number, department, device_id
+                                        FROM employees WHERE device_id IS NOT NULL
+                                        ORDER BY id ASC''').fetchall()
+        finally:
+            conn.close()
+        employees = [tuple(row) for row in employees]
+        with self._lock:
+            changed = total != self._total_employees or employees != self._employees
+            if total != self._total_employees:
+                self._total_employees = total
+                self._summary_version += 1
+            if employees != self._employees:
+                self._employees = employees
+                self._unwearing_version += 1
+        if changed:
+            self._notify()
+
+    def reconcile(self):
+        """대기 중인 쓰기를 반영한 뒤 DB 집계로 메모리 상태를 교체 (차이가 있으면 경고)"""
+        started = time.perf_counter()
+        if self.writer is not None:
+            self.writer.flush(timeout=10)
+
+        now = datetime.utcnow()
+        today = now.strftime('%Y-%m-%d')
+        day_range = (f'{today} 00:00:00', (now + timedelta(days=1)).strftime('%Y-%m-%d 00:00:00'))
+        conn = db.get_connection()
+        try:
+            total_events = conn.execute('SELECT COUNT(*) FROM event_logs').fetchone()[0]
+            today_unwear = conn.execute('''SELECT COUNT(*) FROM event_logs
+                                           WHERE event_type = 'wear_off'
+                                           AND timestamp >= ? AND timestamp < ?''',
+                                        day_range).fetchone()[0]
+            active_rows = conn.execute('''SELECT device_id, employee_id FROM wear_sessions
+                                          WHERE is_active = 1''').fetchall()
+            last_unwear = conn.execute('''SELECT e.device_id,
+                                                 (SELECT timestamp FROM event_logs
+                                                  WHERE device_id = e.device_id AND event_type = 'wear_off'
+                                                  ORDER BY timestamp DESC LIMIT 1)
+                                          FROM employees e
+                                          WHERE e.device_id IS NOT NULL''').fetchall()
+        finally:
+            conn.close()
+        self.reload_employees()
+
+        active_by_device = {}
+        active_by_employee = {}
+        for device_id, employee_id in active_rows:
+            active_by_device.setdefault(device_id, []).append(employee_id)
+            if employee_id is not None:
+                active_by_employee[employee_id] = active_by_employee.get(employee_id, 0) + 1
+
+        last_unwear = {device_id: ts for device_id, ts in last_unwear if ts}
+
+        with self._lock:
+            drift = (total_events != self._total_events
+                     or today != self._today or today_unwear != self._today_unwear
+                     or active_by_device != self._active_by_device
+                     or last_unwear != self._last_unwear)
+            if drift and self._stats['reconciles']:
+                self._stats['drift_corrections'] += 1
+                logger.warning(f"Stats drift corrected (events {self._total_events} -> {total_events}, "
+                               f"active {sum(self._active_by_employee.values())} -> "
+                               f"{sum(active_by_employee.values())})")
+            self._total_events = total_events
+            self._today = today
+            self._today_unwear = today_unwear
+            self._active_by_device = active_by_device
+            self._active_by_employee = active_by_employee
+            self._last_unwear = last_unwear
+            if drift:
+                self._summary_version += 1
+                self._unwearing_version += 1
+            self._stats['reconciles'] += 1
+            self._stats['last_reconcile_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        if drift:
+            self._notify()
@@ -0,0 +1,394 @@
+"""
+스트랩 시뮬레이터
+BLE 없이 가상 스트랩 N대를 흉내 내는 전송 계층 (센서 프레임 송신, 펌웨어 명령에 RESP: 응답, 연결 끊김 주입)
+"""
+import asyncio
+import inspect
+import logging
+import random
+import re
+import time
+from threading import Lock
+from types import SimpleNamespace
+
+from frames import pack_binary_frame
+from transport import TRANSPORT_SIMULATED
+
+logger = logging.getLogger(__name__)
+
+# 펌웨어와 같은 기본값/범위
+DEFAULT_INTERVAL_MS = 120
+MIN_INTERVAL_MS = 50
+MAX_INTERVAL_MS = 2000
+DEFAULT_BUZZER_FREQ = 2000
+DEFAULT_POLICY = (True, 150, 180)
+
+# 펌웨어 isSafeGpio() 가 허용하는 핀 (플래시/입력 전용/센서·부저·AUX 핀 제외)
+SAFE_GPIO_PINS = frozenset(pin for pin in range(40)
+                           if not 6 <= pin <= 11 and not 34 <= pin <= 39 and pin not in (21, 22, 25, 26, 27))
+
+
+def _clamp(value, minimum, maximum):
+    return max(minimum, min(maximum, value))
+
+
+def _to_int(token):
+    """Arduino String.toInt() 처럼 앞쪽 숫자만 읽고 실패하면 0"""
+    match = re.match(r'\s*([-+]?\d+)', token or '')
+    return int(match.group(1)) if match else 0
+
+
+def _duration(token, fallback, minimum, maximum):
+    parsed = _to_int(token)
+    return fallback if parsed <= 0 else _clamp(parsed, minimum, maximum)
+
+
+def _frequency(token):
+    parsed = _to_int(token)
+    return parsed if 100 <= parsed <= 8000 else DEFAULT_BUZZER_FREQ
+
+
+class SimulatedStrap:
+    """펌웨어 1대의 상태 (측정 주기, 프레임 포맷, 착용 정책, 출력 상태, 착용 상태)"""
+
+    __slots__ = ('address', 'name', 'interval_ms', 'binary', 'seq', 'policy', 'state', 'state_until',
+                 'buzzer', 'aux', 'aux2', 'client', 'rng', 'dwell_seconds')
+
+    def __init__(self, address, name, rng, dwell_seconds):
+        self.address = address
+        self.name = name
+        self.rng = rng
+        self.dwell_seconds = dwell_seconds
+        self.client = None  # 연결된 SimulatedClient
+        self.state = 'CLOSED' if rng.random() < 0.8 else 'OPEN'
+        self.state_until = time.monotonic() + rng.expovariate(1.0 / dwell_seconds)
+        self.buzzer = False
+        self.aux = False
+        self.aux2 = False
+        self.policy = DEFAULT_POLICY
+        self.interval_ms = DEFAULT_INTERVAL_MS
+        self.binary = False
+        self.seq = 0
+
+    def link_lost(self):
+        """펌웨어 onDisconnect - 프레임 포맷만 텍스트로 되돌리고 RATE/정책은 유지"""
+        self.binary = False
+
+    def next_frame(self, now):
+        if now >= self.state_until:
+            self.state = 'OPEN' if self.state == 'CLOSED' else 'CLOSED'
+            self.state_until = now + self.rng.expovariate(1.0 / self.dwell_seconds)
+        _, close_mm, open_mm = self.policy
+        if self.state == 'CLOSED':
+            dist = max(0, close_mm - 60 + self.rng.randint(-3, 3))
+            raw = 900 + self.rng.randint(-5, 5)
+        else:
+            dist = open_mm + 140 + self.rng.randint(-10, 10)
+            raw = 2900 + self.rng.randint(-5, 5)
+        avg = raw + self.rng.randint(-2, 2)
+        diff = abs(avg - 2048)
+        self.seq = (self.seq + 1) & 0xFFFF
+        if self.binary:
+            return pack_binary_frame(self.state, self.seq, dist, raw, avg, diff)
+        return f"DIST:{dist};RAW:{raw};AVG:{avg};DIFF:{diff};STATE:{self.state}".encode('utf-8')
+
+    def handle_command(self, text):
+        """펌웨어 onWrite 와 같은 규칙으로 명령 처리 → RESP: 응답 (ONCE 는 None, 알 수 없는 명령은 RESP:UNKNOWN)"""
+        value = text
+        if value == 'FMT:BIN':
+            self.binary = True
+            self.seq = 0
+            return 'RESP:FMT=BIN,1'
+        if value == 'FMT:TEXT':
+            self.binary = False
+            return 'RESP:FMT=TEXT'
+        if value.startswith('RATE:'):
+            self.interval_ms = _clamp(_to_int(value[5:]), MIN_INTERVAL_MS, MAX_INTERVAL_MS)
+            return f'RESP:RATE={self.interval_ms}'
+        if value == 'ONCE':
+            return None
+        if value == 'CAL':
+            return 'RESP:CAL-OK'
+        if value == 'BEEP':
+            return 'RESP:BEEP'
+        if value == 'STATE':
+            return f'RESP:STATE={self.state}'
+        if value.startswith('AUX:') or value.startswith('MOSFET:'):
+            return self._output('AUX', 'aux', value.split(':', 1)[1])
+        if value.startswith('AUX2:') or value.startswith('MOSFET2:'):
+            return self._output('AUX2', 'aux2', value.split(':', 1)[1])
+        if value.startswith('BUZZER:'):
+            return self._buzzer(value[7:])
+        if value.startswith('GPIO:'):
+            return self._gpio(value[5:])
+        if value.startswith('POLICY:'):
+            return self._policy(value[7:])
+        return 'RESP:UNKNOWN'
+
+    def _output(self, label, attr, arg):
+        arg = arg.strip()
+        upper = arg.upper()
+        if upper in ('ON', 'OFF'):
+            setattr(self, attr, upper == 'ON')
+            return f"RESP:{label}={'ON' if getattr(self, attr) else 'OFF'}"
+        if upper.startswith('PULSE'):
+            _, sep, tail = arg.partition(':')
+            duration = _duration(tail, 200, 20, 5000) if sep else 200
+            return f'RESP:{label}=PULSE,{duration}'
+        if upper.startswith('PWM'):
+            _, sep, payload = arg.partition(':')
+            if not sep or not payload.strip():
+                return f'RESP:{label}=ERR,PWM'
+            freq_token, _, duty_token = payload.strip().partition(':')
+            freq = _to_int(freq_token) if _to_int(freq_token) > 0 else 1000
+            duty = _clamp(_to_int(duty_token), 0, 100) if duty_token.strip() else 50
+            return f'RESP:{label}=PWM,{freq},{duty}'
+        return f'RESP:{label}=ERR'
+
+    def _buzzer(self, arg):
+        arg = arg.strip()
+        upper = arg.upper()
+        if upper.startswith('ON'):
+            _, sep, tail = arg.partition(':')
+            freq = _frequency(tail) if sep else DEFAULT_BUZZER_FREQ
+            self.buzzer = True
+            return f'RESP:BUZZER=ON,{freq}'
+        if upper == 'OFF':
+            self.buzzer = False
+            return 'RESP:BUZZER=OFF'
+        if upper.startswith('PULSE'):
+            duration, freq = 180, DEFAULT_BUZZER_FREQ
+            _, sep, tail = arg.partition(':')
+            if sep:
+                duration_token, sep, freq_token = tail.strip().partition(':')
+                duration = _duration(duration_token, 180, 20, 4000)
+                if sep:
+                    freq = _frequency(freq_token)
+            return f'RESP:BUZZER=PULSE,{freq},{duration}'
+        return 'RESP:BUZZER=ERR'
+
+    def _gpio(self, arg):
+        pin_token, sep, remainder = arg.strip().partition(':')
+        if not sep:
+            return 'RESP:GPIO=ERR,FORMAT'
+        state_token, sep, duration_token = remainder.strip().partition(':')
+        state_token = state_token.strip().upper()
+        if state_token in ('1', 'HIGH', 'ON'):
+            level = 'HIGH'
+        elif state_token in ('0', 'LOW', 'OFF'):
+            level = 'LOW'
+        else:
+            return 'RESP:GPIO=ERR,STATE'
+        duration = _duration(duration_token, 0, 0, 10000) if sep else 0
+        pin = _to_int(pin_token)
+        if pin not in SAFE_GPIO_PINS:
+            return 'RESP:GPIO=ERR,PIN'
+        if duration > 0:
+            return f'RESP:GPIO={pin},{level},{duration}'
+        return f'RESP:GPIO={pin},{level}'
+
+    def _policy(self, payload):
+        enabled, close_mm, open_mm = self.policy
+        for token in payload.strip().split(';'):
+            key, eq, raw = token.strip().partition('=')
+            if not eq or not key.strip():
+                continue
+            key = key.strip().upper()
+            if key == 'DIST_EN':
+                enabled = _to_int(raw) != 0
+            elif key == 'DIST_CLOSE':
+                close_mm = _clamp(_to_int(raw), 30, 400)
+            elif key == 'DIST_OPEN':
+                open_mm = _clamp(_to_int(raw), 40, 500)
+        if open_mm <= close_mm:
+            open_mm = close_mm + 10
+        self.policy = (enabled, close_mm, open_mm)
+        return f'RESP:POLICY={1 if enabled else 0},{close_mm},{open_mm}'
+
+
+class SimulatedClient:
+    """BleakClient 대체 - 허브 루프에서 프레임 송신 태스크를 돌리고 쓰기에 RESP: 알림으로 응답"""
+
+    def __init__(self, fleet, address, timeout=15.0, disconnected_callback=None):
+        self.fleet = fleet
+        self.address = address
+        self.timeout = timeout
+        self.disconnected_callback = disconnected_callback
+        self.is_connected = False
+        self._strap = None
+        self._handler = None
+        self._stream = None
+        self._drop_timer = None
+
+    async def connect(self):
+        strap = self.fleet.straps.get(self.address)
+        await asyncio.sleep(self.fleet.connect_latency * (0.5 + strap.rng.random() if strap else 1.0))
+        if strap is None:
+            raise Exception(f"Device with address {self.address} was not found")
+        if strap.client is not None and strap.client is not self:
+            raise Exception("Device is already connected")
+        strap.client = self
+        self._strap = strap
+        self.is_connected = True
+        self.fleet._count('connects')
+        if self.fleet.mtbf_seconds:
+            delay = strap.rng.expovariate(1.0 / self.fleet.mtbf_seconds)
+            self._drop_timer = asyncio.get_running_loop().call_later(delay, self.drop)
+        return True
+
+    async def start_notify(self, uuid, handler):
+        self._ensure_connected()
+        self._handler = handler
+        if self._stream is None:
+            self._stream = asyncio.get_running_loop().create_task(self._run_stream())
+
+    async def stop_notify(self, uuid):
+        self._handler = None
+        self._stop_stream()
+
+    async def write_gatt_char(self, uuid, data, response=True):
+        self._ensure_connected()
+        await asyncio.sleep(self.fleet.write_latency)
+        self._ensure_connected()
+        reply = self._strap.handle_command(bytes(data).decode('utf-8', errors='replace'))
+        self.fleet._count('commands')
+        if reply is None:
+            await self._deliver(self._strap.next_frame(time.monotonic()))
+        elif self._handler is not None:
+            asyncio.get_running_loop().create_task(self._deliver(reply.encode('utf-8')))
+
+    async def disconnect(self):
+        self._close(notify=self.is_connected)
+        return True
+
+    def drop(self):
+        """링크 끊김 주입 (전원 차단/거리 이탈)"""
+        if self.is_connected:
+            self.fleet._count('injected_disconnects')
+            self._close(notify=True)
+
+    def _close(self, notify):
+        self.is_connected = False
+        self._stop_stream()
+        if self._drop_timer is not None:
+            self._drop_timer.cancel()
+            self._drop_timer = None
+        if self._strap is not None and self._strap.client is self:
+            self._strap.client = None
+            self._strap.link_lost()
+        if notify and self.disconnected_callback is not None:
+            self.disconnected_callback(self)
+
+    def _ensure_connected(self):
+        if not self.is_connected:
+            raise Exception("Not connected")
+
+    def _stop_stream(self):
+        if self._stream is not None:
+            self._stream.cancel()
+            self._stream = None
+
+    async def _deliver(self, payload):
+        handler = self._handler
+        if handler is None or not self.is_connected:
+            return
+        self.fleet._count('frames')
+        result = handler(None, bytearray(payload))
+        if inspect.isawaitable(result):
+            await result
+
+    async def _run_stream(self):
+        strap = self._strap
+        # 연결 직후 모든 기기가 같은 위상으로 보내지 않도록 시작 시점을 흩뜨림
+        await asyncio.sleep(strap.rng.random() * strap.interval_ms / 1000.0)
+        while self.is_connected:
+            await self._deliver(strap.next_frame(time.monotonic()))
+            await asyncio.sleep(strap.interval_ms / 1000.0)
+
+
+class SimulatedScanner:
+    """BleakScanner 대체 - 스캔 중에는 가상 스트랩 광고를 주기적으로 detection_callback 으로 전달"""
+
+    def __init__(self, fleet, detection_callback=None):
+        self.fleet = fleet
+        self.detection_callback = detection_callback
+        self._task = None
+
+    async def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._advertise())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _advertise(self):
+        while True:
+            for strap in list(self.fleet.straps.values()):
+                if strap.client is not None or self.detection_callback is None:
+                    continue
+                rssi = -45 - strap.rng.randint(0, 40)
+                self.detection_callback(SimpleNamespace(address=strap.address, name=strap.name),
+                                        SimpleNamespace(local_name=strap.name, rssi=rssi))
+            await asyncio.sleep(self.fleet.advertise_interval)
+
+
+class SimulatedFleet:
+    """가상 스트랩 N대 (transport.BleakTransport 와 같은 client()/scanner() 제공)"""
+
+    name = TRANSPORT_SIMULATED
+
+    def __init__(self, count=100, dwell_seconds=600.0, mtbf_seconds=0.0, connect_latency=0.5,
+                 write_latency=0.02, advertise_interval=1.0, seed=None):
+        self.connect_latency = connect_latency
+        self.write_latency = write_latency
+        self.advertise_interval = advertise_interval
+        self.mtbf_seconds = mtbf_seconds  # 기기별 평균 연결 유지 시간 (0 이면 끊김 주입 안 함)
+        self._lock = Lock()
+        self._counters = {'connects': 0, 'frames': 0, 'commands': 0, 'injected_disconnects': 0}
+        rng = random.Random(seed)
+        self.straps = {}
+        for index in range(int(count)):
+            address = f'5A:00:{(index >> 16) & 0xFF:02X}:{(index >> 8) & 0xFF:02X}:{index & 0xFF:02X}:00'
+            name = f'ESP32-STRAP-SIM{index + 1:04d}'
+            self.straps[address] = SimulatedStrap(address, name, random.Random(rng.random()), dwell_seconds)
+        logger.info(f"Simulated strap fleet ready ({len(self.straps)} devices)")
+
+    def client(self, address, timeout=15.0, disconnected_callback=None):
+        return SimulatedClient(self, address, timeout=timeout, disconnected_callback=disconnected_callback)
+
+    def scanner(self, detection_callback=None):
+        return SimulatedScanner(self, detection_callback=detection_callback)
+
+    def devices(self):
+        """(address, name) 목록 - 자동 등록용"""
+        return [(strap.address, strap.name) for strap in self.straps.values()]
+
+    def inject_disconnects(self, count=1, loop_for=None):
+        """연결된 가상 스트랩 중 count 대의 링크를 끊음 (loop_for(address) → 해당 클라이언트의 루프)"""
+        connected = [strap.client for strap in self.straps.values() if strap.client is not None]
+        victims = random.sample(connected, min(int(count), len(connected)))
+        for client in victims:
+            loop = loop_for(client.address) if loop_for else None
+            if loop is not None:
+                loop.call_soon_threadsafe(client.drop)
+            else:
+                client.drop()
+        return [client.address for client in victims]
+
+    def _count(self, key):
+        with self._lock:
+            self._counters[key] += 1
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._counters)
+        snapshot.update({
+            'transport': self.name,
+            'devices': len(self.straps),
+            'connected': sum(1 for strap in self.straps.values() if strap.client is not None),
+            'frames_per_second_nominal': round(sum(1000.0 / strap.interval_ms
+                                                   for strap in self.straps.values()
+                                                   if strap.client is not None), 1)
+        })
+        return snapshot
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# 백엔드 모듈은 평면 임포트(import db, import frames ...)를 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+import migrations  # noqa: E402
+
+
+@pytest.fixture
+def migrated_db(tmp_path):
+    """최신 스키마가 적용된 임시 DB 로 db 모듈 경로를 바꾸고 테스트 후 복원"""
+    previous = db.DB_PATH
+    db.configure(str(tmp_path / 'strap.db'))
+    conn = db.connect()
+    migrations.migrate(conn)
+    conn.close()
+    yield db.DB_PATH
+    db.configure(previous)
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import random
+import re
+
+import pytest
+
+import command_pipeline
+from command_pipeline import (CommandPipeline, ResponseLost, is_rejection, reply_key, response_key)
+from strap_simulator import SimulatedStrap
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+FIRMWARE_SOURCES = [os.path.join(REPO_ROOT, 'esp32_firmware.ino'),
+                    os.path.join(REPO_ROOT, 'esp32', 'esp32_firmware', 'esp32_firmware.ino')]
+
+# 시뮬레이터(펌웨어 onWrite 와 같은 규칙)로 보내 볼 대표 명령
+SAMPLE_COMMANDS = [
+    'FMT:BIN', 'FMT:TEXT', 'RATE:500', 'CAL', 'BEEP', 'STATE',
+    'AUX:ON', 'MOSFET:OFF', 'AUX2:PULSE:300', 'MOSFET2:ON', 'MOSFET2:PWM:1000:30',
+    'BUZZER:ON:2000', 'BUZZER:OFF', 'GPIO:4:HIGH', 'POLICY:DIST_EN=1;DIST_CLOSE=120;DIST_OPEN=160',
+]
+
+
+def firmware_verbs(path):
+    """onWrite 의 최상위 분기에서 처리하는 명령 접두사"""
+    source = open(path, encoding='utf-8').read()
+    start = source.index('onWrite')
+    body = source[start:source.index('RESP:UNKNOWN', start)]
+    exact = re.findall(r'\b[vU]\s*==\s*"([A-Z0-9:]+)"', body)
+    prefixes = re.findall(r'\b[vU]\.startsWith\("([A-Z0-9]+):"\)', body)
+    return {verb.split(':', 1)[0] for verb in exact} | set(prefixes), set(exact)
+
+
+@pytest.mark.parametrize('path', [p for p in FIRMWARE_SOURCES if os.path.exists(p)])
+def test_every_firmware_verb_has_a_response_key(path):
+    verbs, exact = firmware_verbs(path)
+    assert verbs, 'no commands found in onWrite'
+    for verb in verbs:
+        if verb in command_pipeline.NO_RESPONSE_COMMANDS:
+            continue
+        assert verb in command_pipeline.RESPONSE_KEYS, f'{verb} is missing from RESPONSE_KEYS'
+
+
+@pytest.mark.parametrize('command', SAMPLE_COMMANDS)
+def test_expected_key_matches_firmware_reply(command):
+    reply = SimulatedStrap('AA:BB:CC:DD:EE:FF', 'ESP32_STRAP', random.Random(1), 60.0).handle_command(command)
+    assert reply is not None
+    assert reply_key(reply) == response_key(command), reply
+
+
+def test_response_key_special_cases():
+    assert response_key('once') is None
+    assert response_key('mosfet2:on') == 'AUX2'
+    assert response_key('gpiof:4:high:100:low') == 'GPIO'
+    assert response_key('NOPE') == 'UNKNOWN'
+
+
+def test_reply_parsing():
+    assert reply_key('RESP:GPIO=4,HIGH') == 'GPIO'
+    assert reply_key('RESP:CAL-OK') == 'CAL'
+    assert reply_key('RESP:BEEP') == 'BEEP'
+    assert is_rejection('RESP:UNKNOWN')
+    assert is_rejection('RESP:AUX2=ERR,PWM')
+    assert not is_rejection('RESP:AUX2=ON')
+
+
+class FakeDevice:
+    """쓰기를 기록하고 테스트가 원하는 순서로 응답을 돌려주는 디바이스"""
+
+    def __init__(self):
+        self.pipeline = CommandPipeline(self.write, timeout=0.5, max_in_flight=4)
+        self.written = []
+
+    async def write(self, command):
+        self.written.append(command)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_replies_are_matched_in_order():
+    async def scenario():
+        device = FakeDevice()
+        first = asyncio.ensure_future(device.pipeline.request('RATE:200'))
+        second = asyncio.ensure_future(device.pipeline.request('MOSFET2:ON'))
+        await asyncio.sleep(0)
+        assert device.pipeline.handle_response('RESP:RATE=200')
+        assert device.pipeline.handle_response('RESP:AUX2=ON')
+        return await first, await second
+
+    first, second = run(scenario())
+    assert first['response'] == 'RESP:RATE=200' and first['accepted']
+    assert second['response'] == 'RESP:AUX2=ON' and second['accepted']
+
+
+def test_skipped_reply_fails_earlier_command_as_lost():
+    async def scenario():
+        device = FakeDevice()
+        first = asyncio.ensure_future(device.pipeline.request('BEEP'))
+        second = asyncio.ensure_future(device.pipeline.request('STATE'))
+        await asyncio.sleep(0)
+        device.pipeline.handle_response('RESP:STATE=OPEN')
+        with pytest.raises(ResponseLost):
+            await first
+        return await second, device.pipeline.stats()
+
+    second, stats = run(scenario())
+    assert second['response'] == 'RESP:STATE=OPEN'
+    assert stats['lost'] == 1 and stats['pending'] == 0
+
+
+def test_unknown_reply_goes_to_oldest_and_is_rejected():
+    async def scenario():
+        device = FakeDevice()
+        pending = asyncio.ensure_future(device.pipeline.request('NOPE'))
+        await asyncio.sleep(0)
+        device.pipeline.handle_response('RESP:UNKNOWN')
+        return await pending
+
+    assert run(scenario())['accepted'] is False
+
+
+def test_no_response_command_and_timeout():
+    async def scenario():
+        device = FakeDevice()
+        once = await device.pipeline.request('ONCE')
+        with pytest.raises(TimeoutError):
+            await device.pipeline.request('CAL', timeout=0.01)
+        return once, device.pipeline.stats(), device.pipeline.handle_response('RESP:CAL-OK')
+
+    once, stats, matched = run(scenario())
+    assert once['response'] is None and once['accepted']
+    assert stats['timeouts'] == 1 and stats['pending'] == 0
+    assert matched is False
+
+
+def test_fail_all_rejects_pending():
+    async def scenario():
+        device = FakeDevice()
+        pending = asyncio.ensure_future(device.pipeline.request('STATE'))
+        await asyncio.sleep(0)
+        device.pipeline.fail_all(ConnectionError('gone'))
+        with pytest.raises(ConnectionError):
+            await pending
+
+    run(scenario())
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from connection_supervisor import Backoff, ConnectGate
+
+
+def test_backoff_grows_with_equal_jitter_and_resets():
+    backoff = Backoff(base=2.0, maximum=10.0)
+    for cap in (2.0, 4.0, 8.0, 10.0, 10.0):
+        delay = backoff.next()
+        assert cap / 2 <= delay <= cap
+    backoff.reset()
+    assert backoff.next() <= 2.0
+
+
+def test_gate_limits_concurrency_in_fifo_order():
+    async def scenario():
+        gate = ConnectGate(max_concurrent=2, spacing=0)
+        order = []
+        release = asyncio.Event()
+
+        async def connect(name):
+            async with gate.slot():
+                order.append(name)
+                await release.wait()
+
+        tasks = [asyncio.ensure_future(connect(name)) for name in 'abcd']
+        await asyncio.sleep(0.01)
+        assert order == ['a', 'b']
+        assert gate.stats()['waiting'] == 2
+        release.set()
+        await asyncio.gather(*tasks)
+        return order, gate.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ['a', 'b', 'c', 'd']
+    assert stats['in_flight'] == 0 and stats['waiting'] == 0 and stats['connects'] == 4
+
+
+def test_gate_spaces_connect_starts():
+    async def scenario():
+        gate = ConnectGate(max_concurrent=4, spacing=0.05)
+        loop = asyncio.get_running_loop()
+        started = []
+
+        async def connect():
+            async with gate.slot():
+                started.append(loop.time())
+
+        await asyncio.gather(*(connect() for _ in range(3)))
+        return started
+
+    started = asyncio.run(scenario())
+    assert started[2] - started[0] >= 0.09
+
+
+async def _holder_and_queued(gate):
+    await gate.acquire()
+    queued = asyncio.ensure_future(gate.acquire())
+    await asyncio.sleep(0)
+    assert gate.stats()['waiting'] == 1
+    return queued
+
+
+@pytest.mark.parametrize('deliver_first', [False, True])
+def test_cancel_during_hand_over_returns_slot_once(deliver_first):
+    async def scenario():
+        gate = ConnectGate(max_concurrent=1, spacing=0)
+        queued = await _holder_and_queued(gate)
+        # 보유자가 반환 → 대기자가 꺼내짐 (_hand_over 는 아직 대기자 루프에 예약된 상태)
+        gate.release()
+        if deliver_first:
+            # _hand_over 가 결과를 설정한 뒤, 대기 태스크가 깨어나기 전에 취소
+            await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await asyncio.sleep(0)
+        assert gate.stats()['in_flight'] == 0
+        # 슬롯이 정확히 하나 남아 있어야 함
+        await asyncio.wait_for(gate.acquire(), timeout=0.5)
+        return gate.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['in_flight'] == 1 and stats['waiting'] == 0
+
+
+def test_cancel_while_queued_removes_waiter():
+    async def scenario():
+        gate = ConnectGate(max_concurrent=1, spacing=0)
+        queued = await _holder_and_queued(gate)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        gate.release()
+        return gate.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['in_flight'] == 0 and stats['waiting'] == 0
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from db_writer import DbWriter
+
+INSERT = 'INSERT INTO t (v) VALUES (?)'
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'writer.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER UNIQUE)')
+    conn.close()
+    return path
+
+
+def make_writer(path, **options):
+    return DbWriter(lambda: sqlite3.connect(path, check_same_thread=False), **options)
+
+
+def rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute('SELECT v FROM t ORDER BY v')]
+    finally:
+        conn.close()
+
+
+def test_batches_are_written_on_flush(db_path):
+    writer = make_writer(db_path, flush_interval_ms=1000, max_batch_rows=100)
+    for value in range(10):
+        assert writer.submit(INSERT, (value,))
+    assert writer.flush(timeout=5)
+    assert rows(db_path) == list(range(10))
+    stats = writer.stats()
+    assert stats['written'] == 10
+    assert stats['dropped'] == 0
+
+
+def test_full_queue_drops_only_droppable_writes(db_path, monkeypatch):
+    writer = make_writer(db_path, max_queue=3)
+    # 작성 스레드를 멈춘 채로 큐를 채움
+    monkeypatch.setattr(writer, 'start', lambda: None)
+    for value in range(3):
+        assert writer.submit(INSERT, (value,))
+
+    assert writer.submit(INSERT, (100,)) is False
+    for value in range(3, 8):
+        assert writer.submit(INSERT, (value,), critical=True)
+    assert writer.stats()['dropped'] == 1
+
+    monkeypatch.undo()
+    assert writer.flush(timeout=5)
+    assert rows(db_path) == list(range(8))
+
+
+def test_failed_batch_falls_back_to_row_by_row(db_path):
+    writer = make_writer(db_path, flush_interval_ms=1000)
+    writer.submit(INSERT, (1,))
+    writer.submit(INSERT, (1,))  # UNIQUE 위반 - 배치 전체가 실패
+    writer.submit(INSERT, (2,))
+    assert writer.flush(timeout=5)
+    assert rows(db_path) == [1, 2]
+    stats = writer.stats()
+    assert stats['written'] == 2
+    assert stats['errors'] == 1
+
+
+def test_grouped_execution_keeps_statement_order(db_path):
+    conn = sqlite3.connect(db_path)
+    batch = [(INSERT, (1,)), (INSERT, (2,)), ('UPDATE t SET v = v + 10 WHERE v = ?', (2,)), (INSERT, (2,))]
+    with conn:
+        assert DbWriter._execute_grouped(conn, batch) == 4
+    conn.close()
+    assert rows(db_path) == [1, 2, 12]
+
+
+# app 임포트 후 쓰기를 큐에 넣고 바로 정상 종료하는 스크립트 (atexit 훅이 큐를 비워야 함)
+EXIT_SCRIPT = '''
+import app
+for index in range(100):
+    app.db_writer.submit("INSERT INTO event_logs (device_id, event_type) VALUES (?, ?)",
+                         (f"strap-{index}", "wear_on"), critical=True)
+'''
+
+
+def test_queued_writes_are_flushed_at_exit(tmp_path):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = str(tmp_path / 'exit.db')
+    env = dict(os.environ, STRAP_MONITOR_DB=path, BLE_TRANSPORT='sim', SIM_DEVICES='0',
+               LOG_LEVEL='WARNING', LINK_QUALITY_EMIT_SECONDS='0', WEAR_AGGREGATE_INTERVAL_SECONDS='0')
+    subprocess.run([sys.executable, '-c', EXIT_SCRIPT], cwd=backend, env=env, check=True, timeout=60,
+                   capture_output=True)
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM event_logs WHERE event_type = 'wear_on'").fetchone()[0] == 100
+    finally:
+        conn.close()
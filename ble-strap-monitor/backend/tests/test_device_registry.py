@@ -0,0 +1,77 @@
+from threading import Thread
+
+import pytest
+
+from device_registry import DeviceRecord, DeviceRegistry
+
+
+class FakeManager:
+    def __init__(self, connected=True, last_data=None):
+        self.connected = connected
+        self.last_data = last_data
+
+
+def test_add_get_and_duplicate():
+    registry = DeviceRegistry()
+    record = DeviceRecord('strap-1', 'AA:01', 'ESP32_1', FakeManager(last_data={'state': 'CLOSED'}))
+    assert registry.add(record)
+    assert not registry.add(DeviceRecord('strap-1', 'AA:02', 'other'))
+    assert registry.get('strap-1') is record
+    assert 'strap-1' in registry and len(registry) == 1
+    assert registry.addresses() == {'AA:01'}
+    assert record.connected and record.last_data == {'state': 'CLOSED'}
+
+
+def test_record_without_manager():
+    record = DeviceRecord('strap-1', 'AA:01', 'ESP32_1')
+    registry = DeviceRegistry()
+    registry.add(record)
+    assert not record.connected and record.last_data is None
+    assert registry.managers() == {}
+
+
+def test_snapshot_is_read_only_and_unaffected_by_later_writes():
+    registry = DeviceRegistry()
+    registry.add(DeviceRecord('strap-1', 'AA:01', 'ESP32_1'))
+    snapshot = registry.snapshot()
+    registry.add(DeviceRecord('strap-2', 'AA:02', 'ESP32_2'))
+    registry.remove('strap-1')
+    assert list(snapshot) == ['strap-1']
+    assert list(registry.snapshot()) == ['strap-2']
+    with pytest.raises(TypeError):
+        snapshot['strap-3'] = None
+
+
+def test_remove_only_matching_record():
+    registry = DeviceRegistry()
+    old = DeviceRecord('strap-1', 'AA:01', 'ESP32_1')
+    new = DeviceRecord('strap-1', 'AA:01', 'ESP32_1')
+    registry.add(new)
+    assert registry.remove('strap-1', record=old) is None
+    assert registry.get('strap-1') is new
+    assert registry.remove('strap-1', record=new) is new
+    assert registry.remove('strap-1') is None
+
+
+def test_clear_returns_previous_records():
+    registry = DeviceRegistry()
+    records = [DeviceRecord(f'strap-{i}', f'AA:{i:02d}', f'ESP32_{i}') for i in range(3)]
+    for record in records:
+        registry.add(record)
+    assert registry.clear() == records
+    assert len(registry) == 0
+
+
+def test_concurrent_adds_are_not_lost():
+    registry = DeviceRegistry()
+
+    def add_many(offset):
+        for i in range(200):
+            registry.add(DeviceRecord(f'strap-{offset + i}', f'addr-{offset + i}', 'ESP32'))
+
+    threads = [Thread(target=add_many, args=(offset,)) for offset in range(0, 800, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(registry) == 800
@@ -0,0 +1,39 @@
+import db
+from employee_index import EmployeeIndex
+
+
+def add_employees(rows):
+    conn = db.get_connection()
+    conn.executemany('INSERT INTO employees (name, employee_number, department, device_id) VALUES (?, ?, ?, ?)',
+                     rows)
+    conn.commit()
+    conn.close()
+
+
+def test_load_maps_devices_to_employees(migrated_db):
+    add_employees([('김', 'E1', '생산', 'DEV1'), ('이', 'E2', '품질', None), ('박', 'E3', '물류', '')])
+    index = EmployeeIndex()
+    assert index.load() == 1
+    employee = index.get('DEV1')
+    assert (employee.name, employee.employee_number, employee.department) == ('김', 'E1', '생산')
+    assert index.get('DEV2') is None
+    assert len(index) == 1
+
+
+def test_first_registered_employee_wins_shared_device(migrated_db):
+    add_employees([('김', 'E1', '생산', 'DEV1'), ('이', 'E2', '품질', 'DEV1')])
+    index = EmployeeIndex()
+    index.load()
+    assert index.get('DEV1').employee_number == 'E1'
+
+
+def test_invalidate_reloads_and_snapshot_is_a_copy(migrated_db):
+    index = EmployeeIndex()
+    index.load()
+    snapshot = index.snapshot()
+    add_employees([('김', 'E1', '생산', 'DEV1')])
+    index.invalidate()
+    assert 'DEV1' in index.snapshot()
+    assert snapshot == {}
+    index.clear()
+    assert index.get('DEV1') is None
@@ -0,0 +1,50 @@
+import pytest
+
+import frames
+from frames import BIN_FRAME, pack_binary_frame, parse_frame
+
+
+def test_text_frame():
+    assert parse_frame(bytearray(b'DIST:123;RAW:2010;AVG:2000;DIFF:12;STATE:CLOSED')) == ('text', {
+        'dist': '123', 'raw': 2010, 'avg': 2000, 'diff': 12, 'state': 'CLOSED', 'seq': None})
+
+
+def test_text_frame_with_sensor_error():
+    _, fields = parse_frame(b'DIST:ERR;RAW:1;AVG:2;DIFF:3;STATE:OPEN')
+    assert fields['dist'] == 'ERR'
+    assert fields['state'] == 'OPEN'
+
+
+@pytest.mark.parametrize('payload', [
+    b'RESP:RATE=120',
+    b'DIST:12;RAW:1;AVG:2;DIFF:3;STATE:SHUT',
+    b'\xff\xfe',
+    b'',
+])
+def test_non_sensor_payloads(payload):
+    assert parse_frame(payload) is None
+
+
+def test_binary_round_trip():
+    data = pack_binary_frame('CLOSED', 70000, 321, 2010, 2000, 12)
+    assert len(data) == BIN_FRAME.size
+    assert parse_frame(data) == ('binary', {
+        'dist': '321', 'raw': 2010, 'avg': 2000, 'diff': 12, 'state': 'CLOSED', 'seq': 70000 & 0xFFFF})
+
+
+def test_binary_sensor_error_and_diff_clamp():
+    _, fields = parse_frame(pack_binary_frame('OPEN', 1, 'ERR', 0, 0, 100000))
+    assert fields['dist'] == 'ERR'
+    assert fields['diff'] == 0xFFFF
+    assert fields['state'] == 'OPEN'
+
+
+def test_binary_frame_with_bad_state_is_rejected():
+    data = bytearray(pack_binary_frame('OPEN', 1, 100, 0, 0, 0))
+    data[1] = 2
+    assert parse_frame(bytes(data)) is None
+
+
+def test_twelve_byte_text_is_not_mistaken_for_binary():
+    assert frames.BIN_FRAME_MAGIC != ord('D')
+    assert parse_frame(b'RESP:FMT=BIN') is None
@@ -0,0 +1,108 @@
+import pytest
+
+from link_quality import LinkQualityTracker
+
+
+def tracker(interval_ms=100, **options):
+    return LinkQualityTracker(lambda device_id: interval_ms, **options)
+
+
+def feed(quality, times, device_id='strap-1'):
+    for now in times:
+        quality.record(device_id, now=now)
+
+
+def test_untracked_device_is_ignored():
+    quality = tracker()
+    quality.record('strap-1', now=1.0)
+    assert quality.snapshot('strap-1') is None
+
+
+def test_steady_stream_has_no_loss():
+    quality = tracker(window=16)
+    quality.reset('strap-1')
+    feed(quality, [i * 0.1 for i in range(10)])
+    snapshot = quality.snapshot('strap-1', now=0.95)
+    assert snapshot['missed_recent'] == 0 and snapshot['loss_ratio'] == 0
+    assert snapshot['jitter_ms'] == pytest.approx(0, abs=0.01)
+    assert snapshot['expected_fps'] == 10 and snapshot['recent_fps'] == pytest.approx(9.47, abs=0.01)
+    assert snapshot['since_last_frame_ms'] == 50
+    assert not snapshot['degraded']
+
+
+def test_gap_counts_missed_periods():
+    quality = tracker(window=16)
+    quality.reset('strap-1')
+    # 0.2 → 0.5 사이 두 주기 누락
+    feed(quality, [0.0, 0.1, 0.2, 0.5, 0.6])
+    snapshot = quality.snapshot('strap-1', now=0.6)
+    assert snapshot['missed_recent'] == 2 and snapshot['missed_total'] == 2
+    assert snapshot['loss_ratio'] == pytest.approx(2 / 7, abs=1e-4)
+    assert snapshot['frames'] == 5
+
+
+def test_jitter_ignores_whole_missed_periods():
+    quality = tracker()
+    quality.reset('strap-1')
+    feed(quality, [0.0, 0.13])
+    # 30 ms 편차 → RFC 3550 평활 (1/16)
+    assert quality.snapshot('strap-1', now=0.13)['jitter_ms'] == pytest.approx(30 / 16, abs=0.01)
+    quality.reset('strap-1')
+    feed(quality, [0.0, 0.3])
+    assert quality.snapshot('strap-1', now=0.3)['jitter_ms'] == 0
+
+
+def test_window_drops_old_misses_but_total_keeps_them():
+    quality = tracker(window=4)
+    quality.reset('strap-1')
+    feed(quality, [0.0, 0.5] + [0.5 + i * 0.1 for i in range(1, 5)])
+    snapshot = quality.snapshot('strap-1', now=0.9)
+    assert snapshot['missed_recent'] == 0 and snapshot['missed_total'] == 4
+
+
+def test_restart_does_not_count_disconnect_as_loss():
+    quality = tracker()
+    quality.reset('strap-1', address='AA:01')
+    feed(quality, [0.0, 0.1])
+    quality.reset('strap-1', address='AA:01')
+    feed(quality, [30.0, 30.1])
+    snapshot = quality.snapshot('strap-1', now=30.1)
+    assert snapshot['missed_total'] == 0 and snapshot['frames'] == 4
+
+
+def test_degraded_by_staleness_and_loss():
+    quality = tracker(window=8, min_stale_seconds=1.0)
+    quality.reset('strap-1')
+    feed(quality, [i * 0.1 for i in range(8)])
+    assert not quality.snapshot('strap-1', now=0.8)['degraded']
+    assert quality.snapshot('strap-1', now=2.0)['degraded']
+
+    quality.reset('strap-2')
+    feed(quality, [i * 0.3 for i in range(8)], device_id='strap-2')
+    assert quality.snapshot('strap-2', now=2.1)['degraded']
+
+    # 표본이 window/4 미만이면 손실률/지터로 판단하지 않음
+    quality.reset('strap-4')
+    feed(quality, [0.0], device_id='strap-4')
+    assert not quality.snapshot('strap-4', now=0.1)['degraded']
+
+
+def test_broadcast_reports_new_and_recovered_links():
+    quality = tracker(window=8, min_stale_seconds=0.0)
+    quality.reset('strap-1')
+    quality.record('strap-1')
+    payload = quality.broadcast_payload()
+    assert payload['degraded'] == [] and 'strap-1' in payload['devices']
+    quality.forget('strap-1')
+    assert quality.broadcast_payload() == {'devices': {}, 'degraded': []}
+
+
+def test_rssi_is_kept_from_latest_advertisement():
+    seen = {'AA:01': (-60, 100.0)}
+    quality = LinkQualityTracker(lambda device_id: 100, rssi_of=seen.get)
+    quality.reset('strap-1', address='AA:01')
+    assert quality.snapshot('strap-1')['rssi'] == -60
+    seen['AA:01'] = (-80, 50.0)
+    assert quality.snapshot('strap-1')['rssi'] == -60
+    del seen['AA:01']
+    assert quality.snapshot('strap-1')['rssi'] == -60
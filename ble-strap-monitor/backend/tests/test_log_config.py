@@ -0,0 +1,37 @@
+import logging
+
+import pytest
+
+import log_config
+from log_config import CategoryLogger
+
+
+@pytest.fixture
+def rx_logger():
+    logger = logging.getLogger('ble.rx')
+    previous = logger.level
+    yield logger
+    logger.setLevel(previous)
+
+
+def test_should_log_respects_level(rx_logger):
+    category = CategoryLogger('ble.rx')
+    rx_logger.setLevel(logging.WARNING)
+    assert not category.should_log(logging.INFO)
+    rx_logger.setLevel(logging.INFO)
+    assert category.should_log(logging.INFO)
+
+
+def test_should_log_samples_one_in_n(rx_logger):
+    rx_logger.setLevel(logging.INFO)
+    category = CategoryLogger('ble.rx', sample_every=4)
+    assert [category.should_log(logging.INFO) for _ in range(8)] == [True, False, False, False] * 2
+
+
+def test_configure_rejects_unknown_category_and_bad_values():
+    with pytest.raises(ValueError):
+        log_config.configure(levels={'nope': 'INFO'})
+    with pytest.raises(ValueError):
+        log_config.configure(levels={'ble.rx': 'LOUD'})
+    with pytest.raises(ValueError):
+        log_config.configure(sampling={'ble.rx': 0})
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+
+from openpyxl import load_workbook
+
+import db
+import log_export
+
+WHERE = (['el.timestamp >= ?', 'el.timestamp < ?'], ['2026-01-01 00:00:00', '2026-01-02 00:00:00'])
+
+
+def to_kst(value):
+    return f'KST {value}'
+
+
+def seed(rows=2500):
+    conn = db.get_connection()
+    conn.execute("INSERT INTO employees (name, employee_number, device_id) VALUES ('김', 'E1', 'DEV1')")
+    conn.executemany('''INSERT INTO event_logs (timestamp, device_id, employee_id, event_type, event_data, severity)
+                        VALUES (?, 'DEV1', 1, 'wear_off', ?, 'warning')''',
+                     [(f'2026-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}', json.dumps({'distance': str(i)}))
+                      for i in range(rows)])
+    conn.execute('''INSERT INTO event_logs (timestamp, device_id, event_type, severity)
+                    VALUES ('2026-01-02 00:00:00', 'DEV1', 'wear_on', 'info')''')
+    conn.commit()
+    conn.close()
+
+
+def body(fmt):
+    return b''.join(log_export.stream_export(fmt, *WHERE, to_kst))
+
+
+def test_csv_streams_in_chunks_with_bom(migrated_db):
+    seed()
+    chunks = list(log_export.stream_export('csv', *WHERE, to_kst))
+    assert len(chunks) > 2  # 헤더 + 1000 행 단위 청크
+    text = b''.join(chunks).decode('utf-8-sig')
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == list(log_export.HEADERS)
+    assert len(rows) == 2501
+    assert rows[1][:4] == ['KST 2026-01-01 00:00:00', 'DEV1', '김', 'E1']
+    assert json.loads(rows[1][6]) == {'distance': '0'}
+
+
+def test_ndjson_rows(migrated_db):
+    seed(10)
+    lines = body('ndjson').decode().splitlines()
+    assert len(lines) == 10
+    first = json.loads(lines[0])
+    assert first['event_data'] == {'distance': '0'}
+    assert first['timestamp_kst'] == 'KST 2026-01-01 00:00:00'
+
+
+def test_xlsx_is_a_valid_workbook(migrated_db):
+    seed(10)
+    sheet = load_workbook(io.BytesIO(body('xlsx')), read_only=True)['EventLogs']
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == log_export.HEADERS
+    assert len(rows) == 11
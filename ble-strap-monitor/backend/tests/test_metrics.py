@@ -0,0 +1,91 @@
+from threading import Thread
+
+import metrics
+from metrics import Registry
+
+
+def run_in_thread(target):
+    thread = Thread(target=target)
+    thread.start()
+    thread.join()
+
+
+def test_counter_and_gauge_rendering():
+    registry = Registry()
+    commands = registry.counter('strap_commands_total', 'Commands sent', labels=('verb',))
+    registry.gauge('strap_connected', 'Connected straps', lambda: 3)
+    registry.gauge('strap_queue', 'Queue depth', lambda: {('a"b',): 1.5, ('c',): None}, labels=('name',))
+    commands.inc('RATE')
+    commands.inc('RATE', amount=2)
+    commands.inc('BEEP')
+
+    assert registry.render().splitlines() == [
+        '# HELP strap_commands_total Commands sent',
+        '# TYPE strap_commands_total counter',
+        'strap_commands_total{verb="BEEP"} 1',
+        'strap_commands_total{verb="RATE"} 3',
+        '# HELP strap_connected Connected straps',
+        '# TYPE strap_connected gauge',
+        'strap_connected 3',
+        '# HELP strap_queue Queue depth',
+        '# TYPE strap_queue gauge',
+        'strap_queue{name="a\\"b"} 1.5',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram('strap_latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'strap_latency_seconds_bucket{le="0.1"} 2',
+        'strap_latency_seconds_bucket{le="1"} 3',
+        'strap_latency_seconds_bucket{le="+Inf"} 4',
+        'strap_latency_seconds_sum 3.65',
+        'strap_latency_seconds_count 4',
+    ]
+
+
+def test_duplicate_metric_rejected():
+    registry = Registry()
+    registry.counter('strap_total', 'x')
+    try:
+        registry.counter('strap_total', 'y')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('duplicate metric accepted')
+
+
+def test_shards_from_threads_are_merged():
+    registry = Registry()
+    counter = registry.counter('strap_total', 'x')
+    histogram = registry.histogram('strap_seconds', 'x', buckets=(1.0,))
+    counter.inc()
+
+    def record():
+        counter.inc(amount=2)
+        histogram.observe(0.5)
+
+    for _ in range(3):
+        run_in_thread(record)
+    _, by_name = registry.collect()
+    assert by_name['strap_total'][()] == 7
+    assert by_name['strap_seconds'][()] == [3, 0, 1.5]
+    # 종료된 스레드 샤드는 합계로 옮겨져도 값이 유지됨
+    assert len(registry._shards) == 1
+    assert registry.collect()[1]['strap_total'][()] == 7
+
+
+def test_dead_shards_are_retired_without_collect(monkeypatch):
+    monkeypatch.setattr(metrics, 'SHARD_SWEEP_THRESHOLD', 8)
+    registry = Registry()
+    counter = registry.counter('strap_total', 'x')
+    for _ in range(100):
+        run_in_thread(counter.inc)
+    # 수집 없이도 샤드 수는 임계값 근처로 유지
+    assert len(registry._shards) <= 9
+    assert registry.collect()[1]['strap_total'][()] == 100
@@ -0,0 +1,63 @@
+import sqlite3
+
+import migrations
+
+LAST_UNWEAR = '''SELECT timestamp FROM event_logs
+                 WHERE device_id = ? AND event_type = 'wear_off'
+                 ORDER BY timestamp DESC LIMIT 1'''
+
+
+def indexes(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_migrate_applies_every_version_once():
+    conn = sqlite3.connect(':memory:')
+    assert migrations.migrate(conn) == [m.version for m in migrations.MIGRATIONS]
+    assert migrations.migrate(conn) == []
+    assert migrations.current_version(conn) == migrations.LATEST_VERSION
+
+
+def test_versions_are_unique_and_ordered():
+    versions = [m.version for m in migrations.MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+
+def test_target_stops_early_and_resumes():
+    conn = sqlite3.connect(':memory:')
+    assert migrations.migrate(conn, target=3) == [1, 2, 3]
+    assert 'idx_event_logs_device_type_timestamp' in indexes(conn)
+    migrations.migrate(conn)
+    assert migrations.current_version(conn) == migrations.LATEST_VERSION
+
+
+def test_redundant_event_indexes_are_dropped():
+    conn = sqlite3.connect(':memory:')
+    migrations.migrate(conn)
+    names = indexes(conn)
+    assert 'idx_event_logs_device_type_timestamp' not in names
+    assert 'idx_sensor_data_device_timestamp' not in names
+    assert 'idx_event_logs_device_timestamp' in names
+
+
+def test_last_unwear_lookup_uses_device_timestamp_index():
+    conn = sqlite3.connect(':memory:')
+    migrations.migrate(conn)
+    plan = ' '.join(row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {LAST_UNWEAR}', ('DEV1',)))
+    assert 'idx_event_logs_device_timestamp' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_failed_migration_rolls_back(monkeypatch):
+    conn = sqlite3.connect(':memory:')
+    broken = migrations.MIGRATIONS + (migrations.Migration(99, 'broken', (
+        'CREATE TABLE half_done (id INTEGER)', 'NOT SQL')),)
+    monkeypatch.setattr(migrations, 'MIGRATIONS', broken)
+    try:
+        migrations.migrate(conn, target=99)
+    except sqlite3.Error:
+        pass
+    else:
+        raise AssertionError('migration should fail')
+    assert 99 not in migrations.applied_versions(conn)
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'half_done'").fetchall()
@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+import pagination
+from pagination import KeysetPage, decode_cursor, encode_cursor, parse_fields
+
+COLUMNS = {'id': 'l.id', 'ts': 'l.ts', 'who': 'p.name'}
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT)')
+    conn.execute('CREATE TABLE logs (id INTEGER PRIMARY KEY, ts TEXT, person_id INTEGER)')
+    conn.execute("INSERT INTO people VALUES (1, 'kim')")
+    # 같은 시각이 여러 행에 걸쳐 있어야 (ts, id) 정렬이 검증됨
+    conn.executemany('INSERT INTO logs VALUES (?, ?, 1)', [(i, f'2026-01-01 00:00:{i // 3:02d}') for i in range(1, 11)])
+    return conn
+
+
+def page(**options):
+    return KeysetPage('logs l', COLUMNS, 'l.ts', 'l.id',
+                      joins={'who': 'LEFT JOIN people p ON p.id = l.person_id'}, **options)
+
+
+def walk(conn, direction, limit, query=None):
+    query = query or page()
+    seen, cursor = [], None
+    while True:
+        items, token = query.fetch(conn, ['id'], limit, direction=direction, cursor=cursor)
+        seen.extend(item['id'] for item in items)
+        if token is None:
+            return seen
+        _, ts, row_id = decode_cursor(token)
+        cursor = (ts, row_id)
+
+
+def test_cursor_round_trip():
+    token = encode_cursor('desc', '2026-01-01 00:00:00', 42)
+    assert '=' not in token
+    assert decode_cursor(token) == ('desc', '2026-01-01 00:00:00', 42)
+
+
+@pytest.mark.parametrize('token', ['', 'not-base64!', encode_cursor('sideways', 't', 1)])
+def test_invalid_cursor(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_parse_fields():
+    assert parse_fields(None, COLUMNS) == ['id', 'ts', 'who']
+    assert parse_fields(' ts , id ,', COLUMNS) == ['ts', 'id']
+    with pytest.raises(ValueError):
+        parse_fields('id,password', COLUMNS)
+
+
+@pytest.mark.parametrize('limit', [1, 3, 4, 10, 50])
+def test_pages_cover_every_row_once_across_equal_timestamps(conn, limit):
+    assert walk(conn, 'desc', limit) == list(range(10, 0, -1))
+    assert walk(conn, 'asc', limit) == list(range(1, 11))
+
+
+def test_last_page_has_no_cursor(conn):
+    items, token = page().fetch(conn, ['id'], 10)
+    assert len(items) == 10
+    assert token is None
+
+
+def test_filters_and_joins_only_for_requested_fields(conn):
+    query = page().filter('l.id > ?', 7)
+    items, _ = query.fetch(conn, ['id', 'who'], 10, direction='asc')
+    assert items == [{'id': 8, 'who': 'kim'}, {'id': 9, 'who': 'kim'}, {'id': 10, 'who': 'kim'}]
+    assert walk(conn, 'desc', 2, query) == [10, 9, 8]
+
+
+def test_limit_is_clamped(conn, monkeypatch):
+    monkeypatch.setattr(pagination, 'MAX_PAGE_SIZE', 4)
+    items, token = page().fetch(conn, ['id'], 1000)
+    assert len(items) == 4 and token is not None
+    items, _ = page().fetch(conn, ['id'], 0)
+    assert len(items) == 1
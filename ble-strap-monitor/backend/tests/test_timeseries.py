@@ -0,0 +1,57 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import db
+from db_writer import DbWriter
+from timeseries import TimeSeriesStore
+
+# app 임포트 후 진행 중 버킷만 남긴 채 정상 종료하는 스크립트 (atexit 훅이 영속화해야 함)
+EXIT_SCRIPT = '''
+import time
+import app
+now = time.time()
+for offset in (0.0, 0.1, 0.2):
+    app.timeseries.record("strap-1", 120, 5, "CLOSED", ts=now + offset)
+'''
+
+
+def test_open_buckets_are_persisted_at_exit(tmp_path):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = str(tmp_path / 'exit.db')
+    env = dict(os.environ, STRAP_MONITOR_DB=path, BLE_TRANSPORT='sim', SIM_DEVICES='0',
+               LOG_LEVEL='WARNING', LINK_QUALITY_EMIT_SECONDS='0', WEAR_AGGREGATE_INTERVAL_SECONDS='0')
+    subprocess.run([sys.executable, '-c', EXIT_SCRIPT], cwd=backend, env=env, check=True, timeout=60,
+                   capture_output=True)
+    conn = sqlite3.connect(path)
+    try:
+        rows = dict(conn.execute('''SELECT tier, SUM(samples) FROM sensor_rollups
+                                    WHERE device_id = 'strap-1' GROUP BY tier''').fetchall())
+    finally:
+        conn.close()
+    assert rows == {'1s': 3, '1m': 3, '1h': 3}
+
+
+def test_live_bucket_is_merged_with_partially_persisted_row(migrated_db):
+    writer = DbWriter(db.connect)
+    store = TimeSeriesStore(writer, maintenance_interval=3600)
+    minute = int(time.time()) // 60 * 60
+    for offset, distance in ((1, 100), (2, 140)):
+        store.record('strap-1', distance, 4, 'CLOSED', ts=minute + offset)
+    # 분 중간에 일부 영속화 (등록 해제, 끊김 후 flush 등)
+    store.flush_all()
+    for offset, distance in ((3, 120), (4, 180)):
+        store.record('strap-1', distance, 8, 'OPEN', ts=minute + offset)
+    # 진행 중인 1s 버킷을 닫아 1m 버킷에 병합
+    store.record('strap-1', 150, 8, 'OPEN', ts=minute + 5)
+    assert writer.flush(timeout=5)
+
+    points = store.query('strap-1', minute, minute + 59, tier='1m')['points']
+    assert len(points) == 1
+    point = points[0]
+    assert point['samples'] == 4
+    assert (point['distance_min'], point['distance_max'], point['distance_avg']) == (100, 180, 135)
+    assert (point['diff_min'], point['diff_max'], point['diff_avg']) == (4, 8, 6)
+    assert point['state'] == 'OPEN'
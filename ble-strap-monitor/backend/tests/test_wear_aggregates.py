@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import pytest
+
+import db
+from wear_aggregates import DailyWearAggregator, _split_by_day
+
+
+def test_split_by_day_across_midnight():
+    parts = _split_by_day(datetime(2026, 3, 1, 23, 0), datetime(2026, 3, 3, 1, 30))
+    assert parts == [('2026-03-01', 3600.0), ('2026-03-02', 86400.0), ('2026-03-03', 5400.0)]
+    assert _split_by_day(datetime(2026, 3, 1, 9), datetime(2026, 3, 1, 9)) == []
+
+
+@pytest.fixture
+def sessions(migrated_db):
+    conn = db.connect()
+    conn.executemany('INSERT INTO employees (id, name, employee_number, department) VALUES (?, ?, ?, ?)',
+                     [(1, 'kim', 'E1', 'A'), (2, 'lee', 'E2', 'B')])
+
+    def add(employee_id, start, end, active=0):
+        conn.execute('''INSERT INTO wear_sessions (employee_id, device_id, start_time, end_time, is_active)
+                        VALUES (?, 'strap', ?, ?, ?)''', (employee_id, start, end, active))
+        conn.commit()
+
+    yield add
+    conn.close()
+
+
+def daily(aggregator, employee_id=None):
+    return {(row['day'], row['employee_id']): row
+            for row in aggregator.daily_rows('2026-01-01', '2026-12-31', employee_id=employee_id)}
+
+
+def test_worn_time_and_same_day_gaps(sessions):
+    sessions(1, '2026-03-01 09:00:00', '2026-03-01 10:00:00')
+    sessions(1, '2026-03-01 10:30:00', '2026-03-01 12:00:00')
+    sessions(1, '2026-03-01 13:00:00', '2026-03-01 13:10:00')
+    # 전날 종료 이후의 간격은 미착용으로 세지 않음
+    sessions(1, '2026-03-02 08:00:00', '2026-03-02 09:00:00')
+    sessions(1, '2026-03-02 10:00:00', None, active=1)
+
+    aggregator = DailyWearAggregator(interval=0)
+    assert aggregator.run_once() == 4
+    rows = daily(aggregator)
+    first = rows[('2026-03-01', 1)]
+    assert first['worn_seconds'] == 3600 + 5400 + 600
+    assert first['unworn_seconds'] == 1800 + 3600
+    assert first['longest_unworn_seconds'] == 3600
+    assert (first['wear_on_count'], first['wear_off_count']) == (3, 3)
+    second = rows[('2026-03-02', 1)]
+    assert second['worn_seconds'] == 3600 and second['unworn_seconds'] == 0
+    assert aggregator.stats()['pending_sessions'] == 0
+
+
+def test_incremental_batches_match_single_run(sessions):
+    for hour in range(8, 18):
+        sessions(1, f'2026-03-01 {hour:02d}:00:00', f'2026-03-01 {hour:02d}:40:00')
+        sessions(2, f'2026-03-01 {hour:02d}:10:00', f'2026-03-01 {hour:02d}:30:00')
+
+    aggregator = DailyWearAggregator(interval=0, batch_size=3)
+    assert aggregator.run_once() == 20
+    # 이미 집계된 세션은 다시 반영하지 않음
+    assert aggregator.run_once() == 0
+    rows = daily(aggregator)
+    assert rows[('2026-03-01', 1)]['worn_seconds'] == 10 * 2400
+    assert rows[('2026-03-01', 1)]['unworn_seconds'] == 9 * 1200
+    assert rows[('2026-03-01', 2)]['unworn_seconds'] == 9 * 2400
+
+    # 나중에 종료된 세션은 이전 배치의 마지막 세션과의 간격을 더함
+    sessions(1, '2026-03-01 19:00:00', '2026-03-01 19:30:00')
+    assert aggregator.run_once() == 1
+    row = daily(aggregator, employee_id=1)[('2026-03-01', 1)]
+    assert row['unworn_seconds'] == 9 * 1200 + 4800
+    assert row['longest_unworn_seconds'] == 4800
+
+
+def test_skips_invalid_sessions(sessions):
+    sessions(None, '2026-03-01 09:00:00', '2026-03-01 10:00:00')
+    sessions(1, '2026-03-01 11:00:00', '2026-03-01 10:00:00')
+    aggregator = DailyWearAggregator(interval=0)
+    assert aggregator.run_once() == 2
+    stats = aggregator.stats()
+    assert stats['skipped_sessions'] == 2 and stats['pending_sessions'] == 0
+    assert daily(aggregator) == {}
+
+
+def test_report_groups_and_compliance(sessions):
+    sessions(1, '2026-03-01 09:00:00', '2026-03-01 12:00:00')
+    sessions(1, '2026-03-01 13:00:00', '2026-03-01 14:00:00')
+    sessions(2, '2026-03-02 09:00:00', '2026-03-02 10:00:00')
+    aggregator = DailyWearAggregator(interval=0)
+    aggregator.run_once()
+
+    by_department = aggregator.report('2026-03-01', '2026-03-31')
+    assert [item['department'] for item in by_department] == ['A', 'B']
+    assert by_department[0]['worn_seconds'] == 4 * 3600
+    assert by_department[0]['compliance_rate'] == 0.8
+    assert by_department[1]['compliance_rate'] == 1.0
+
+    by_employee = aggregator.report('2026-03-01', '2026-03-01', group='employee')
+    assert by_employee == [dict(by_department[0], employee_id=1, employee_name='kim',
+                                employee_number='E1', department='A')]
+    with pytest.raises(ValueError):
+        aggregator.report('2026-03-01', '2026-03-31', group='week')
@@ -0,0 +1,364 @@
+"""
+센서 시계열 저장소
+디바이스별 메모리 원시 링버퍼 + 1초/1분/1시간 롤업(최소/최대/평균, 상태별 지속 시간) 영속화 및 보존 정책
+"""
+import logging
+import time
+from collections import deque
+from threading import Lock, Thread
+
+import db
+
+logger = logging.getLogger('db.timeseries')
+
+# (이름, 버킷 길이(초), 기본 보존 기간(초))
+TIERS = (
+    ('1s', 1, 24 * 3600),
+    ('1m', 60, 30 * 24 * 3600),
+    ('1h', 3600, 2 * 365 * 24 * 3600),
+)
+TIER_SECONDS = {name: seconds for name, seconds, _ in TIERS}
+
+# 연결 끊김 등으로 프레임 간격이 이보다 길면 상태 지속 시간에 반영하지 않음
+MAX_STATE_GAP_SECONDS = 5.0
+
+ROLLUP_UPSERT_SQL = '''
+    INSERT INTO sensor_rollups
+        (tier, device_id, bucket_start, samples, dist_samples, dist_min, dist_max, dist_sum,
+         diff_min, diff_max, diff_sum, closed_seconds, open_seconds, last_state)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(tier, device_id, bucket_start) DO UPDATE SET
+        samples = samples + excluded.samples,
+        dist_samples = dist_samples + excluded.dist_samples,
+        dist_min = COALESCE(MIN(dist_min, excluded.dist_min), dist_min, excluded.dist_min),
+        dist_max = COALESCE(MAX(dist_max, excluded.dist_max), dist_max, excluded.dist_max),
+        dist_sum = dist_sum + excluded.dist_sum,
+        diff_min = MIN(diff_min, excluded.diff_min),
+        diff_max = MAX(diff_max, excluded.diff_max),
+        diff_sum = diff_sum + excluded.diff_sum,
+        closed_seconds = closed_seconds + excluded.closed_seconds,
+        open_seconds = open_seconds + excluded.open_seconds,
+        last_state = excluded.last_state
+'''
+
+
+class _Bucket:
+    """한 버킷 구간의 누적 통계"""
+
+    __slots__ = ('start', 'samples', 'dist_samples', 'dist_min', 'dist_max', 'dist_sum',
+                 'diff_min', 'diff_max', 'diff_sum', 'closed_seconds', 'open_seconds', 'last_state')
+
+    def __init__(self, start):
+        self.start = start
+        self.samples = 0
+        self.dist_samples = 0
+        self.dist_min = None
+        self.dist_max = None
+        self.dist_sum = 0
+        self.diff_min = None
+        self.diff_max = None
+        self.diff_sum = 0
+        self.closed_seconds = 0.0
+        self.open_seconds = 0.0
+        self.last_state = None
+
+    def add(self, distance, diff, state, state_seconds, previous_state):
+        self.samples += 1
+        if distance is not None:
+            self.dist_samples += 1
+            self.dist_sum += distance
+            self.dist_min = distance if self.dist_min is None else min(self.dist_min, distance)
+            self.dist_max = distance if self.dist_max is None else max(self.dist_max, distance)
+        self.diff_sum += diff
+        self.diff_min = diff if self.diff_min is None else min(self.diff_min, diff)
+        self.diff_max = diff if self.diff_max is None else max(self.diff_max, diff)
+        if previous_state == 'CLOSED':
+            self.closed_seconds += state_seconds
+        elif previous_state == 'OPEN':
+            self.open_seconds += state_seconds
+        self.last_state = state
+
+    @classmethod
+    def from_row(cls, start, samples, dist_samples, dist_min, dist_max, dist_sum,
+                 diff_min, diff_max, diff_sum, closed_seconds, open_seconds, last_state):
+        """영속화된 sensor_rollups 행(bucket_start 부터)으로 버킷 복원"""
+        bucket = cls(start)
+        bucket.samples, bucket.dist_samples = samples, dist_samples
+        bucket.dist_min, bucket.dist_max, bucket.dist_sum = dist_min, dist_max, dist_sum
+        bucket.diff_min, bucket.diff_max, bucket.diff_sum = diff_min, diff_max, diff_sum
+        bucket.closed_seconds, bucket.open_seconds = closed_seconds, open_seconds
+        bucket.last_state = last_state
+        return bucket
+
+    def merge(self, other):
+        self.samples += other.samples
+        self.dist_samples += other.dist_samples
+        self.dist_sum += other.dist_sum
+        if other.dist_min is not None:
+            self.dist_min = other.dist_min if self.dist_min is None else min(self.dist_min, other.dist_min)
+            self.dist_max = other.dist_max if self.dist_max is None else max(self.dist_max, other.dist_max)
+        if other.diff_min is not None:
+            self.diff_min = other.diff_min if self.diff_min is None else min(self.diff_min, other.diff_min)
+            self.diff_max = other.diff_max if self.diff_max is None else max(self.diff_max, other.diff_max)
+        self.diff_sum += other.diff_sum
+        self.closed_seconds += other.closed_seconds
+        self.open_seconds += other.open_seconds
+        if other.last_state is not None:
+            self.last_state = other.last_state
+
+    def row(self, tier, device_id):
+        return (tier, device_id, self.start, self.samples, self.dist_samples,
+                self.dist_min, self.dist_max, self.dist_sum,
+                self.diff_min, self.diff_max, self.diff_sum,
+                round(self.closed_seconds, 3), round(self.open_seconds, 3), self.last_state)
+
+    def point(self, tier):
+        return _point(tier, self.start, self.samples, self.dist_samples, self.dist_min, self.dist_max,
+                      self.dist_sum, self.diff_min, self.diff_max, self.diff_sum,
+                      self.closed_seconds, self.open_seconds, self.last_state)
+
+
+def _point(tier, start, samples, dist_samples, dist_min, dist_max, dist_sum,
+           diff_min, diff_max, diff_sum, closed_seconds, open_seconds, last_state):
+    return {
+        'tier': tier,
+        'ts': start,
+        'samples': samples,
+        'distance_min': dist_min,
+        'distance_max': dist_max,
+        'distance_avg': round(dist_sum / dist_samples, 2) if dist_samples else None,
+        'diff_min': diff_min,
+        'diff_max': diff_max,
+        'diff_avg': round(diff_sum / samples, 2) if samples else None,
+        'closed_seconds': round(closed_seconds, 3),
+        'open_seconds': round(open_seconds, 3),
+        'state': last_state
+    }
+
+
+class _DeviceSeries:
+    """디바이스 하나의 원시 링버퍼와 티어별 진행 중인 버킷"""
+
+    __slots__ = ('raw', 'buckets', 'last_ts', 'last_state')
+
+    def __init__(self, raw_size):
+        self.raw = deque(maxlen=raw_size)
+        self.buckets = {}  # {tier: _Bucket}
+        self.last_ts = None
+        self.last_state = None
+
+
+class TimeSeriesStore:
+    """프레임을 원시 링버퍼에 보관하고 1s → 1m → 1h 로 단계적으로 롤업"""
+
+    def __init__(self, writer, raw_size=2000, retention=None, maintenance_interval=1.0):
+        self.writer = writer
+        self.raw_size = max(1, int(raw_size))
+        self.retention = {name: seconds for name, _, seconds in TIERS}
+        self.retention.update(retention or {})
+        self.maintenance_interval = maintenance_interval
+        self._series = {}  # {device_id: _DeviceSeries}
+        self._lock = Lock()
+        self._thread = None
+        self._last_retention_run = 0.0
+
+    # ----- 수명 주기 -----
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, name='timeseries-maintenance', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.maintenance_interval)
+            try:
+                self.flush_stale(time.time())
+                if time.time() - self._last_retention_run >= 3600:
+                    self.enforce_retention()
+            except Exception as exc:
+                logger.error(f"Time-series maintenance failed: {exc}")
+
+    # ----- 기록 -----
+
+    def record(self, device_id, distance, diff, state, ts=None):
+        """프레임 1개 기록 (distance 는 mm 정수 또는 None)"""
+        self.start()
+        ts = time.time() if ts is None else ts
+        closed = []
+        with self._lock:
+            series = self._series.get(device_id)
+            if series is None:
+                series = self._series[device_id] = _DeviceSeries(self.raw_size)
+            series.raw.append((ts, distance, diff, state))
+
+            state_seconds = 0.0
+            if series.last_ts is not None:
+                gap = ts - series.last_ts
+                if 0 < gap <= MAX_STATE_GAP_SECONDS:
+                    state_seconds = gap
+            previous_state = series.last_state
+            series.last_ts = ts
+            series.last_state = state
+
+            start = int(ts)
+            bucket = series.buckets.get('1s')
+            if bucket is not None and bucket.start != start:
+                self._close_bucket(device_id, series, '1s', closed)
+                bucket = None
+            if bucket is None:
+                bucket = series.buckets['1s'] = _Bucket(start)
+            bucket.add(distance, diff, state, state_seconds, previous_state)
+
+        self._persist(closed)
+
+    def _close_bucket(self, device_id, series, tier, closed):
+        """버킷을 닫아 영속화 목록에 추가하고 상위 티어에 병합"""
+        bucket = series.buckets.pop(tier)
+        closed.append(bucket.row(tier, device_id))
+
+        index = next(i for i, (name, _, _) in enumerate(TIERS) if name == tier)
+        if index + 1 >= len(TIERS):
+            return
+        parent_tier, parent_seconds, _ = TIERS[index + 1]
+        parent_start = bucket.start - (bucket.start % parent_seconds)
+        parent = series.buckets.get(parent_tier)
+        if parent is not None and parent.start != parent_start:
+            self._close_bucket(device_id, series, parent_tier, closed)
+            parent = None
+        if parent is None:
+            parent = series.buckets[parent_tier] = _Bucket(parent_start)
+        parent.merge(bucket)
+
+    def flush_stale(self, now, grace=2.0):
+        """구간이 끝난 버킷(프레임이 끊긴 디바이스 포함)을 닫아서 영속화"""
+        closed = []
+        with self._lock:
+            for device_id, series in self._series.items():
+                for name, seconds, _ in TIERS:
+                    bucket = series.buckets.get(name)
+                    if bucket is not None and bucket.start + seconds + grace <= now:
+                        self._close_bucket(device_id, series, name, closed)
+        self._persist(closed)
+        return len(closed)
+
+    def flush_all(self):
+        """진행 중인 모든 버킷을 영속화 (종료/초기화 전)"""
+        closed = []
+        with self._lock:
+            for device_id, series in self._series.items():
+                for name, _, _ in TIERS:
+                    if name in series.buckets:
+                        self._close_bucket(device_id, series, name, closed)
+        self._persist(closed)
+        return len(closed)
+
+    def forget(self, device_id):
+        """디바이스 등록 해제 시 버킷 영속화 후 메모리 정리"""
+        closed = []
+        with self._lock:
+            series = self._series.pop(device_id, None)
+            if series is not None:
+                for name, _, _ in TIERS:
+                    if name in series.buckets:
+                        self._close_bucket(device_id, series, name, closed)
+        self._persist(closed)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def _persist(self, rows):
+        for row in rows:
+            self.writer.submit(ROLLUP_UPSERT_SQL, row)
+
+    def enforce_retention(self, now=None):
+        """티어별 보존 기간이 지난 롤업 삭제"""
+        now = time.time() if now is None else now
+        self._last_retention_run = now
+        for name, _, _ in TIERS:
+            cutoff = int(now - self.retention[name])
+            self.writer.submit('DELETE FROM sensor_rollups WHERE tier = ? AND bucket_start < ?',
+                               (name, cutoff), critical=True)
+
+    # ----- 조회 -----
+
+    def choose_tier(self, device_id, start, end, max_points=500):
+        """요청 구간을 max_points 이내로 표현할 수 있는 가장 세밀한 티어 선택"""
+        now = time.time()
+        with self._lock:
+            series = self._series.get(device_id)
+            oldest_raw = series.raw[0][0] if series and series.raw else None
+        if oldest_raw is not None and start >= oldest_raw:
+            with self._lock:
+                count = sum(1 for entry in series.raw if start <= entry[0] <= end)
+            if count <= max_points:
+                return 'raw'
+
+        span = max(1.0, end - start)
+        for name, seconds, _ in TIERS:
+            if span / seconds <= max_points and start >= now - self.retention[name]:
+                return name
+        return TIERS[-1][0]
+
+    def query(self, device_id, start, end, max_points=500, tier=None):
+        """구간 조회 - tier 미지정 시 자동 선택"""
+        tier = tier or self.choose_tier(device_id, start, end, max_points)
+        if tier == 'raw':
+            with self._lock:
+                series = self._series.get(device_id)
+                entries = [entry for entry in series.raw if start <= entry[0] <= end] if series else []
+            points = [{
+                'tier': 'raw',
+                'ts': round(ts, 3),
+                'distance': distance,
+                'diff': diff,
+                'state': state
+            } for ts, distance, diff, state in entries]
+            return {'tier': 'raw', 'points': points}
+
+        if tier not in TIER_SECONDS:
+            raise ValueError(f'unknown tier: {tier}')
+
+        conn = db.get_connection()
+        try:
+            rows = conn.execute('''SELECT bucket_start, samples, dist_samples, dist_min, dist_max, dist_sum,
+                                          diff_min, diff_max, diff_sum, closed_seconds, open_seconds, last_state
+                                   FROM sensor_rollups
+                                   WHERE tier = ? AND device_id = ? AND bucket_start >= ? AND bucket_start <= ?
+                                   ORDER BY bucket_start ASC''',
+                                (tier, device_id, int(start) - TIER_SECONDS[tier] + 1, int(end))).fetchall()
+        finally:
+            conn.close()
+        points = [_point(tier, *row) for row in rows]
+
+        # 아직 영속화되지 않은 진행 중 버킷 포함
+        with self._lock:
+            series = self._series.get(device_id)
+            current = series.buckets.get(tier) if series else None
+            live = None
+            if current is not None and current.start <= end:
+                live = _Bucket(current.start)
+                live.merge(current)
+        if live is not None:
+            if rows and rows[-1][0] == live.start:
+                # 같은 버킷이 일부 영속화된 경우(forget, 끊김 후 flush) upsert 와 같은 방식으로 합산
+                persisted = _Bucket.from_row(*rows[-1])
+                persisted.merge(live)
+                points[-1] = persisted.point(tier)
+            else:
+                points.append(live.point(tier))
+        return {'tier': tier, 'points': points}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'devices': len(self._series),
+                'raw_points': sum(len(series.raw) for series in self._series.values()),
+                'raw_capacity_per_device': self.raw_size,
+                'retention_seconds': dict(self.retention)
+            }
@@ -0,0 +1,37 @@
+"""
+BLE 전송 계층
+DeviceManager/ScanService 가 사용하는 클라이언트·스캐너 생성기 (기본 bleak, 부하 테스트용 시뮬레이터)
+
+클라이언트는 BleakClient 와 같은 메서드를 제공해야 한다:
+connect(), disconnect(), start_notify(uuid, handler), stop_notify(uuid),
+write_gatt_char(uuid, data, response=True), is_connected, 생성 시 disconnected_callback(client)
+"""
+from bleak import BleakClient, BleakScanner
+
+TRANSPORT_BLEAK = 'bleak'
+TRANSPORT_SIMULATED = 'sim'
+
+
+class BleakTransport:
+    """실제 BLE 어댑터 (bleak)"""
+
+    name = TRANSPORT_BLEAK
+
+    def client(self, address, timeout=15.0, disconnected_callback=None):
+        return BleakClient(address, timeout=timeout, disconnected_callback=disconnected_callback)
+
+    def scanner(self, detection_callback=None):
+        return BleakScanner(detection_callback=detection_callback)
+
+    def stats(self):
+        return {'transport': self.name}
+
+
+def create_transport(kind=TRANSPORT_BLEAK, **options):
+    """BLE_TRANSPORT 값으로 전송 계층 생성 (sim 의 options 는 SimulatedFleet 인자)"""
+    if kind == TRANSPORT_SIMULATED:
+        from strap_simulator import SimulatedFleet
+        return SimulatedFleet(**options)
+    if kind != TRANSPORT_BLEAK:
+        raise ValueError(f"unknown BLE transport: {kind}")
+    return BleakTransport()
@@ -0,0 +1,290 @@
+"""
+일일 착용 집계
+종료된 wear_sessions 를 직원/일자별 daily_wear_stats 행에 증분 반영 (세션마다 한 번, aggregated 플래그로 표시)
+보고서 조회는 세션을 다시 훑지 않고 집계 행만 읽음
+
+- worn_seconds: 착용 세션 시간 (자정을 넘는 세션은 날짜별로 나눔)
+- unworn_seconds / longest_unworn_seconds: 같은 날 직전 세션 종료 ~ 다음 세션 시작 사이 간격 (근무 중 미착용)
+- wear_on_count / wear_off_count: 세션 시작일 / 종료일 기준 횟수
+날짜는 세션 시각과 같은 서버 로컬 날짜
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+
+import db
+
+logger = logging.getLogger('db.aggregates')
+
+# 보고서 group 값 → (묶는 컬럼, 응답 키)
+GROUP_COLUMNS = {
+    'department': ('d.department', 'department'),
+    'employee': ('d.employee_id', 'employee_id'),
+    'day': ('d.day', 'day'),
+}
+
+_UPSERT = '''INSERT INTO daily_wear_stats
+    (day, employee_id, department, worn_seconds, unworn_seconds, longest_unworn_seconds,
+     wear_on_count, wear_off_count, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (day, employee_id) DO UPDATE SET
+        department = excluded.department,
+        worn_seconds = worn_seconds + excluded.worn_seconds,
+        unworn_seconds = unworn_seconds + excluded.unworn_seconds,
+        longest_unworn_seconds = MAX(longest_unworn_seconds, excluded.longest_unworn_seconds),
+        wear_on_count = wear_on_count + excluded.wear_on_count,
+        wear_off_count = wear_off_count + excluded.wear_off_count,
+        updated_at = excluded.updated_at'''
+
+
+def _parse(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _split_by_day(start, end):
+    """[start, end) 구간을 (YYYY-MM-DD, 초) 목록으로 나눔"""
+    parts = []
+    cursor = start
+    while cursor < end:
+        next_day = datetime.combine(cursor.date() + timedelta(days=1), datetime.min.time())
+        stop = min(end, next_day)
+        parts.append((cursor.strftime('%Y-%m-%d'), (stop - cursor).total_seconds()))
+        cursor = stop
+    return parts
+
+
+class _DayDelta:
+    __slots__ = ('worn', 'unworn', 'longest', 'wear_on', 'wear_off')
+
+    def __init__(self):
+        self.worn = 0.0
+        self.unworn = 0.0
+        self.longest = 0.0
+        self.wear_on = 0
+        self.wear_off = 0
+
+
+def _day_delta(deltas, day, employee_id):
+    key = (day, employee_id)
+    delta = deltas.get(key)
+    if delta is None:
+        delta = deltas[key] = _DayDelta()
+    return delta
+
+
+class DailyWearAggregator:
+    """백그라운드 집계 스레드 + 보고서 조회"""
+
+    def __init__(self, writer=None, interval=60, batch_size=500, min_spacing=5.0):
+        self.writer = writer
+        self.interval = interval
+        self.batch_size = max(1, int(batch_size))
+        self.min_spacing = min_spacing  # 세션 종료 알림이 몰려도 이 간격 이상으로만 실행
+        self._wake = Event()
+        self._run_lock = Lock()
+        self._start_lock = Lock()
+        self._thread = None
+        self._stats_lock = Lock()
+        self._stats = {'runs': 0, 'sessions': 0, 'skipped_sessions': 0, 'rows_upserted': 0,
+                       'errors': 0, 'last_run_ms': 0.0, 'last_run_at': None}
+
+    def start(self):
+        if self._thread is not None or not self.interval:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, name='wear-aggregates', daemon=True)
+            self._thread.start()
+
+    def session_closed(self):
+        """착용 세션 종료 시 호출 - 다음 주기를 기다리지 않고 집계"""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.run_once()
+            except Exception as exc:
+                with self._stats_lock:
+                    self._stats['errors'] += 1
+                logger.error(f"Daily wear aggregation failed: {exc}")
+            time.sleep(self.min_spacing)
+
+    # ----- 집계 -----
+
+    def run_once(self):
+        """대기 중인 세션 쓰기를 반영한 뒤 미집계 종료 세션을 모두 반영 → 반영한 세션 수"""
+        started = time.perf_counter()
+        if self.writer is not None:
+            self.writer.flush(timeout=10)
+        total = 0
+        with self._run_lock:
+            conn = db.get_connection()
+            try:
+                while True:
+                    processed = self._aggregate_batch(conn)
+                    total += processed
+                    if processed < self.batch_size:
+                        break
+            finally:
+                conn.close()
+        with self._stats_lock:
+            self._stats['runs'] += 1
+            self._stats['last_run_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            self._stats['last_run_at'] = datetime.now().isoformat()
+        if total:
+            logger.info(f"Aggregated {total} wear sessions in {self._stats['last_run_ms']} ms")
+        return total
+
+    def _aggregate_batch(self, conn):
+        # 읽기와 계산은 쓰기 잠금 밖에서 - 각 세션의 직전 세션 종료 시각은 창 함수 한 번으로 구함
+        # (같은 날 간격만 세므로 배치 첫 세션 시작일 이후에 끝난 세션만 훑음)
+        rows = conn.execute('''WITH batch AS (
+                                   SELECT id, employee_id, start_time, end_time FROM wear_sessions
+                                   WHERE is_active = 0 AND aggregated = 0
+                                   ORDER BY end_time, id LIMIT ?)
+                               SELECT b.id, b.employee_id, b.start_time, b.end_time, p.previous_end
+                               FROM batch b LEFT JOIN (
+                                   SELECT id, LAG(end_time) OVER (
+                                       PARTITION BY employee_id ORDER BY end_time, id) AS previous_end
+                                   FROM wear_sessions
+                                   WHERE employee_id IN (SELECT employee_id FROM batch)
+                                     AND end_time >= (SELECT substr(MIN(start_time), 1, 10) FROM batch)
+                               ) p ON p.id = b.id
+                               ORDER BY b.end_time, b.id''', (self.batch_size,)).fetchall()
+        if not rows:
+            return 0
+
+        departments = dict(conn.execute('SELECT id, department FROM employees').fetchall())
+        deltas = {}
+        skipped = 0
+        for session_id, employee_id, start_value, end_value, previous_value in rows:
+            start, end = _parse(start_value), _parse(end_value)
+            if employee_id is None or start is None or end is None or end < start:
+                skipped += 1
+                continue
+
+            start_day = start.strftime('%Y-%m-%d')
+            for day, seconds in _split_by_day(start, end):
+                _day_delta(deltas, day, employee_id).worn += seconds
+            _day_delta(deltas, start_day, employee_id).wear_on += 1
+            _day_delta(deltas, end.strftime('%Y-%m-%d'), employee_id).wear_off += 1
+
+            # 같은 날 직전 세션 종료 이후의 미착용 간격 (겹친 세션은 간격 없음)
+            previous_end = _parse(previous_value)
+            if previous_end is not None and previous_end.date() == start.date() and previous_end <= start:
+                gap = (start - previous_end).total_seconds()
+                delta = _day_delta(deltas, start_day, employee_id)
+                delta.unworn += gap
+                delta.longest = max(delta.longest, gap)
+
+        # 쓰기 트랜잭션은 upsert 와 플래그 갱신만
+        updated_at = datetime.now().isoformat(' ')
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(_UPSERT, [
+                (day, employee_id, departments.get(employee_id), int(round(delta.worn)),
+                 int(round(delta.unworn)), int(round(delta.longest)), delta.wear_on, delta.wear_off, updated_at)
+                for (day, employee_id), delta in deltas.items()
+            ])
+            conn.executemany('UPDATE wear_sessions SET aggregated = 1 WHERE id = ?',
+                             [(row[0],) for row in rows])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        with self._stats_lock:
+            self._stats['sessions'] += len(rows) - skipped
+            self._stats['skipped_sessions'] += skipped
+            self._stats['rows_upserted'] += len(deltas)
+        return len(rows)
+
+    # ----- 조회 -----
+
+    def report(self, start_day, end_day, group='department', department=None, employee_id=None):
+        """[start_day, end_day] (YYYY-MM-DD, 양끝 포함) 집계를 group(department/employee/day) 별로 합산"""
+        if group not in GROUP_COLUMNS:
+            raise ValueError('group 은 department, employee, day 중 하나여야 합니다.')
+        column, key = GROUP_COLUMNS[group]
+        where, params = self._filters(start_day, end_day, department, employee_id)
+        extra = ', e.name, e.employee_number, MAX(d.department)' if group == 'employee' else ''
+        join = 'LEFT JOIN employees e ON e.id = d.employee_id' if group == 'employee' else ''
+        sql = f'''SELECT {column}, COUNT(DISTINCT d.employee_id), COUNT(*),
+                         SUM(d.worn_seconds), SUM(d.unworn_seconds), MAX(d.longest_unworn_seconds),
+                         SUM(d.wear_on_count), SUM(d.wear_off_count){extra}
+                  FROM daily_wear_stats d {join}
+                  WHERE {where}
+                  GROUP BY {column}
+                  ORDER BY {column}'''
+        conn = db.get_connection()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        results = []
+        for row in rows:
+            worn, unworn = row[3] or 0, row[4] or 0
+            item = {
+                key: row[0],
+                'employees': row[1],
+                'employee_days': row[2],
+                'worn_seconds': worn,
+                'unworn_seconds': unworn,
+                'longest_unworn_seconds': row[5] or 0,
+                'wear_on_count': row[6] or 0,
+                'wear_off_count': row[7] or 0,
+                'compliance_rate': round(worn / (worn + unworn), 4) if worn + unworn else None
+            }
+            if group == 'employee':
+                item.update({'employee_name': row[8], 'employee_number': row[9], 'department': row[10]})
+            results.append(item)
+        return results
+
+    def daily_rows(self, start_day, end_day, department=None, employee_id=None, limit=1000):
+        """직원/일자별 집계 행 (날짜, 직원 순)"""
+        where, params = self._filters(start_day, end_day, department, employee_id)
+        conn = db.get_connection()
+        try:
+            rows = conn.execute(f'''SELECT d.day, d.employee_id, e.name, d.department, d.worn_seconds,
+                                           d.unworn_seconds, d.longest_unworn_seconds,
+                                           d.wear_on_count, d.wear_off_count
+                                    FROM daily_wear_stats d LEFT JOIN employees e ON e.id = d.employee_id
+                                    WHERE {where}
+                                    ORDER BY d.day, d.employee_id
+                                    LIMIT ?''', params + [limit]).fetchall()
+        finally:
+            conn.close()
+        keys = ('day', 'employee_id', 'employee_name', 'department', 'worn_seconds', 'unworn_seconds',
+                'longest_unworn_seconds', 'wear_on_count', 'wear_off_count')
+        return [dict(zip(keys, row)) for row in rows]
+
+    @staticmethod
+    def _filters(start_day, end_day, department, employee_id):
+        clauses = ['d.day >= ?', 'd.day <= ?']
+        params = [start_day, end_day]
+        if department:
+            clauses.append('d.department = ?')
+            params.append(department)
+        if employee_id is not None:
+            clauses.append('d.employee_id = ?')
+            params.append(employee_id)
+        return ' AND '.join(clauses), params
+
+    def stats(self):
+        conn = db.get_connection()
+        try:
+            pending = conn.execute('''SELECT COUNT(*) FROM wear_sessions
+                                      WHERE is_active = 0 AND aggregated = 0''').fetchone()[0]
+        finally:
+            conn.close()
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot['pending_sessions'] = pending
+        snapshot['interval_seconds'] = self.interval
+        return snapshot
@@ -45,27 +45,34 @@ function App() {
       setConnected(false);
     });
 
-    // 디바이스 데이터 수신
-    newSocket.on('device_data', (data: DeviceData) => {
-      console.log('Received device data:', data);
+    // 디바이스 데이터 수신 (서버는 틱마다 device_data_batch 로 묶어서 전송)
+    const applyDeviceData = (items: DeviceData[]) => {
+      if (items.length === 0) return;
+
       setDeviceData((prev) => {
         const newMap = new Map(prev);
-        const deviceId = data.device_id;
-        const existing = newMap.get(deviceId) || [];
-        
-        // 최근 100개 데이터만 유지
-        const updated = [...existing, data].slice(-100);
-        newMap.set(deviceId, updated);
+        for (const data of items) {
+          const existing = newMap.get(data.device_id) || [];
+          // 최근 100개 데이터만 유지
+          newMap.set(data.device_id, [...existing, data].slice(-100));
+        }
         return newMap;
       });
 
       // 디바이스 목록의 last_data 업데이트
+      const latest = new Map(items.map((data) => [data.device_id, data]));
       setDevices((prev) =>
-        prev.map((dev) =>
-          dev.id === data.device_id ? { ...dev, last_data: data } : dev
-        )
+        prev.map((dev) => {
+          const data = latest.get(dev.id);
+          return data ? { ...dev, last_data: data } : dev;
+        })
       );
-    });
+    };
+
+    newSocket.on('device_data', (data: DeviceData) => applyDeviceData([data]));
+    newSocket.on('device_data_batch', (batch: { devices?: DeviceData[] }) =>
+      applyDeviceData(batch.devices ?? [])
+    );
 
     // 디바이스 연결/해제 이벤트
     newSocket.on('device_connected', (data) => {
@@ -9,6 +9,11 @@
 //      CAL        재보정 수행
 //      BEEP       짧은 비프
 //      STATE      현재 상태 1회 응답
+//      FMT:BIN    고정 길이 바이너리 프레임으로 전환 (연결 단위, 끊기면 텍스트로 복귀)
+//      FMT:TEXT   텍스트 프레임으로 복귀
+// - 바이너리 프레임(12바이트, little-endian):
+//      [0]=0xB1(매직/버전) [1]=상태(0=OPEN,1=CLOSED) [2..3]=seq
+//      [4..5]=dist(mm, 0xFFFF=ERR) [6..7]=raw [8..9]=avg [10..11]=diff
 // Python 클라이언트는 DIST: 프리픽스를 이용해 기존 로직과 호환 가능.
 
 #include <Wire.h>
@@ -90,9 +95,14 @@ static const char* BLE_DEVICE_NAME = "ESP32-STRAP";
 BLEServer* g_server = nullptr; BLECharacteristic* g_notify = nullptr; BLECharacteristic* g_write = nullptr;
 bool g_bleConnected = false; char g_notifyBuf[160];
 
+// ===== 바이너리 프레임 (FMT:BIN 협상 시 사용) =====
+static const uint8_t BIN_FRAME_MAGIC = 0xB1;
+static const size_t BIN_FRAME_LEN = 12;
+bool g_binaryFrames = false; uint16_t g_frameSeq = 0; uint8_t g_binFrame[BIN_FRAME_LEN];
+
 class StrapServerCallbacks : public BLEServerCallbacks {
   void onConnect(BLEServer* s) override { g_bleConnected = true; Serial.println("[BLE] Client connected"); }
-  void onDisconnect(BLEServer* s) override { g_bleConnected = false; Serial.println("[BLE] Client disconnected - advertising..."); BLEDevice::startAdvertising(); }
+  void onDisconnect(BLEServer* s) override { g_bleConnected = false; g_binaryFrames = false; Serial.println("[BLE] Client disconnected - advertising..."); BLEDevice::startAdvertising(); }
 };
 
 static uint32_t clampRate(uint32_t v){ if(v<50)v=50; if(v>2000)v=2000; return v; }
@@ -130,7 +140,14 @@ class StrapWriteCallbacks : public BLECharacteristicCallbacks {
     String U = v;
     U.toUpperCase();
 
-    if(U.startsWith("RATE:")){
+    if(U == "FMT:BIN") {
+      g_binaryFrames = true;
+      g_frameSeq = 0;
+      snprintf(g_notifyBuf,sizeof(g_notifyBuf),"RESP:FMT=BIN,1");
+    } else if(U == "FMT:TEXT") {
+      g_binaryFrames = false;
+      snprintf(g_notifyBuf,sizeof(g_notifyBuf),"RESP:FMT=TEXT");
+    } else if(U.startsWith("RATE:")){
       uint32_t nv = v.substring(5).toInt();
       measureIntervalMs = clampRate(nv);
       snprintf(g_notifyBuf,sizeof(g_notifyBuf),"RESP:RATE=%lu",(unsigned long)measureIntervalMs);
@@ -599,7 +616,25 @@ void startCalibration(){
   }
 }
 
-void sendData(bool force){ if(!g_bleConnected && !force) return; if(g_notify){ g_notify->setValue((uint8_t*)g_notifyBuf, strlen(g_notifyBuf)); g_notify->notify(); } }
+void sendData(bool force){
+  if(!g_bleConnected && !force) return;
+  if(!g_notify) return;
+  if(g_binaryFrames) g_notify->setValue(g_binFrame, BIN_FRAME_LEN);
+  else g_notify->setValue((uint8_t*)g_notifyBuf, strlen(g_notifyBuf));
+  g_notify->notify();
+}
+
+static void put16le(uint8_t* dst, uint16_t v){ dst[0] = (uint8_t)(v & 0xFF); dst[1] = (uint8_t)(v >> 8); }
+
+void buildBinaryFrame(uint16_t dist, uint16_t raw, uint16_t avg, uint32_t diff){
+  g_binFrame[0] = BIN_FRAME_MAGIC;
+  g_binFrame[1] = stateNow==STRAP_CLOSED ? 1 : 0;
+  put16le(&g_binFrame[2], g_frameSeq++);
+  put16le(&g_binFrame[4], dist);
+  put16le(&g_binFrame[6], raw);
+  put16le(&g_binFrame[8], avg);
+  put16le(&g_binFrame[10], diff > 0xFFFF ? 0xFFFF : (uint16_t)diff);
+}
 
 void setup() {
   Serial.begin(115200);
@@ -713,8 +748,9 @@ void loop() {
       }
     }
 
-    // BLE 알림 문자열 구성
-    if(dist==0xFFFF) snprintf(g_notifyBuf,sizeof(g_notifyBuf),"DIST:ERR;RAW:%u;AVG:%u;DIFF:%lu;STATE:%s", raw, avg, (unsigned long)diff, stateNow==STRAP_OPEN?"OPEN":"CLOSED");
+    // BLE 알림 구성 (협상된 포맷에 따라 바이너리 또는 문자열)
+    if(g_binaryFrames) buildBinaryFrame(dist, raw, avg, diff);
+    else if(dist==0xFFFF) snprintf(g_notifyBuf,sizeof(g_notifyBuf),"DIST:ERR;RAW:%u;AVG:%u;DIFF:%lu;STATE:%s", raw, avg, (unsigned long)diff, stateNow==STRAP_OPEN?"OPEN":"CLOSED");
     else snprintf(g_notifyBuf,sizeof(g_notifyBuf),"DIST:%u;RAW:%u;AVG:%u;DIFF:%lu;STATE:%s", dist, raw, avg, (unsigned long)diff, stateNow==STRAP_OPEN?"OPEN":"CLOSED");
     sendData(false);
   } // end measure interval